@@ -0,0 +1,78 @@
+from pydantic import BaseModel
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class RoutePolicy(BaseModel):
+    max_retries: int = 0 # only applied to bodiless GET/HEAD/OPTIONS requests
+    hedge: bool = False # GET only
+    hedge_percentile: float = 0.95
+
+class Settings(BaseSettings):
+    user_service_url: str = "http://localhost:8001"
+    scheduling_service_url: str = "http://localhost:8002"
+    mode: str = "development" # TODO: Change for prod
+
+    jwt_key: str | None = None # edge verification is skipped when neither this nor jwks_url is set
+    algorithm: str = "HS256"
+    jwks_url: str | None = None # verify asymmetric tokens with the user service's published keys
+    jwks_refresh_seconds: float = 300.0
+    gateway_shared_secret: str | None = None # proves to upstreams that identity headers came from the gateway
+
+    # Path prefix -> (requests per minute, burst), keyed by client IP
+    rate_limits: dict[str, tuple[float, int]] = {
+        "/auth/login": (30, 30),
+        "/auth/register": (10, 10),
+        "/auth/refresh": (60, 60),
+    }
+
+    # GET path pattern ("*" matches one segment) -> TTL seconds. Only the agency list and
+    # detail are cached; availability and calendar change with every booking.
+    cache_rules: dict[str, float] = {"/auth/verify": 15.0, "/agency": 30.0, "/agency/*": 30.0}
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_max_entry_bytes: int = 1024 * 1024
+
+    # Path prefix -> retry/hedging policy; unmatched routes get RoutePolicy()
+    route_policies: dict[str, RoutePolicy] = {
+        "/auth/verify": RoutePolicy(max_retries=1, hedge=True),
+        "/agency": RoutePolicy(max_retries=1, hedge=True),
+    }
+    breaker_window: int = 50
+    breaker_min_calls: int = 20
+    breaker_error_rate: float = 0.5
+    breaker_slow_call_seconds: float = 2.0
+    breaker_slow_call_rate: float = 0.8
+    breaker_open_seconds: float = 10.0
+    breaker_half_open_calls: int = 3
+    retry_budget_ratio: float = 0.1
+    retry_budget_min_per_second: float = 1.0
+
+    upstream_connect_timeout: float = 2.0
+    upstream_read_timeout: float = 30.0
+    upstream_write_timeout: float = 30.0
+    upstream_pool_timeout: float = 5.0
+    upstream_max_connections: int = 200
+    upstream_max_keepalive_connections: int = 50
+    upstream_keepalive_expiry: float = 60.0
+
+    tracing_service_name: str = "gateway"
+    tracing_exporter: str = "memory" # "memory", "file" (JSON lines, recent traces also kept in memory) or "none"
+    tracing_file: str = "traces.jsonl"
+    tracing_sample_ratio: float = 0.1 # for traces started here; continued traces follow the caller's traceparent
+    tracing_max_traces: int = 1000
+    tracing_accept_incoming: bool = False # continue a client-supplied traceparent instead of starting a trace
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+    )
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+    @property
+    def routes(self) -> dict[str, str]:
+        return {
+            "/auth": self.user_service_url,
+            "/agency": self.scheduling_service_url,
+        }
+
+settings = Settings()
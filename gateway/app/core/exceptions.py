@@ -0,0 +1,46 @@
+from fastapi import HTTPException, status
+
+
+class RouteNotFound(HTTPException):
+    def __init__(self, path: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No upstream serves {path}"
+        )
+
+class NotAuthenticated(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+class PermissionRequired(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+class UpstreamUnavailable(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Upstream service is unavailable"
+        )
+
+class UpstreamTimeout(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Upstream service timed out"
+        )
+
+class CircuitOpen(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Upstream service is failing, requests are temporarily suspended",
+            headers={"Retry-After": str(retry_after)},
+        )
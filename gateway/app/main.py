@@ -0,0 +1,78 @@
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.services.auth import require_admin
+from app.services.jwks import key_set
+from app.services.proxy import proxy
+from app.services.rate_limit import RateLimitMiddleware
+from app.services.tracing import TracingMiddleware, tracer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await proxy.start()
+    if key_set is not None:
+        await key_set.start()
+    yield
+    if key_set is not None:
+        await key_set.stop()
+    await proxy.close()
+    tracer.close()
+
+app = FastAPI(
+    title="InnoTour Gateway",
+    version="0.1.0",
+    docs_url=None,
+    openapi_url=None,
+    lifespan=lifespan,
+)
+
+app.add_middleware(RateLimitMiddleware, limits=settings.rate_limits)
+app.add_middleware(
+    TracingMiddleware,
+    tracer=tracer,
+    accept_incoming=settings.tracing_accept_incoming,
+    expose_trace_id=True,
+)
+
+# CORS is left to the upstream services; adding it here as well would
+# duplicate the Access-Control-* headers on every proxied response.
+
+@app.exception_handler(Exception)
+async def handle_unexpected_error(request: Request, exc: Exception):
+    return JSONResponse(
+        status_code=500,
+        content={"error": "internal_server_error", "detail": "An unexpected error occurred."},
+    )
+
+@app.get("/health", tags=["health"])
+async def health_check():
+    return {"status": "ok"}
+
+@app.get("/health/cache", tags=["health"])
+async def cache_stats():
+    return proxy.cache.stats()
+
+@app.get("/health/upstreams", tags=["health"])
+async def upstream_stats():
+    return {upstream: guard.stats() for upstream, guard in proxy.guards.items()}
+
+@app.get("/health/jwks", tags=["health"])
+async def jwks_stats():
+    return key_set.stats() if key_set is not None else {"enabled": False}
+
+# Traces carry upstream routes and timings, so only center admins may read them.
+@app.get("/health/traces", tags=["health"], dependencies=[Depends(require_admin)])
+async def recent_traces(limit: int = 20, trace_id: str | None = None):
+    return tracer.traces(limit, trace_id)
+
+@app.api_route(
+    "/{path:path}",
+    methods=["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"],
+    include_in_schema=False,
+)
+async def forward(request: Request):
+    return await proxy.forward(request)
@@ -0,0 +1,116 @@
+import jwt
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.exceptions import NotAuthenticated, PermissionRequired
+from app.services.jwks import key_set
+from app.services.tracing import tracer
+
+# Identity headers set by the gateway. Any client-supplied copies are stripped
+# before forwarding so upstreams can trust whatever arrives under these names.
+USER_ID_HEADER = "x-user-id"
+USER_EMAIL_HEADER = "x-user-email"
+USER_ROLE_HEADER = "x-user-role"
+AGENCY_ID_HEADER = "x-agency-id"
+TOKEN_EXP_HEADER = "x-token-exp"
+TOKEN_IAT_HEADER = "x-token-iat"
+GATEWAY_TOKEN_HEADER = "x-gateway-token"
+
+ADMIN_ROLE = "admin"
+
+IDENTITY_HEADERS = frozenset({
+    USER_ID_HEADER,
+    USER_EMAIL_HEADER,
+    USER_ROLE_HEADER,
+    AGENCY_ID_HEADER,
+    TOKEN_EXP_HEADER,
+    TOKEN_IAT_HEADER,
+    GATEWAY_TOKEN_HEADER,
+})
+
+
+def verify_access_token(token: str) -> dict | None:
+    """
+    Decode an access token with the same rules as the services.
+
+    Mirrors ``security.decode_token`` in the user service and
+    ``get_token_payload`` in the scheduling service: signature, ``exp`` and
+    an ``access_token`` scope are all required. Returns None for any token
+    that fails, leaving the upstream to produce the error response.
+    """
+    with tracer.span("jwt.decode", algorithm=settings.algorithm if key_set is None else "jwks"):
+        return _verify(token)
+
+
+def _verify(token: str) -> dict | None:
+    try:
+        if key_set is not None:
+            jwk = key_set.get(jwt.get_unverified_header(token).get("kid"))
+            if jwk is None:
+                return None
+            verify_key, algorithms = jwk.key, [jwk.algorithm_name]
+        else:
+            verify_key, algorithms = settings.jwt_key, [settings.algorithm]
+        payload = jwt.decode(
+            token,
+            verify_key,
+            algorithms=algorithms,
+            options={"require": ["exp", "scope", "sub"]},
+        )
+    except jwt.PyJWTError:
+        return None
+    if payload.get("scope") != "access_token":
+        return None
+    return payload
+
+
+def bearer_token(request: Request) -> str | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+def require_admin(request: Request) -> dict:
+    """
+    Dependency for the gateway's own admin endpoints: a valid center admin access token.
+
+    Always fails when edge verification is not configured, since there is
+    then no key to check the token with.
+    """
+    token = bearer_token(request)
+    payload = verify_access_token(token) if token and (settings.jwt_key or key_set is not None) else None
+    if payload is None:
+        raise NotAuthenticated()
+    if payload.get("role") != ADMIN_ROLE:
+        raise PermissionRequired()
+    return payload
+
+
+def identity_headers(request: Request) -> list[tuple[str, str]]:
+    if settings.jwt_key is None and key_set is None:
+        return []
+
+    token = bearer_token(request)
+    if token is None:
+        return []
+
+    # Invalid or expired tokens are forwarded untouched rather than rejected:
+    # /auth/refresh and /auth/login must keep working with a stale token attached.
+    payload = verify_access_token(token)
+    if payload is None:
+        return []
+
+    headers = [
+        (USER_ID_HEADER, str(payload["sub"])),
+        (USER_EMAIL_HEADER, str(payload.get("email", ""))),
+        (USER_ROLE_HEADER, str(payload.get("role", ""))),
+        (TOKEN_EXP_HEADER, str(payload["exp"])),
+    ]
+    if payload.get("agency_id") is not None:
+        headers.append((AGENCY_ID_HEADER, str(payload["agency_id"])))
+    if payload.get("iat") is not None:
+        headers.append((TOKEN_IAT_HEADER, str(payload["iat"])))
+    if settings.gateway_shared_secret:
+        headers.append((GATEWAY_TOKEN_HEADER, settings.gateway_shared_secret))
+    return headers
@@ -0,0 +1,115 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+import httpx
+from jwt import PyJWK, PyJWKSet
+from jwt.exceptions import PyJWKError, PyJWKSetError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class KeySet:
+    """
+    Public keys published by the user service's JWKS endpoint, indexed by ``kid``.
+
+    Keys are fetched in the background every ``refresh_seconds`` and swapped
+    in as a whole, so verification is a dict lookup and never waits on the
+    network. A token with an unknown ``kid`` (a key rotated in since the last
+    fetch) schedules an early refresh, rate limited to one per
+    ``min_refresh_seconds``, and fails until it lands.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_seconds: float = 300.0,
+        min_refresh_seconds: float = 10.0,
+        timeout: float = 5.0,
+    ) -> None:
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self.timeout = timeout
+
+        self._keys: dict[str, PyJWK] = {}
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._pending: asyncio.Task | None = None
+        self._last_attempt = 0.0
+        self.refreshes = 0
+        self.failures = 0
+        self.unknown_kids = 0
+
+    def get(self, kid: str | None) -> PyJWK | None:
+        key = self._keys.get(kid) if kid else None
+        if key is None:
+            self.unknown_kids += 1
+            self._schedule_refresh()
+        return key
+
+    def _schedule_refresh(self) -> None:
+        # Callers may run in the threadpool, so hop onto the loop that started us.
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._spawn_refresh)
+
+    def _spawn_refresh(self) -> None:
+        if self._pending is not None and not self._pending.done():
+            return
+        if time.monotonic() - self._last_attempt < self.min_refresh_seconds:
+            return
+        self._pending = asyncio.create_task(self.refresh())
+
+    async def refresh(self) -> None:
+        self._last_attempt = time.monotonic()
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        try:
+            response = await self._client.get(self.url)
+            response.raise_for_status()
+            jwks = PyJWKSet.from_dict(response.json())
+        except (httpx.HTTPError, ValueError, PyJWKError, PyJWKSetError) as exc:
+            # Keep serving the last good key set; tokens signed with known keys still verify.
+            self.failures += 1
+            logger.warning("JWKS refresh from %s failed: %s", self.url, exc)
+            return
+
+        self._keys = {key.key_id: key for key in jwks.keys if key.key_id}
+        self.refreshes += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await self.refresh()
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        await self.refresh()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._pending):
+            if task is not None:
+                task.cancel()
+        self._task = self._pending = self._loop = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "kids": sorted(self._keys),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "unknown_kids": self.unknown_kids,
+        }
+
+
+key_set = KeySet(settings.jwks_url, refresh_seconds=settings.jwks_refresh_seconds) if settings.jwks_url else None
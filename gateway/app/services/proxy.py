@@ -0,0 +1,378 @@
+import asyncio
+import hashlib
+import math
+import time
+
+import httpx
+from fastapi import Request
+from starlette.background import BackgroundTask
+from starlette.responses import Response, StreamingResponse
+
+from app.core.config import RoutePolicy, settings
+from app.core.exceptions import CircuitOpen, RouteNotFound, UpstreamTimeout, UpstreamUnavailable
+from app.services.auth import IDENTITY_HEADERS, USER_ID_HEADER, identity_headers
+from app.services.resilience import CLOSED, HALF_OPEN, CircuitBreaker, RetryBudget, UpstreamGuard
+from app.services.response_cache import CachedResponse, ResponseCache
+from app.services.tracing import TRACEPARENT_HEADER, tracer
+
+# Connection-scoped headers that must not be forwarded (RFC 9110, section 7.6.1).
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+})
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRYABLE_STATUSES = frozenset({502, 503, 504})
+
+# Trace context is generated here; whatever the client sent is replaced per upstream call.
+TRACE_HEADERS = frozenset({TRACEPARENT_HEADER, "tracestate"})
+
+# Set by the gateway's own server; forwarding the upstream copies would duplicate them.
+SERVER_HEADERS = frozenset({"date", "server"})
+
+# Cached bodies are stored decoded, so the upstream's encoding and length no longer apply.
+ENCODING_HEADERS = frozenset({"content-encoding", "content-length"})
+
+
+class ReverseProxy:
+    """
+    Streams requests to upstream services over pooled keep-alive clients.
+
+    One ``httpx.AsyncClient`` is kept per upstream for the lifetime of the
+    gateway, so connections are reused across requests. Request and response
+    bodies are passed through chunk by chunk and never buffered in full.
+    """
+
+    def __init__(self, routes: dict[str, str], cache: ResponseCache | None = None) -> None:
+        # Longest prefix first so nested prefixes win over their parents.
+        self.routes = sorted(routes.items(), key=lambda item: len(item[0]), reverse=True)
+        self.cache = cache
+        self.policies = sorted(settings.route_policies.items(), key=lambda item: len(item[0]), reverse=True)
+        self.guards = {
+            upstream: UpstreamGuard(
+                CircuitBreaker(
+                    window=settings.breaker_window,
+                    min_calls=settings.breaker_min_calls,
+                    error_rate=settings.breaker_error_rate,
+                    slow_call_seconds=settings.breaker_slow_call_seconds,
+                    slow_call_rate=settings.breaker_slow_call_rate,
+                    open_seconds=settings.breaker_open_seconds,
+                    half_open_calls=settings.breaker_half_open_calls,
+                ),
+                RetryBudget(settings.retry_budget_ratio, settings.retry_budget_min_per_second),
+            )
+            for _, upstream in self.routes
+        }
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    async def start(self) -> None:
+        limits = httpx.Limits(
+            max_connections=settings.upstream_max_connections,
+            max_keepalive_connections=settings.upstream_max_keepalive_connections,
+            keepalive_expiry=settings.upstream_keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            connect=settings.upstream_connect_timeout,
+            read=settings.upstream_read_timeout,
+            write=settings.upstream_write_timeout,
+            pool=settings.upstream_pool_timeout,
+        )
+        for _, upstream in self.routes:
+            if upstream not in self._clients:
+                self._clients[upstream] = httpx.AsyncClient(
+                    base_url=upstream,
+                    limits=limits,
+                    timeout=timeout,
+                    follow_redirects=False,
+                )
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def policy_for(self, path: str) -> RoutePolicy:
+        for prefix, policy in self.policies:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return policy
+        return RoutePolicy()
+
+    def resolve(self, path: str) -> str:
+        for prefix, upstream in self.routes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return upstream
+        raise RouteNotFound(path)
+
+    @staticmethod
+    def forward_headers(request: Request) -> list[tuple[str, str]]:
+        headers = [
+            (name, value)
+            for name, value in request.headers.items()
+            if name not in HOP_BY_HOP_HEADERS
+            and name not in IDENTITY_HEADERS
+            and name not in TRACE_HEADERS
+            and name != "host"
+            and not name.startswith("x-forwarded-")
+        ]
+
+        client_host = request.client.host if request.client else ""
+        forwarded_for = request.headers.get("x-forwarded-for")
+        headers.append(("x-forwarded-for", f"{forwarded_for}, {client_host}" if forwarded_for else client_host))
+        headers.append(("x-forwarded-proto", request.url.scheme))
+        headers.append(("x-forwarded-host", request.headers.get("host", "")))
+        headers.extend(identity_headers(request))
+        return headers
+
+    async def send_once(
+        self,
+        upstream: str,
+        request: Request,
+        headers: list[tuple[str, str]],
+        has_body: bool,
+    ) -> httpx.Response:
+        with tracer.span("proxy", upstream=upstream, method=request.method) as span:
+            # Each attempt, retry or hedge gets its own span, so upstreams see it as their parent.
+            context = span or tracer.current_span()
+            if context is not None:
+                headers = [*headers, (TRACEPARENT_HEADER, context.traceparent)]
+            response = await self._send_once(upstream, request, headers, has_body)
+            if span is not None:
+                span.attributes["http.status_code"] = response.status_code
+            return response
+
+    async def _send_once(
+        self,
+        upstream: str,
+        request: Request,
+        headers: list[tuple[str, str]],
+        has_body: bool,
+    ) -> httpx.Response:
+        guard = self.guards[upstream]
+        upstream_request = self._clients[upstream].build_request(
+            request.method,
+            request.url.path,
+            params=request.url.query.encode(),
+            headers=headers,
+            content=request.stream() if has_body else None,
+        )
+
+        started = time.perf_counter()
+        try:
+            response = await self._clients[upstream].send(upstream_request, stream=True)
+        except httpx.TimeoutException:
+            guard.breaker.record(failed=True, latency=time.perf_counter() - started)
+            raise UpstreamTimeout()
+        except httpx.TransportError:
+            guard.breaker.record(failed=True, latency=time.perf_counter() - started)
+            raise UpstreamUnavailable()
+
+        latency = time.perf_counter() - started
+        guard.breaker.record(failed=response.status_code >= 500, latency=latency)
+        guard.latency.record(latency)
+        return response
+
+    async def send_hedged(
+        self,
+        upstream: str,
+        request: Request,
+        headers: list[tuple[str, str]],
+        delay: float,
+    ) -> httpx.Response:
+        """
+        Send a GET and, if it is still pending after ``delay``, race a second copy.
+
+        The first response with a non-retryable status wins. A 502/503/504 or
+        an error only counts while the other attempt is still pending; if both
+        fail, the retryable response (else the last error) is what the caller
+        gets. Every response that is not returned is closed, and a pending
+        loser is cancelled, so no connection is left checked out of the pool.
+        """
+        guard = self.guards[upstream]
+        primary = asyncio.ensure_future(self.send_once(upstream, request, headers, has_body=False))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not guard.budget.try_spend():
+            return await primary
+
+        guard.hedges += 1
+        hedge = asyncio.ensure_future(self.send_once(upstream, request, headers, has_body=False))
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        fallback: tuple[asyncio.Future, httpx.Response] | None = None
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner: tuple[asyncio.Future, httpx.Response] | None = None
+                # Both attempts can finish in the same wakeup; pick one, close the rest.
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif winner is None and task.result().status_code not in RETRYABLE_STATUSES:
+                        winner = (task, task.result())
+                    elif fallback is None:
+                        fallback = (task, task.result())
+                    else:
+                        await task.result().aclose()
+
+                if winner is not None or not pending:
+                    chosen = winner or fallback
+                    if chosen is None:
+                        raise error
+                    if fallback is not None and fallback is not chosen:
+                        await fallback[1].aclose()
+                    if chosen[0] is hedge:
+                        guard.hedge_wins += 1
+                    return chosen[1]
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(self._close_abandoned)
+
+    @staticmethod
+    def _close_abandoned(task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is None:
+            asyncio.ensure_future(task.result().aclose())
+
+    async def send(self, upstream: str, request: Request, headers: list[tuple[str, str]]) -> httpx.Response:
+        guard = self.guards[upstream]
+        if not guard.breaker.allow():
+            raise CircuitOpen(math.ceil(guard.breaker.retry_after()) or 1)
+        guard.budget.record_request()
+        probing = guard.breaker.state == HALF_OPEN
+        try:
+            return await self._send_with_retries(upstream, request, headers, guard, probing)
+        except BaseException:
+            # A probe cancelled (client gone, shutdown) or failed before the upstream
+            # answered leaves no verdict; give its half-open slot back instead of
+            # holding it forever. No-op once a recorded failure re-opened the breaker.
+            if probing:
+                guard.breaker.release()
+            raise
+
+    async def _send_with_retries(
+        self,
+        upstream: str,
+        request: Request,
+        headers: list[tuple[str, str]],
+        guard: UpstreamGuard,
+        probing: bool,
+    ) -> httpx.Response:
+        has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+        policy = self.policy_for(request.url.path)
+        replayable = request.method in IDEMPOTENT_METHODS and not has_body
+        retries_left = policy.max_retries if replayable else 0
+
+        def may_retry() -> bool:
+            # Never retry into an upstream whose breaker has started tripping.
+            return retries_left > 0 and guard.breaker.state == CLOSED and guard.budget.try_spend()
+
+        while True:
+            try:
+                # One allow() is one probe while half-open, so probes are never hedged.
+                delay = guard.latency.percentile(policy.hedge_percentile) if policy.hedge and not probing else None
+                if replayable and request.method == "GET" and delay is not None:
+                    response = await self.send_hedged(upstream, request, headers, delay)
+                else:
+                    response = await self.send_once(upstream, request, headers, has_body)
+            except (UpstreamTimeout, UpstreamUnavailable):
+                if not may_retry():
+                    raise
+            else:
+                if response.status_code not in RETRYABLE_STATUSES or not may_retry():
+                    return response
+                await response.aclose()
+
+            retries_left -= 1
+            guard.retries += 1
+
+    @staticmethod
+    def stream_response(upstream_response: httpx.Response) -> StreamingResponse:
+        response = StreamingResponse(
+            upstream_response.aiter_raw(),
+            status_code=upstream_response.status_code,
+            background=BackgroundTask(upstream_response.aclose),
+        )
+        # Rebuild the raw header list so repeated headers such as Set-Cookie survive intact.
+        response.raw_headers = [
+            (name, value)
+            for name, value in upstream_response.headers.raw
+            if name.lower().decode("latin-1") not in HOP_BY_HOP_HEADERS | SERVER_HEADERS
+        ]
+        return response
+
+    async def fetch_cacheable(
+        self,
+        upstream: str,
+        request: Request,
+        headers: list[tuple[str, str]],
+        ttl: float,
+    ) -> CachedResponse:
+        # The cache validates against its own ETag, so upstream conditionals are not forwarded.
+        headers = [(name, value) for name, value in headers if name not in ("if-none-match", "if-modified-since")]
+        upstream_response = await self.send(upstream, request, headers)
+        try:
+            body = await upstream_response.aread()
+        finally:
+            await upstream_response.aclose()
+
+        cache_control = upstream_response.headers.get("cache-control", "").lower()
+        raw_headers = [
+            (name, value)
+            for name, value in upstream_response.headers.raw
+            if name.lower().decode("latin-1") not in HOP_BY_HOP_HEADERS | SERVER_HEADERS | ENCODING_HEADERS
+        ]
+        return CachedResponse(
+            status_code=upstream_response.status_code,
+            raw_headers=raw_headers,
+            body=body,
+            etag=upstream_response.headers.get("etag") or ResponseCache.make_etag(body),
+            expires_at=time.monotonic() + ttl,
+            cacheable=(
+                upstream_response.status_code == 200
+                and "set-cookie" not in upstream_response.headers
+                and "no-store" not in cache_control
+            ),
+        )
+
+    @staticmethod
+    def cache_identity(request: Request, headers: list[tuple[str, str]]) -> str:
+        for name, value in headers:
+            if name == USER_ID_HEADER:
+                return f"user:{value}"
+        authorization = request.headers.get("authorization")
+        if authorization:
+            return "auth:" + hashlib.sha256(authorization.encode()).hexdigest()
+        return "anonymous"
+
+    async def forward(self, request: Request) -> Response:
+        upstream = self.resolve(request.url.path)
+        headers = self.forward_headers(request)
+
+        ttl = self.cache.ttl_for(request.url.path) if self.cache and request.method == "GET" else None
+        if ttl is None:
+            upstream_response = await self.send(upstream, request, headers)
+            if self.cache and request.method not in IDEMPOTENT_METHODS:
+                self.cache.invalidate(request.url.path)
+            return self.stream_response(upstream_response)
+
+        key = self.cache.key(request.url.path, request.url.query, self.cache_identity(request, headers))
+        entry, cache_status = await self.cache.get_or_fetch(
+            key, lambda: self.fetch_cacheable(upstream, request, headers, ttl)
+        )
+        return entry.to_response(request.headers.get("if-none-match"), cache_status)
+
+
+proxy = ReverseProxy(
+    settings.routes,
+    cache=ResponseCache(
+        settings.cache_rules,
+        max_bytes=settings.cache_max_bytes,
+        max_entry_bytes=settings.cache_max_entry_bytes,
+    ),
+)
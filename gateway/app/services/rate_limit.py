@@ -0,0 +1,54 @@
+import json
+import math
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.token_bucket import TokenBucketLimiter
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying per-IP token buckets to selected path prefixes.
+
+    Only requests to a configured prefix touch a bucket; everything else
+    passes straight through.
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict[str, tuple[float, int]]) -> None:
+        self.app = app
+        self.limiters = sorted(
+            ((prefix, TokenBucketLimiter(per_minute, burst)) for prefix, (per_minute, burst) in limits.items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.limiters:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        for prefix, limiter in self.limiters:
+            if path == prefix or path.startswith(prefix + "/"):
+                client = scope.get("client")
+                retry_after = limiter.acquire(client[0] if client else "")
+                if retry_after:
+                    await self.reject(send, math.ceil(retry_after))
+                    return
+                break
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def reject(send: Send, retry_after: int) -> None:
+        body = json.dumps({"detail": "Too many requests, please retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,219 @@
+import time
+from collections import deque
+from typing import Any
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Trips when recent calls to an upstream fail or run slow too often.
+
+    The last ``window`` outcomes are kept with running totals, so recording
+    and checking a call are O(1). Once tripped the breaker rejects calls for
+    ``open_seconds``, then lets ``half_open_calls`` probes through; it closes
+    again only if every probe succeeds.
+    """
+
+    def __init__(
+        self,
+        window: int,
+        min_calls: int,
+        error_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        open_seconds: float,
+        half_open_calls: int,
+    ) -> None:
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = CLOSED
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window)
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        self.trips = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probes_started = 0
+            self._probes_succeeded = 0
+
+        if self.state == HALF_OPEN:
+            if self._probes_started >= self.half_open_calls:
+                self.rejected += 1
+                return False
+            self._probes_started += 1
+
+        return True
+
+    def release(self) -> None:
+        """Give back a half-open probe that ended without an outcome, e.g. because it was cancelled."""
+        if self.state == HALF_OPEN and self._probes_started > self._probes_succeeded:
+            self._probes_started -= 1
+
+    def record(self, failed: bool, latency: float) -> None:
+        slow = latency >= self.slow_call_seconds
+
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._trip()
+                return
+            self._probes_succeeded += 1
+            if self._probes_succeeded >= self.half_open_calls:
+                self._reset()
+            return
+
+        if len(self._outcomes) == self._outcomes.maxlen:
+            old_failed, old_slow = self._outcomes[0]
+            self._failures -= old_failed
+            self._slow -= old_slow
+        self._outcomes.append((failed, slow))
+        self._failures += failed
+        self._slow += slow
+
+        calls = len(self._outcomes)
+        if calls >= self.min_calls and (
+            self._failures / calls >= self.error_rate or self._slow / calls >= self.slow_call_rate
+        ):
+            self._trip()
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.trips += 1
+
+    def _reset(self) -> None:
+        self.state = CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def stats(self) -> dict[str, Any]:
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "error_rate": self._failures / calls if calls else 0.0,
+            "slow_call_rate": self._slow / calls if calls else 0.0,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class RetryBudget:
+    """
+    Caps retries (and hedges) at a fraction of recent traffic.
+
+    Requests and retries are counted in one-second buckets over a sliding
+    window; a retry is allowed only while retries stay under
+    ``ratio * requests`` plus a small per-second floor, so retries can never
+    multiply load on an upstream that is already struggling.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, window_seconds: int = 10) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window_seconds = window_seconds
+        self._buckets: deque[list[int]] = deque()  # [second, requests, retries]
+        self._requests = 0
+        self._retries = 0
+        self.denied = 0
+
+    def _bucket(self) -> list[int]:
+        now = int(time.monotonic())
+        while self._buckets and self._buckets[0][0] <= now - self.window_seconds:
+            _, requests, retries = self._buckets.popleft()
+            self._requests -= requests
+            self._retries -= retries
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+        return self._buckets[-1]
+
+    def record_request(self) -> None:
+        self._bucket()[1] += 1
+        self._requests += 1
+
+    def try_spend(self) -> bool:
+        bucket = self._bucket()
+        allowed = self.ratio * self._requests + self.min_per_second * self.window_seconds
+        if self._retries + 1 > allowed:
+            self.denied += 1
+            return False
+        bucket[2] += 1
+        self._retries += 1
+        return True
+
+    def stats(self) -> dict[str, Any]:
+        self._bucket()
+        return {
+            "requests": self._requests,
+            "retries": self._retries,
+            "denied": self.denied,
+            "ratio": self.ratio,
+        }
+
+
+class LatencyTracker:
+    """Recent response latencies with a lazily refreshed percentile."""
+
+    def __init__(self, size: int = 512, refresh_every: int = 32) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._refresh_every = refresh_every
+        self._since_refresh = 0
+        self._cached: dict[float, float] = {}
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+        self._since_refresh += 1
+        if self._since_refresh >= self._refresh_every:
+            self._cached.clear()
+            self._since_refresh = 0
+
+    def percentile(self, q: float, min_samples: int = 20) -> float | None:
+        if len(self._samples) < min_samples:
+            return None
+        if q not in self._cached:
+            ordered = sorted(self._samples)
+            self._cached[q] = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+        return self._cached[q]
+
+
+class UpstreamGuard:
+    """Breaker, retry budget and latency history for one upstream."""
+
+    def __init__(self, breaker: CircuitBreaker, budget: RetryBudget) -> None:
+        self.breaker = breaker
+        self.budget = budget
+        self.latency = LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            "retry_budget": self.budget.stats(),
+            "latency_p50_seconds": self.latency.percentile(0.50, min_samples=1),
+            "latency_p95_seconds": self.latency.percentile(0.95, min_samples=1),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
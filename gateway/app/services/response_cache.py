@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from starlette.responses import Response
+
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    raw_headers: list[tuple[bytes, bytes]]
+    body: bytes
+    etag: str
+    expires_at: float
+    cacheable: bool = True
+    size: int = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.size = len(self.body) + sum(len(name) + len(value) for name, value in self.raw_headers)
+
+    def matches(self, if_none_match: str | None) -> bool:
+        if not if_none_match or self.status_code != 200:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or self.etag.removeprefix("W/") in candidates
+
+    def to_response(self, if_none_match: str | None, cache_status: str) -> Response:
+        if self.matches(if_none_match):
+            response = Response(status_code=304)
+            response.raw_headers = [
+                (name, value) for name, value in self.raw_headers
+                if name.lower() in (b"cache-control", b"vary", b"expires")
+            ]
+        else:
+            response = Response(content=self.body, status_code=self.status_code)
+            response.raw_headers = [
+                (name, value) for name, value in self.raw_headers
+                if name.lower() not in (b"etag", b"content-length")
+            ]
+            response.raw_headers.append((b"content-length", str(len(self.body)).encode()))
+
+        response.raw_headers.append((b"etag", self.etag.encode()))
+        response.raw_headers.append((b"x-cache", cache_status.encode()))
+        return response
+
+
+class ResponseCache:
+    """
+    Memory-bounded LRU cache of upstream GET responses with single-flight fills.
+
+    Routes opt in through ``rules``, a mapping of path pattern to TTL in
+    seconds; a pattern matches whole paths and ``*`` stands for one path
+    segment. Concurrent misses for the same key share one upstream request,
+    so a burst of identical requests after a deploy costs a single fetch.
+    A write through the gateway invalidates the cached responses for its
+    path and the paths above it.
+    """
+
+    def __init__(self, rules: dict[str, float], max_bytes: int, max_entry_bytes: int) -> None:
+        # Literal segments before wildcards, so "/agency/me" can override "/agency/*".
+        self.rules = sorted(
+            ((tuple(pattern.split("/")), ttl) for pattern, ttl in rules.items()),
+            key=lambda rule: rule[0].count("*"),
+        )
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._keys_by_path: dict[str, set[str]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._bytes = 0
+        # Bumped by every invalidation; fills that started before one are not stored.
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def ttl_for(self, path: str) -> float | None:
+        segments = path.split("/")
+        for pattern, ttl in self.rules:
+            if len(pattern) == len(segments) and all(
+                expected == segment or (expected == "*" and segment)
+                for expected, segment in zip(pattern, segments)
+            ):
+                return ttl
+        return None
+
+    @staticmethod
+    def key(path: str, query: str, identity: str) -> str:
+        return f"{identity}|{path}?{query}"
+
+    @staticmethod
+    def path_of(key: str) -> str:
+        return key.split("|", 1)[1].split("?", 1)[0]
+
+    @staticmethod
+    def make_etag(body: bytes) -> str:
+        return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedResponse) -> None:
+        if not entry.cacheable or entry.size > self.max_entry_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self._keys_by_path.setdefault(self.path_of(key), set()).add(key)
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes and self._entries:
+            oldest, _ = next(iter(self._entries.items()))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+            path = self.path_of(key)
+            keys = self._keys_by_path[path]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_path[path]
+
+    def invalidate(self, path: str) -> None:
+        """Drop every identity's cached responses for ``path`` and its parent paths."""
+        self._generation += 1
+        segments = path.rstrip("/").split("/")
+        for depth in range(2, len(segments) + 1):
+            for key in list(self._keys_by_path.get("/".join(segments[:depth]), ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[CachedResponse]],
+    ) -> tuple[CachedResponse, str]:
+        entry = self.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry, "HIT"
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future), "COALESCED"
+
+        self.misses += 1
+        generation = self._generation
+        future = asyncio.ensure_future(fetch())
+        self._inflight[key] = future
+
+        def settle(done: asyncio.Future) -> None:
+            self._inflight.pop(key, None)
+            # A write that landed while the fetch was in flight may have made it stale.
+            if not done.cancelled() and done.exception() is None and generation == self._generation:
+                self.put(key, done.result())
+
+        future.add_done_callback(settle)
+        # Shielded so that one client disconnecting does not cancel the fetch for everyone else.
+        return await asyncio.shield(future), "MISS"
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,112 @@
+"""
+Throughput benchmark for the gateway against local stub upstreams.
+
+Starts ``benchmarks.stub_upstream`` and the gateway as uvicorn processes,
+then drives the same request mix directly at the stub and through the
+gateway, so the difference is the cost of the proxy hop.
+
+Usage (from gateway/):
+    python -m benchmarks.bench_proxy --concurrency 64 --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+REQUEST_MIX = [
+    ("GET", "/auth/verify", None),
+    ("GET", "/agency/7", None),
+    ("POST", "/auth/login", b"username=bench%40example.com&password=secret"),
+]
+
+
+def start_server(app: str, port: int, env: dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env={**os.environ, **env},
+    )
+
+
+async def wait_until_up(url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def drive(base_url: str, concurrency: int, total: int) -> tuple[float, list[float]]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies: list[float] = []
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        async def worker() -> None:
+            for i in counter:
+                method, path, body = REQUEST_MIX[i % len(REQUEST_MIX)]
+                headers = {"content-type": "application/x-www-form-urlencoded"} if body else None
+                started = time.perf_counter()
+                response = await client.request(method, path, content=body, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started, latencies
+
+
+def report(label: str, elapsed: float, latencies: list[float]) -> None:
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    print(
+        f"{label:<10} {len(latencies) / elapsed:10.0f} req/s"
+        f"   p50 {pct(0.50):6.2f} ms   p95 {pct(0.95):6.2f} ms   p99 {pct(0.99):6.2f} ms"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}"
+    gateway_url = f"http://127.0.0.1:{args.gateway_port}"
+    servers = [
+        start_server("benchmarks.stub_upstream:app", args.upstream_port, {}),
+        start_server(
+            "app.main:app",
+            args.gateway_port,
+            {"USER_SERVICE_URL": upstream_url, "SCHEDULING_SERVICE_URL": upstream_url},
+        ),
+    ]
+    try:
+        await wait_until_up(f"{upstream_url}/auth/verify")
+        await wait_until_up(f"{gateway_url}/health")
+
+        # Warm up keep-alive pools on both paths before measuring.
+        await drive(upstream_url, args.concurrency, args.concurrency * 4)
+        await drive(gateway_url, args.concurrency, args.concurrency * 4)
+
+        report("direct", *await drive(upstream_url, args.concurrency, args.requests))
+        report("gateway", *await drive(gateway_url, args.concurrency, args.requests))
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--upstream-port", type=int, default=18001)
+    parser.add_argument("--gateway-port", type=int, default=18000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Minimal upstream used by the proxy benchmark, serving fixed responses."""
+from fastapi import FastAPI, Request, Response
+
+app = FastAPI()
+
+PAYLOAD = b'{"id":1,"email":"bench@example.com","role":"agency_manager","agency_id":1}'
+
+
+@app.get("/auth/verify")
+async def verify() -> Response:
+    return Response(PAYLOAD, media_type="application/json")
+
+
+@app.post("/auth/login")
+async def login(request: Request) -> Response:
+    await request.body()
+    response = Response(PAYLOAD, media_type="application/json")
+    response.set_cookie("refresh_token", "r" * 180, httponly=True, path="/auth/refresh")
+    response.set_cookie("csrf_token", "c" * 22, path="/auth/refresh")
+    return response
+
+
+@app.get("/agency/{agency_id}")
+async def agency(agency_id: int) -> Response:
+    return Response(b'{"id":%d,"name":"bench"}' % agency_id, media_type="application/json")
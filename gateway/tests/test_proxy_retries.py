@@ -0,0 +1,174 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.core.config import RoutePolicy
+from app.core.exceptions import UpstreamUnavailable
+from app.services.proxy import ReverseProxy
+from app.services.resilience import OPEN
+
+UPSTREAM = "http://upstream"
+
+
+class FakeResponse:
+    def __init__(self, status_code: int) -> None:
+        self.status_code = status_code
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def get_request(path: str = "/agency") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+@pytest.fixture
+def proxy() -> ReverseProxy:
+    return ReverseProxy({"/agency": UPSTREAM})
+
+
+def script(proxy: ReverseProxy, monkeypatch, *attempts: tuple[float, object]) -> list[FakeResponse]:
+    """Replace send_once with attempts that each take ``delay`` seconds, then return or raise ``outcome``."""
+    remaining = list(attempts)
+    returned: list[FakeResponse] = []
+
+    async def send_once(upstream, request, headers, has_body):
+        delay, outcome = remaining.pop(0)
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = FakeResponse(outcome)
+        returned.append(response)
+        return response
+
+    monkeypatch.setattr(proxy, "send_once", send_once)
+    return returned
+
+
+async def test_fast_primary_is_not_hedged(proxy, monkeypatch):
+    script(proxy, monkeypatch, (0.0, 200))
+
+    response = await proxy.send_hedged(UPSTREAM, get_request(), [], delay=0.05)
+
+    assert response.status_code == 200
+    assert proxy.guards[UPSTREAM].hedges == 0
+
+
+async def test_hedge_wins_and_the_slow_primary_is_cancelled(proxy, monkeypatch):
+    returned = script(proxy, monkeypatch, (1.0, 200), (0.0, 200))
+
+    response = await proxy.send_hedged(UPSTREAM, get_request(), [], delay=0.01)
+
+    assert returned == [response]
+    guard = proxy.guards[UPSTREAM]
+    assert (guard.hedges, guard.hedge_wins) == (1, 1)
+
+
+async def test_attempts_finishing_together_close_the_loser(proxy, monkeypatch):
+    # The hedge releases the primary as it returns, so both are done when send_hedged wakes up.
+    release = asyncio.Event()
+    responses: list[FakeResponse] = []
+    calls = 0
+
+    async def send_once(upstream, request, headers, has_body):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await release.wait()
+        else:
+            release.set()
+        response = FakeResponse(200)
+        responses.append(response)
+        return response
+
+    monkeypatch.setattr(proxy, "send_once", send_once)
+    response = await proxy.send_hedged(UPSTREAM, get_request(), [], delay=0.01)
+
+    assert len(responses) == 2
+    assert [r.closed for r in responses if r is not response] == [True]
+    assert not response.closed
+
+
+async def test_retryable_status_loses_to_a_pending_attempt(proxy, monkeypatch):
+    returned = script(proxy, monkeypatch, (0.02, 503), (0.05, 200))
+
+    response = await proxy.send_hedged(UPSTREAM, get_request(), [], delay=0.01)
+
+    assert response.status_code == 200
+    assert returned[0].status_code == 503 and returned[0].closed
+
+
+async def test_both_retryable_returns_one_and_closes_the_other(proxy, monkeypatch):
+    returned = script(proxy, monkeypatch, (0.02, 503), (0.05, 502))
+
+    response = await proxy.send_hedged(UPSTREAM, get_request(), [], delay=0.01)
+
+    assert response.status_code == 503
+    assert [r.closed for r in returned] == [False, True]
+
+
+async def test_error_loses_to_a_pending_attempt_and_surfaces_when_both_fail(proxy, monkeypatch):
+    script(proxy, monkeypatch, (0.02, UpstreamUnavailable()), (0.05, 200))
+    assert (await proxy.send_hedged(UPSTREAM, get_request(), [], delay=0.01)).status_code == 200
+
+    script(proxy, monkeypatch, (0.02, UpstreamUnavailable()), (0.05, UpstreamUnavailable()))
+    with pytest.raises(UpstreamUnavailable):
+        await proxy.send_hedged(UPSTREAM, get_request(), [], delay=0.01)
+
+
+async def test_retries_a_retryable_status_within_the_policy(proxy, monkeypatch):
+    monkeypatch.setattr(proxy, "policy_for", lambda path: RoutePolicy(max_retries=1))
+    returned = script(proxy, monkeypatch, (0.0, 503), (0.0, 200))
+
+    response = await proxy.send(UPSTREAM, get_request(), [])
+
+    assert response.status_code == 200
+    assert returned[0].closed
+    assert proxy.guards[UPSTREAM].retries == 1
+
+
+async def test_no_retry_once_the_budget_is_spent(proxy, monkeypatch):
+    monkeypatch.setattr(proxy, "policy_for", lambda path: RoutePolicy(max_retries=3))
+    guard = proxy.guards[UPSTREAM]
+    monkeypatch.setattr(guard.budget, "try_spend", lambda: False)
+    script(proxy, monkeypatch, (0.0, 503))
+
+    response = await proxy.send(UPSTREAM, get_request(), [])
+
+    assert response.status_code == 503
+    assert guard.retries == 0
+
+
+async def test_no_retry_into_a_tripping_breaker(proxy, monkeypatch):
+    monkeypatch.setattr(proxy, "policy_for", lambda path: RoutePolicy(max_retries=3))
+    guard = proxy.guards[UPSTREAM]
+
+    async def send_once(upstream, request, headers, has_body):
+        guard.breaker.state = OPEN
+        raise UpstreamUnavailable()
+
+    monkeypatch.setattr(proxy, "send_once", send_once)
+
+    with pytest.raises(UpstreamUnavailable):
+        await proxy.send(UPSTREAM, get_request(), [])
+    assert guard.retries == 0
+
+
+async def test_a_cancelled_probe_releases_its_half_open_slot(proxy, monkeypatch):
+    guard = proxy.guards[UPSTREAM]
+    breaker = guard.breaker
+    for _ in range(breaker.min_calls):
+        breaker.record(failed=True, latency=0.01)
+    breaker._opened_at -= breaker.open_seconds
+    script(proxy, monkeypatch, *[(10.0, 200)] * breaker.half_open_calls)
+
+    probes = [asyncio.ensure_future(proxy.send(UPSTREAM, get_request(), [])) for _ in range(breaker.half_open_calls)]
+    await asyncio.sleep(0)
+    assert not breaker.allow()
+    for probe in probes:
+        probe.cancel()
+    await asyncio.gather(*probes, return_exceptions=True)
+
+    assert breaker.allow()
@@ -0,0 +1,168 @@
+import pytest
+
+from app.services import resilience
+from app.services.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LatencyTracker, RetryBudget
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, "time", clock)
+    return clock
+
+
+def breaker(**overrides) -> CircuitBreaker:
+    options = dict(
+        window=10, min_calls=4, error_rate=0.5, slow_call_seconds=1.0,
+        slow_call_rate=0.5, open_seconds=10.0, half_open_calls=2,
+    )
+    return CircuitBreaker(**(options | overrides))
+
+
+def trip(b: CircuitBreaker) -> None:
+    for _ in range(b.min_calls):
+        b.record(failed=True, latency=0.01)
+
+
+def test_opens_on_error_rate_once_min_calls_are_seen(clock):
+    b = breaker()
+    b.record(failed=True, latency=0.01)
+    b.record(failed=True, latency=0.01)
+    b.record(failed=False, latency=0.01)
+    assert b.state == CLOSED  # 3 calls < min_calls
+
+    b.record(failed=False, latency=0.01)
+
+    assert b.state == OPEN
+    assert not b.allow()
+    assert b.stats()["rejected"] == 1
+
+
+def test_opens_on_slow_call_rate(clock):
+    b = breaker()
+    for latency in (2.0, 0.01, 2.0, 0.01):
+        b.record(failed=False, latency=latency)
+
+    assert b.state == OPEN
+
+
+def test_old_outcomes_leave_the_window(clock):
+    b = breaker(window=4, min_calls=4)
+    b.record(failed=True, latency=0.01)
+    for _ in range(4):
+        b.record(failed=False, latency=0.01)
+    b.record(failed=True, latency=0.01)
+
+    assert b.state == CLOSED
+    assert b.stats()["error_rate"] == 0.25
+
+
+def test_half_opens_after_open_seconds_and_closes_when_probes_succeed(clock):
+    b = breaker()
+    trip(b)
+    clock.now += 9.9
+    assert not b.allow()
+    assert b.retry_after() == pytest.approx(0.1)
+
+    clock.now += 0.1
+    assert b.allow()
+    assert b.state == HALF_OPEN
+    assert b.allow()
+    assert not b.allow()  # only half_open_calls probes
+
+    b.record(failed=False, latency=0.01)
+    assert b.state == HALF_OPEN
+    b.record(failed=False, latency=0.01)
+    assert b.state == CLOSED
+    assert b.stats()["window_calls"] == 0
+
+
+def test_a_failed_or_slow_probe_reopens(clock):
+    for failed, latency in ((True, 0.01), (False, 5.0)):
+        b = breaker()
+        trip(b)
+        clock.now += 10
+        assert b.allow()
+        b.record(failed=failed, latency=latency)
+
+        assert b.state == OPEN
+        assert b.trips == 2
+
+
+def test_release_gives_back_an_unfinished_probe(clock):
+    b = breaker()
+    trip(b)
+    clock.now += 10
+    assert b.allow() and b.allow()
+    assert not b.allow()
+
+    b.release()
+
+    assert b.allow()
+
+
+def test_release_never_frees_a_probe_that_already_succeeded(clock):
+    b = breaker(half_open_calls=3)
+    trip(b)
+    clock.now += 10
+    assert b.allow()
+    b.record(failed=False, latency=0.01)
+
+    b.release()  # nothing left in flight
+
+    assert b.allow() and b.allow()
+    assert not b.allow()
+
+
+def test_release_is_a_no_op_outside_half_open(clock):
+    b = breaker()
+    b.release()
+    trip(b)
+    b.release()
+
+    assert b.state == OPEN
+
+
+def test_retry_budget_is_a_fraction_of_recent_requests(clock):
+    budget = RetryBudget(ratio=0.2, min_per_second=0.0, window_seconds=10)
+    for _ in range(10):
+        budget.record_request()
+
+    assert budget.try_spend()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    assert budget.stats() == {"requests": 10, "retries": 2, "denied": 1, "ratio": 0.2}
+
+
+def test_retry_budget_floor_and_window(clock):
+    budget = RetryBudget(ratio=0.0, min_per_second=0.1, window_seconds=10)
+    assert budget.try_spend()  # the floor allows one retry per window
+    assert not budget.try_spend()
+
+    clock.now += 10  # the spent retry's bucket leaves the window
+
+    assert budget.try_spend()
+
+
+def test_latency_percentile_needs_samples_and_refreshes_lazily():
+    tracker = LatencyTracker(size=100, refresh_every=10)
+    for latency in range(1, 20):
+        tracker.record(latency / 100)
+    assert tracker.percentile(0.5) is None
+
+    tracker.record(0.20)
+    assert tracker.percentile(0.5) == 0.11
+
+    for _ in range(9):
+        tracker.record(5.0)
+    assert tracker.percentile(0.5) == 0.11  # cached until refresh_every new samples
+    tracker.record(5.0)
+    assert tracker.percentile(0.5) == 0.16
@@ -0,0 +1,263 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from app.services import response_cache
+from app.services.proxy import ReverseProxy
+from app.services.response_cache import CachedResponse, ResponseCache
+
+UPSTREAM = "http://upstream"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    return clock
+
+
+def entry(body: bytes = b"{}", status_code: int = 200, ttl: float = 60.0, **options) -> CachedResponse:
+    return CachedResponse(
+        status_code=status_code,
+        raw_headers=[(b"content-type", b"application/json"), (b"cache-control", b"max-age=60")],
+        body=body,
+        etag=ResponseCache.make_etag(body),
+        expires_at=1000.0 + ttl,
+        **options,
+    )
+
+
+def cache(max_bytes: int = 1 << 20, max_entry_bytes: int = 1 << 16) -> ResponseCache:
+    return ResponseCache({"/agency": 60.0, "/agency/*": 30.0, "/agency/me": 5.0}, max_bytes, max_entry_bytes)
+
+
+def key(path: str, identity: str = "user:1") -> str:
+    return ResponseCache.key(path, "", identity)
+
+
+def test_literal_rules_win_over_wildcards_and_wildcards_need_a_segment():
+    rules = cache()
+
+    assert rules.ttl_for("/agency/me") == 5.0
+    assert rules.ttl_for("/agency/7") == 30.0
+    assert rules.ttl_for("/agency") == 60.0
+    assert rules.ttl_for("/agency/") is None
+    assert rules.ttl_for("/agency/7/slots") is None
+
+
+def test_entries_expire(clock):
+    responses = cache()
+    responses.put(key("/agency"), entry(ttl=10))
+
+    clock.now += 9.9
+    assert responses.get(key("/agency")) is not None
+    clock.now += 0.1
+    assert responses.get(key("/agency")) is None
+    assert responses.stats()["bytes"] == 0
+
+
+def test_byte_budget_evicts_least_recently_used_entries(clock):
+    size = entry().size
+    responses = cache(max_bytes=2 * size)
+    responses.put(key("/agency/1"), entry())
+    responses.put(key("/agency/2"), entry())
+
+    responses.get(key("/agency/1"))  # 2 is now the least recently used
+    responses.put(key("/agency/3"), entry())
+
+    assert responses.get(key("/agency/2")) is None
+    assert responses.get(key("/agency/1")) is not None
+    assert responses.get(key("/agency/3")) is not None
+    assert responses.stats()["bytes"] == 2 * size
+    assert responses.evictions == 1
+
+
+def test_one_large_entry_can_evict_several_small_ones(clock):
+    small = entry(b"x")
+    responses = cache(max_bytes=3 * small.size)
+    for n in range(3):
+        responses.put(key(f"/agency/{n}"), entry(b"x"))
+
+    responses.put(key("/agency/big"), entry(b"x" * (small.size + 2)))
+
+    assert responses.stats()["entries"] == 1
+    assert responses.evictions == 3
+
+
+def test_oversized_and_uncacheable_entries_are_not_stored(clock):
+    responses = cache(max_entry_bytes=100)
+
+    responses.put(key("/agency/1"), entry(b"x" * 100))
+    responses.put(key("/agency/2"), entry(cacheable=False))
+
+    assert responses.stats()["entries"] == 0
+
+
+def test_replacing_an_entry_keeps_the_byte_count_exact(clock):
+    responses = cache()
+    responses.put(key("/agency"), entry(b"short"))
+    responses.put(key("/agency"), entry(b"a longer body"))
+
+    assert responses.stats()["bytes"] == entry(b"a longer body").size
+
+
+async def test_concurrent_misses_share_one_fetch(clock):
+    responses = cache()
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch() -> CachedResponse:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return entry(b"shared")
+
+    waiters = [asyncio.create_task(responses.get_or_fetch(key("/agency"), fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == 1
+    assert sorted(status for _, status in results) == ["COALESCED"] * 4 + ["MISS"]
+    assert all(result is results[0][0] for result, _ in results)
+    assert (await responses.get_or_fetch(key("/agency"), fetch))[1] == "HIT"
+    assert calls == 1
+
+
+async def test_a_failed_fetch_reaches_every_waiter_and_is_not_cached(clock):
+    responses = cache()
+    release = asyncio.Event()
+
+    async def fetch() -> CachedResponse:
+        await release.wait()
+        raise httpx.ConnectError("down")
+
+    waiters = [asyncio.create_task(responses.get_or_fetch(key("/agency"), fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(result, httpx.ConnectError) for result in results)
+    assert responses.stats()["entries"] == 0
+    assert responses._inflight == {}
+
+
+async def test_a_cancelled_waiter_does_not_cancel_the_shared_fetch(clock):
+    responses = cache()
+    release = asyncio.Event()
+
+    async def fetch() -> CachedResponse:
+        await release.wait()
+        return entry()
+
+    first = asyncio.create_task(responses.get_or_fetch(key("/agency"), fetch))
+    second = asyncio.create_task(responses.get_or_fetch(key("/agency"), fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert (await second)[1] == "COALESCED"
+    assert responses.get(key("/agency")) is not None
+
+
+def test_invalidate_drops_the_path_and_its_parents_for_every_identity(clock):
+    responses = cache()
+    for path in ("/agency", "/agency/7", "/agency/8"):
+        for identity in ("user:1", "user:2"):
+            responses.put(key(path, identity), entry())
+
+    responses.invalidate("/agency/7/")
+
+    assert responses.get(key("/agency/8", "user:2")) is not None
+    assert [responses.get(key(path, "user:1")) for path in ("/agency", "/agency/7")] == [None, None]
+    assert responses.stats()["entries"] == 2
+    assert responses.invalidations == 4
+
+
+async def test_a_fill_racing_a_write_is_not_stored(clock):
+    responses = cache()
+    release = asyncio.Event()
+
+    async def fetch() -> CachedResponse:
+        await release.wait()
+        return entry(b"read before the write")
+
+    reader = asyncio.create_task(responses.get_or_fetch(key("/agency"), fetch))
+    await asyncio.sleep(0)
+    responses.invalidate("/agency")
+    release.set()
+
+    assert (await reader)[0].body == b"read before the write"
+    assert responses.get(key("/agency")) is None
+
+
+def test_matching_if_none_match_returns_304_without_a_body():
+    cached = entry(b'{"id": 7}')
+
+    response = cached.to_response(cached.etag, "HIT")
+
+    assert response.status_code == 304
+    assert response.body == b""
+    headers = dict(response.raw_headers)
+    assert headers[b"etag"] == cached.etag.encode()
+    assert headers[b"cache-control"] == b"max-age=60"
+    assert b"content-type" not in headers
+
+
+@pytest.mark.parametrize("if_none_match", ['"other", {etag}', "W/{etag}", "*"])
+def test_if_none_match_accepts_lists_weak_tags_and_wildcards(if_none_match):
+    cached = entry()
+
+    assert cached.to_response(if_none_match.format(etag=cached.etag), "HIT").status_code == 304
+
+
+def test_stale_etags_and_errors_get_the_full_response():
+    cached = entry(b'{"id": 7}')
+    error = entry(b"{}", status_code=404)
+
+    response = cached.to_response('"stale"', "MISS")
+    assert response.status_code == 200
+    assert response.body == b'{"id": 7}'
+    assert dict(response.raw_headers)[b"content-length"] == b"9"
+    assert dict(response.raw_headers)[b"x-cache"] == b"MISS"
+    assert error.to_response(error.etag, "HIT").status_code == 404
+
+
+def request(method: str, path: str, headers: dict[str, str] | None = None) -> Request:
+    raw = [(name.encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": method, "path": path, "query_string": b"", "headers": raw})
+
+
+async def test_writes_through_the_proxy_invalidate_cached_reads(monkeypatch):
+    proxy = ReverseProxy({"/agency": UPSTREAM}, cache=cache())
+    sent: list[str] = []
+
+    async def send(upstream, request, headers):
+        sent.append(request.method)
+        return httpx.Response(200, content=f"version {sent.count('POST')}".encode())
+
+    monkeypatch.setattr(proxy, "send", send)
+    auth = {"authorization": "Bearer token"}
+
+    first = await proxy.forward(request("GET", "/agency/7", auth))
+    etag = dict(first.raw_headers)[b"etag"].decode()
+    revalidated = await proxy.forward(request("GET", "/agency/7", auth | {"if-none-match": etag}))
+    assert (first.status_code, revalidated.status_code) == (200, 304)
+    assert dict(revalidated.raw_headers)[b"x-cache"] == b"HIT"
+
+    await proxy.forward(request("POST", "/agency/7", auth))
+    after = await proxy.forward(request("GET", "/agency/7", auth | {"if-none-match": etag}))
+
+    assert sent == ["GET", "POST", "GET"]
+    assert after.status_code == 200
+    assert after.body == b"version 1"
@@ -0,0 +1,84 @@
+"""
+Check that the modules copied between services are still identical.
+
+Each service is built and deployed on its own, so a few infrastructure
+modules are copied into every service that needs them instead of being
+installed from a shared package. Change one copy, then copy the file over
+the others; this script fails with a diff when they have drifted apart,
+and also when an identical copy exists that SHARED_MODULES does not list.
+
+Usage (from the repository root):
+    python scripts/check_shared_modules.py
+"""
+import difflib
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROJECTS = ["gateway", "services/user", "services/scheduling", "services/billing", "services/validation"]
+SERVICES = ["services/user", "services/scheduling"]
+
+SHARED_MODULES = {
+    "app/core/responses.py": SERVICES,
+    "app/db/base.py": [*SERVICES, "services/billing"],
+    "app/db/deps.py": SERVICES,
+    "app/db/pool.py": SERVICES,
+    "app/db/profiler.py": SERVICES,
+    "app/db/session.py": SERVICES,
+    "app/db/tracing.py": SERVICES,
+    "app/schemas/error.py": [*SERVICES, "services/validation"],
+    "app/schemas/profile.py": SERVICES,
+    "app/services/jwks.py": ["gateway", "services/scheduling"],
+    "app/services/metrics.py": SERVICES,
+    "app/services/sampling_profiler.py": SERVICES,
+    "app/services/token_bucket.py": ["gateway", "services/user"],
+    "app/services/tracing.py": ["gateway", *SERVICES],
+}
+
+
+def unlisted_copies() -> list[tuple[str, list[str]]]:
+    """Non-empty app modules that are byte-identical in projects SHARED_MODULES does not pair up."""
+    copies: dict[tuple[str, bytes], list[str]] = defaultdict(list)
+    for project in PROJECTS:
+        app = ROOT / project / "app"
+        for path in sorted(app.rglob("*.py")):
+            content = path.read_bytes()
+            if content.strip():
+                copies[str(path.relative_to(ROOT / project)), content].append(project)
+
+    return [
+        (module, projects)
+        for (module, _), projects in sorted(copies.items())
+        if len(projects) > 1 and not set(projects) <= set(SHARED_MODULES.get(module, []))
+    ]
+
+
+def main() -> int:
+    drifted = 0
+    for module, projects in SHARED_MODULES.items():
+        reference = ROOT / projects[0] / module
+        expected = reference.read_text().splitlines(keepends=True)
+        for project in projects[1:]:
+            copy = ROOT / project / module
+            actual = copy.read_text().splitlines(keepends=True)
+            if actual != expected:
+                drifted += 1
+                sys.stdout.writelines(difflib.unified_diff(
+                    expected, actual, str(reference.relative_to(ROOT)), str(copy.relative_to(ROOT))
+                ))
+
+    unlisted = unlisted_copies()
+    for module, projects in unlisted:
+        print(f"{module} is copied in {', '.join(projects)} but not listed in SHARED_MODULES")
+
+    if drifted or unlisted:
+        print(f"\n{drifted} copies differ from their reference copy, {len(unlisted)} copied modules are unlisted", file=sys.stderr)
+        return 1
+    print(f"{sum(len(projects) for projects in SHARED_MODULES.values())} shared module copies are identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
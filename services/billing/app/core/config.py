@@ -0,0 +1,22 @@
+from pydantic import AnyUrl
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class Settings(BaseSettings):
+    database_url: AnyUrl # the scheduling database: bookings are read from it, invoices written to it
+    mode: str = "development" # TODO: Change for prod
+
+    seat_price_cents: int = 100000 # charged to the agency per booked seat
+    invoice_currency: str = "RUB"
+
+    billing_chunk_size: int = 5000 # booking rows fetched per server-side cursor round trip
+    billing_flush_invoices: int = 500 # invoices per bulk insert and checkpoint; 8 parameters each, asyncpg allows 32767
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+    )
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+settings = Settings()
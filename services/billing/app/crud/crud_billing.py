@@ -0,0 +1,85 @@
+from datetime import date
+from typing import Any
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.models.billing import BillingRun, Invoice, RunStatusEnum
+
+# First key of billing's two-key advisory locks ("BILL"); the second is the run id.
+RUN_LOCK_NAMESPACE = 0x42494C4C
+
+async def get_or_create_run(db: AsyncSession, period_start: date, period_end: date) -> BillingRun:
+    """Return the run for this period, creating it on first use so reruns resume it."""
+    await db.execute(
+        pg_insert(BillingRun)
+        .values(
+            period_start=period_start,
+            period_end=period_end,
+            status=RunStatusEnum.RUNNING,
+            invoices_written=0,
+        )
+        .on_conflict_do_nothing(index_elements=[BillingRun.period_start, BillingRun.period_end])
+    )
+    result = await db.execute(
+        select(BillingRun)
+        .where(BillingRun.period_start == period_start, BillingRun.period_end == period_end)
+    )
+    run = result.scalar_one()
+    await db.commit()
+    return run
+
+async def try_claim_run(conn: AsyncConnection, run_id: int) -> bool:
+    """
+    Take the advisory lock that lets one process at a time work on a run.
+
+    The lock belongs to ``conn``'s database session and outlives its
+    transactions, so hold the connection until release_run().
+    """
+    claimed = await conn.scalar(select(func.pg_try_advisory_lock(RUN_LOCK_NAMESPACE, run_id)))
+    await conn.commit()
+    return claimed
+
+async def release_run(conn: AsyncConnection, run_id: int) -> None:
+    await conn.execute(select(func.pg_advisory_unlock(RUN_LOCK_NAMESPACE, run_id)))
+    await conn.commit()
+
+async def save_invoices(db: AsyncSession, run_id: int, invoices: list[dict[str, Any]]) -> int:
+    """
+    Bulk insert a batch of invoices and advance the run's checkpoint with them.
+
+    Both happen in one transaction, so after a crash the checkpoint never
+    points past an invoice that was not written, or before one that was.
+
+    Returns:
+        The number of invoices actually inserted.
+    """
+    result = await db.execute(
+        pg_insert(Invoice)
+        .values(invoices)
+        .on_conflict_do_nothing(index_elements=[Invoice.run_id, Invoice.agency_id])
+    )
+    written = max(result.rowcount, 0)
+    await db.execute(
+        update(BillingRun)
+        .where(BillingRun.id == run_id)
+        .values(
+            last_agency_id=invoices[-1]["agency_id"],
+            invoices_written=BillingRun.invoices_written + written,
+        )
+    )
+    await db.commit()
+    return written
+
+async def set_run_status(db: AsyncSession, run_id: int, status: RunStatusEnum) -> BillingRun:
+    values: dict[str, Any] = {"status": status}
+    if status == RunStatusEnum.COMPLETED:
+        values["finished_at"] = func.now()
+    result = await db.execute(
+        update(BillingRun)
+        .where(BillingRun.id == run_id)
+        .values(**values)
+        .returning(BillingRun)
+    )
+    run = result.scalar_one()
+    await db.commit()
+    return run
@@ -0,0 +1,55 @@
+import enum
+from datetime import date, datetime
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class RunStatusEnum(str, enum.Enum):
+    RUNNING   = "running"
+    FAILED    = "failed"
+    COMPLETED = "completed"
+
+# These tables live in the scheduling database but are migrated by billing's own
+# alembic setup (``alembic upgrade head`` in services/billing).
+class BillingRun(Base):
+    __tablename__ = "billing_runs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    period_start: Mapped[date] = mapped_column(nullable=False)
+    period_end: Mapped[date] = mapped_column(nullable=False)
+    status: Mapped[RunStatusEnum] = mapped_column(Enum(RunStatusEnum), default=RunStatusEnum.RUNNING, nullable=False)
+    # Agencies are billed in id order; everything up to here is already invoiced.
+    last_agency_id: Mapped[int | None] = mapped_column(nullable=True)
+    invoices_written: Mapped[int] = mapped_column(default=0, nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("period_start", "period_end", name="uq_billing_run_period"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<BillingRun id={self.id!r} period={self.period_start!r}..{self.period_end!r} status={self.status!r}>"
+
+class Invoice(Base):
+    __tablename__ = "invoices"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey("billing_runs.id", ondelete="CASCADE"), nullable=False)
+    agency_id: Mapped[int] = mapped_column(index=True, nullable=False)
+    period_start: Mapped[date] = mapped_column(nullable=False)
+    period_end: Mapped[date] = mapped_column(nullable=False)
+    bookings: Mapped[int] = mapped_column(nullable=False)
+    seats: Mapped[int] = mapped_column(nullable=False)
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    currency: Mapped[str] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        # Also makes re-inserting an already written invoice a no-op on resume.
+        UniqueConstraint("run_id", "agency_id", name="uq_invoice_run_agency"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Invoice id={self.id!r} agency_id={self.agency_id!r} amount_cents={self.amount_cents!r}>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+
+# Read-only views of the scheduling service's tables. They live in their own
+# MetaData so nothing in billing ever tries to create or migrate them.
+source_metadata = MetaData()
+
+tour_slots = Table(
+    "tour_slots",
+    source_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("agency_id", Integer, nullable=False),
+    Column("starts_at", DateTime(timezone=True), nullable=False),
+)
+
+bookings = Table(
+    "bookings",
+    source_metadata,
+    Column("id", Integer, primary_key=True),
+    Column("slot_id", Integer, nullable=False),
+    Column("seats", Integer, nullable=False),
+)
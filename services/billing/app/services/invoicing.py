@@ -0,0 +1,205 @@
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timezone
+from itertools import groupby
+from operator import itemgetter
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.crud.crud_billing import get_or_create_run, release_run, save_invoices, set_run_status, try_claim_run
+from app.db.session import AsyncSessionLocal, engine
+from app.models.billing import BillingRun, RunStatusEnum
+from app.models.source import bookings, tour_slots
+
+logger = logging.getLogger(__name__)
+
+
+class RunInProgress(RuntimeError):
+    def __init__(self, run_id: int):
+        super().__init__(f"Billing run {run_id} is already being processed by another process")
+
+
+@dataclass
+class RunReport:
+    run_id: int
+    status: RunStatusEnum
+    invoices_written: int = 0
+    booking_rows: int = 0
+    resumed_after_agency_id: int | None = None
+    elapsed_seconds: float = 0.0
+
+
+def _period_bounds(period_start: date, period_end: date) -> tuple[datetime, datetime]:
+    return (
+        datetime.combine(period_start, dt_time.min, tzinfo=timezone.utc),
+        datetime.combine(period_end, dt_time.min, tzinfo=timezone.utc),
+    )
+
+
+async def stream_agency_totals(
+    conn: AsyncConnection,
+    period_start: date,
+    period_end: date,
+    after_agency_id: int | None,
+    chunk_size: int,
+    report: RunReport,
+) -> AsyncIterator[tuple[int, int, int]]:
+    """
+    Yield ``(agency_id, bookings, seats)`` for every agency with bookings in the period.
+
+    Booking rows come off a server-side cursor ``chunk_size`` at a time as
+    plain tuples, ordered by agency, and each chunk is folded with
+    groupby/sum rather than row by row. Only one chunk and one agency's
+    running totals are held at once, whatever the size of the period. An
+    agency whose rows straddle two chunks is carried over to the next one.
+    """
+    starts, ends = _period_bounds(period_start, period_end)
+    stmt = (
+        select(tour_slots.c.agency_id, bookings.c.seats)
+        .select_from(bookings.join(tour_slots, tour_slots.c.id == bookings.c.slot_id))
+        .where(tour_slots.c.starts_at >= starts, tour_slots.c.starts_at < ends)
+        .order_by(tour_slots.c.agency_id)
+    )
+    if after_agency_id is not None:
+        stmt = stmt.where(tour_slots.c.agency_id > after_agency_id)
+
+    result = await conn.stream(stmt.execution_options(yield_per=chunk_size))
+
+    open_agency, open_bookings, open_seats = None, 0, 0
+    async for chunk in result.partitions():
+        report.booking_rows += len(chunk)
+        for agency_id, rows in groupby(chunk, key=itemgetter(0)):
+            seats = tuple(map(itemgetter(1), rows))
+            if agency_id != open_agency:
+                if open_agency is not None:
+                    yield open_agency, open_bookings, open_seats
+                open_agency, open_bookings, open_seats = agency_id, 0, 0
+            open_bookings += len(seats)
+            open_seats += sum(seats)
+
+    if open_agency is not None:
+        yield open_agency, open_bookings, open_seats
+
+
+async def run_billing(
+    period_start: date,
+    period_end: date,
+    chunk_size: int = settings.billing_chunk_size,
+    flush_every: int = settings.billing_flush_invoices,
+) -> RunReport:
+    """
+    Write one invoice per agency for bookings on slots starting in ``[period_start, period_end)``.
+
+    Invoices are bulk inserted ``flush_every`` at a time, each batch committed
+    together with the run's checkpoint (the last agency it covers). Calling
+    this again for the same period resumes after that checkpoint, and a
+    completed run is returned as is. Only one process works on a run at a
+    time; a second one raises RunInProgress instead of interleaving its
+    checkpoints with the first.
+    """
+    if period_end <= period_start:
+        raise ValueError("period_end must be after period_start")
+    started = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        run = await get_or_create_run(db, period_start, period_end)
+        if run.status == RunStatusEnum.COMPLETED:
+            return _report(run)
+
+        async with engine.connect() as lock_conn:
+            if not await try_claim_run(lock_conn, run.id):
+                raise RunInProgress(run.id)
+            try:
+                # Another process may have advanced or finished the run before we got the lock.
+                await db.refresh(run)
+                report = _report(run)
+                if run.status == RunStatusEnum.COMPLETED:
+                    return report
+                run = await _bill_run(db, run, report, chunk_size, flush_every)
+            finally:
+                await release_run(lock_conn, run.id)
+
+    report.status = run.status
+    report.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        "Billing run %d for %s..%s: %d invoices from %d booking rows (%.3fs)",
+        report.run_id, period_start, period_end, report.invoices_written,
+        report.booking_rows, report.elapsed_seconds,
+    )
+    return report
+
+
+def _report(run: BillingRun) -> RunReport:
+    return RunReport(
+        run_id=run.id,
+        status=run.status,
+        invoices_written=run.invoices_written,
+        resumed_after_agency_id=run.last_agency_id,
+    )
+
+
+async def _bill_run(db: AsyncSession, run: BillingRun, report: RunReport, chunk_size: int, flush_every: int) -> BillingRun:
+    """Invoice every agency after the run's checkpoint; the caller holds the run's lock."""
+    if run.status == RunStatusEnum.FAILED:
+        await set_run_status(db, run.id, RunStatusEnum.RUNNING)
+
+    batch: list[dict] = []
+    try:
+        async with engine.connect() as conn:
+            # One snapshot for the whole stream, while invoices are committed on the session.
+            conn = await conn.execution_options(isolation_level="REPEATABLE READ")
+            async for agency_id, booking_count, seats in stream_agency_totals(
+                conn, run.period_start, run.period_end, run.last_agency_id, chunk_size, report
+            ):
+                batch.append({
+                    "run_id": run.id,
+                    "agency_id": agency_id,
+                    "period_start": run.period_start,
+                    "period_end": run.period_end,
+                    "bookings": booking_count,
+                    "seats": seats,
+                    "amount_cents": seats * settings.seat_price_cents,
+                    "currency": settings.invoice_currency,
+                })
+                if len(batch) >= flush_every:
+                    report.invoices_written += await save_invoices(db, run.id, batch)
+                    batch = []
+
+        if batch:
+            report.invoices_written += await save_invoices(db, run.id, batch)
+        return await set_run_status(db, run.id, RunStatusEnum.COMPLETED)
+    except BaseException:
+        await db.rollback()
+        await set_run_status(db, run.id, RunStatusEnum.FAILED)
+        raise
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate per-agency invoices for a billing period.")
+    parser.add_argument("--period-start", type=date.fromisoformat, required=True, help="First day, inclusive")
+    parser.add_argument("--period-end", type=date.fromisoformat, required=True, help="Last day, exclusive")
+    parser.add_argument("--chunk-size", type=int, default=settings.billing_chunk_size)
+    parser.add_argument("--flush-every", type=int, default=settings.billing_flush_invoices)
+    args = parser.parse_args()
+    if args.period_end <= args.period_start:
+        parser.error("--period-end must be after --period-start")
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        report = asyncio.run(run_billing(args.period_start, args.period_end, args.chunk_size, args.flush_every))
+    except RunInProgress as exc:
+        parser.exit(1, f"{exc}\n")
+    print(
+        f"run_id={report.run_id} status={report.status.value} invoices_written={report.invoices_written} "
+        f"booking_rows={report.booking_rows} elapsed_seconds={report.elapsed_seconds:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
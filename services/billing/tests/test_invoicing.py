@@ -0,0 +1,140 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.crud.crud_billing import release_run, try_claim_run
+from app.db.session import AsyncSessionLocal
+from app.models.billing import BillingRun, Invoice, RunStatusEnum
+from app.models.source import bookings, tour_slots
+from app.services import invoicing
+from app.services.invoicing import RunInProgress, RunReport, run_billing, stream_agency_totals
+
+PERIOD = (date(2030, 1, 1), date(2030, 2, 1))
+IN_PERIOD = datetime(2030, 1, 10, 9, tzinfo=timezone.utc)
+
+
+async def seed(db_engine, seats_by_agency: dict[int, list[int]]) -> dict[int, tuple[int, int]]:
+    """One slot per agency in the period plus one outside it; returns the expected (bookings, seats)."""
+    slots, rows = [], []
+    for agency_id, seats in seats_by_agency.items():
+        slots.append({"id": agency_id, "agency_id": agency_id, "starts_at": IN_PERIOD})
+        slots.append({"id": 1000 + agency_id, "agency_id": agency_id, "starts_at": IN_PERIOD + timedelta(days=40)})
+        rows += [{"slot_id": agency_id, "seats": n} for n in seats]
+        rows.append({"slot_id": 1000 + agency_id, "seats": 99})
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(tour_slots), slots)
+        await conn.execute(insert(bookings), [{"id": i, **row} for i, row in enumerate(rows, 1)])
+    return {agency_id: (len(seats), sum(seats)) for agency_id, seats in seats_by_agency.items() if seats}
+
+
+async def invoices() -> dict[int, tuple[int, int]]:
+    async with AsyncSessionLocal() as db:
+        return {i.agency_id: (i.bookings, i.seats) for i in (await db.execute(select(Invoice))).scalars()}
+
+
+async def test_stream_folds_agencies_that_straddle_chunks(db_engine):
+    expected = await seed(db_engine, {1: [1], 2: [2, 3, 4, 5, 6], 3: [1, 1], 4: [7]})
+
+    for chunk_size in (1, 2, 3, 100):
+        report = RunReport(run_id=0, status=RunStatusEnum.RUNNING)
+        async with db_engine.connect() as conn:
+            totals = [t async for t in stream_agency_totals(conn, *PERIOD, None, chunk_size, report)]
+
+        assert totals == [(agency_id, *counts) for agency_id, counts in sorted(expected.items())]
+        assert report.booking_rows == 9
+
+    async with db_engine.connect() as conn:
+        report = RunReport(run_id=0, status=RunStatusEnum.RUNNING)
+        resumed = [t async for t in stream_agency_totals(conn, *PERIOD, 2, 2, report)]
+    assert [agency_id for agency_id, _, _ in resumed] == [3, 4]
+
+
+async def test_run_writes_one_invoice_per_agency(db_engine):
+    expected = await seed(db_engine, {agency_id: [agency_id % 4 + 1] * (agency_id % 3 + 1) for agency_id in range(1, 30)})
+
+    report = await run_billing(*PERIOD, chunk_size=4, flush_every=5)
+
+    assert report.status == RunStatusEnum.COMPLETED
+    assert report.invoices_written == len(expected)
+    assert await invoices() == expected
+
+
+async def test_failed_run_resumes_after_its_checkpoint(db_engine, monkeypatch):
+    expected = await seed(db_engine, {agency_id: [1, 2] for agency_id in range(1, 21)})
+    real_save = invoicing.save_invoices
+    calls = 0
+
+    async def crash_on_third_batch(db, run_id, batch):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise RuntimeError("database went away")
+        return await real_save(db, run_id, batch)
+
+    monkeypatch.setattr(invoicing, "save_invoices", crash_on_third_batch)
+    with pytest.raises(RuntimeError):
+        await run_billing(*PERIOD, chunk_size=3, flush_every=4)
+
+    async with AsyncSessionLocal() as db:
+        run = (await db.execute(select(BillingRun))).scalar_one()
+    assert (run.status, run.last_agency_id, run.invoices_written) == (RunStatusEnum.FAILED, 8, 8)
+
+    monkeypatch.setattr(invoicing, "save_invoices", real_save)
+    report = await run_billing(*PERIOD, chunk_size=3, flush_every=4)
+
+    assert report.resumed_after_agency_id == 8
+    assert (report.status, report.invoices_written) == (RunStatusEnum.COMPLETED, 20)
+    assert report.booking_rows == 24  # only agencies 9..20 were read again
+    assert await invoices() == expected
+
+    again = await run_billing(*PERIOD)
+    assert (again.status, again.invoices_written, again.booking_rows) == (RunStatusEnum.COMPLETED, 20, 0)
+
+
+async def test_a_run_claimed_by_another_process_is_rejected(db_engine):
+    await seed(db_engine, {1: [1], 2: [2]})
+    async with AsyncSessionLocal() as db:
+        db.add(BillingRun(period_start=PERIOD[0], period_end=PERIOD[1], status=RunStatusEnum.RUNNING, invoices_written=0))
+        await db.commit()
+        run_id = (await db.execute(select(BillingRun.id))).scalar_one()
+
+    async with db_engine.connect() as other_process:
+        assert await try_claim_run(other_process, run_id)
+        with pytest.raises(RunInProgress):
+            await run_billing(*PERIOD)
+        await release_run(other_process, run_id)
+
+    assert await invoices() == {}
+    report = await run_billing(*PERIOD)
+    assert report.invoices_written == 2
+
+
+async def test_second_run_of_a_period_in_progress_is_rejected(db_engine, monkeypatch):
+    expected = await seed(db_engine, {agency_id: [1] for agency_id in range(1, 10)})
+    real_save = invoicing.save_invoices
+    saving, second_done = asyncio.Event(), asyncio.Event()
+
+    async def pause_first_batch(db, run_id, batch):
+        if not saving.is_set():
+            saving.set()
+            await second_done.wait()
+        return await real_save(db, run_id, batch)
+
+    monkeypatch.setattr(invoicing, "save_invoices", pause_first_batch)
+    first = asyncio.ensure_future(run_billing(*PERIOD, chunk_size=2, flush_every=3))
+    await saving.wait()
+    try:
+        with pytest.raises(RunInProgress):
+            await run_billing(*PERIOD, chunk_size=2, flush_every=3)
+    finally:
+        second_done.set()
+
+    assert (await first).invoices_written == 9
+    assert await invoices() == expected
+
+
+async def test_empty_or_reversed_period_is_rejected():
+    with pytest.raises(ValueError, match="period_end must be after period_start"):
+        await run_billing(date(2030, 1, 2), date(2030, 1, 2))
@@ -10,6 +10,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 from app.core.config import settings
 from app.db.base import Base
 import app.models.agency
+import app.models.slot
+import app.models.capacity
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -1,15 +1,20 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends
-from app.api.v1.dependencies import require_role
-from app.crud.crud_agency import create_agency, get_agency_by_name
+from fastapi import APIRouter, Depends, Query, Response, status
+from app.api.v1.dependencies import get_token_payload, require_role
+from app.core.exceptions import AgencyNotFound
+from app.core.responses import SchemaResponse
+from app.crud.crud_agency import create_agency, delete_agency, get_agency_by_id, list_agencies, update_agency
 from app.db.deps import get_db
-from app.schemas.agency import AgencyCreate, AgencyOut
+from app.schemas.agency import AgencyCreate, AgencyOut, AgencyPage, AgencyUpdate
 from app.schemas.error import ErrorResponse
-from app.models.agency import RoleEnum
-import app.core.exceptions as api_exceptions
+from app.services.availability import availability_index
+from app.models.agency import AgencyTypeEnum, RoleEnum
 
 router = APIRouter(prefix="/agency", tags=["agency"])
 
+agency_out = SchemaResponse(AgencyOut)
+agency_page_out = SchemaResponse(AgencyPage)
+
 @router.post(
     "/register",
     dependencies=[Depends(require_role(RoleEnum.CENTER_ADMIN))],
@@ -20,7 +25,73 @@ router = APIRouter(prefix="/agency", tags=["agency"])
     },
 )
 async def register_agency(agency_in: AgencyCreate, db: AsyncSession = Depends(get_db)):
-    if await get_agency_by_name(db, agency_in.name):
-        raise api_exceptions.AgencyAlreadyRegistered(agency_in.name)
-    return await create_agency(db, agency_in)
+    return agency_out.render(await create_agency(db, agency_in))
+
+@router.get(
+    "",
+    dependencies=[Depends(get_token_payload)],
+    response_model=AgencyPage,
+    responses={
+        422: {"model": ErrorResponse, "description": "Validation Error"},
+    },
+)
+async def list_agencies_page(
+    cursor: int | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    agency_type: AgencyTypeEnum | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List agencies in id order, one page at a time.
+
+    Args:
+        cursor: The next_cursor returned with the previous page, omitted for the first page.
+        limit: Maximum number of agencies per page.
+        agency_type: Only return agencies of this type.
+        db: Async database session.
+
+    Returns:
+        An AgencyPage with the agencies and the cursor for the next page.
+    """
+    agencies, next_cursor = await list_agencies(db, limit, after_id=cursor, agency_type=agency_type)
+    return agency_page_out.render({"items": agencies, "next_cursor": next_cursor})
+
+@router.get(
+    "/{agency_id}",
+    dependencies=[Depends(get_token_payload)],
+    response_model=AgencyOut,
+    responses={
+        404: {"model": ErrorResponse, "description": "Agency not found"},
+    },
+)
+async def get_agency(agency_id: int, db: AsyncSession = Depends(get_db)):
+    agency = await get_agency_by_id(db, agency_id)
+    if agency is None:
+        raise AgencyNotFound()
+    return agency_out.render(agency)
 
+@router.put(
+    "/{agency_id}",
+    dependencies=[Depends(require_role(RoleEnum.CENTER_ADMIN))],
+    response_model=AgencyOut,
+    responses={
+        400: {"model": ErrorResponse, "description": "Agency already registered"},
+        404: {"model": ErrorResponse, "description": "Agency not found"},
+        422: {"model": ErrorResponse, "description": "Validation Error"},
+    },
+)
+async def update_agency_by_id(agency_id: int, agency_in: AgencyCreate, db: AsyncSession = Depends(get_db)):
+    return agency_out.render(await update_agency(db, AgencyUpdate(id=agency_id, **agency_in.model_dump())))
+
+@router.delete(
+    "/{agency_id}",
+    dependencies=[Depends(require_role(RoleEnum.CENTER_ADMIN))],
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        404: {"model": ErrorResponse, "description": "Agency not found"},
+    },
+)
+async def delete_agency_by_id(agency_id: int, db: AsyncSession = Depends(get_db)):
+    await delete_agency(db, agency_id)
+    availability_index.invalidate(agency_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,28 +1,83 @@
-from fastapi import Depends, HTTPException, status
+import secrets
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jwt import PyJWTError, decode as jwt_decode
+from jwt import PyJWTError, decode as jwt_decode, get_unverified_header
 from app.core.config import settings
 from app.schemas.token import TokenPayload
 from app.core.exceptions import PermissionRequired
 from app.models.agency import RoleEnum
+from app.services.jwks import key_set
+from app.services.token_cache import token_cache
+from app.services.tracing import tracer
 
 bearer_scheme = HTTPBearer()
 
-def get_token_payload(
-    creds = Depends(bearer_scheme),
-) -> TokenPayload:
+def get_gateway_identity(request: Request) -> TokenPayload | None:
+    """
+    Return the identity the gateway already verified, if this service trusts it.
+
+    Only honoured when ``trust_gateway_identity`` is enabled and the request
+    carries the ``gateway_shared_secret``, which settings require in that case.
+    """
+    if not settings.trust_gateway_identity:
+        return None
+
+    headers = request.headers
+    if "x-user-id" not in headers:
+        return None
+    if not secrets.compare_digest(
+        headers.get("x-gateway-token", "").encode(), settings.gateway_shared_secret.encode()
+    ):
+        return None
+
     try:
-        raw = jwt_decode(
-            creds.credentials,
-            settings.jwt_key,
-            algorithms=[settings.algorithm],
-            options={"require": ["exp", "scope"]},
+        return TokenPayload(
+            sub=headers["x-user-id"],
+            agency_id=headers.get("x-agency-id"),
+            email=headers.get("x-user-email", ""),
+            role=headers.get("x-user-role", ""),
+            exp=headers.get("x-token-exp"),
+            iat=headers.get("x-token-iat"),
+            scope="access_token",
         )
-        payload = TokenPayload(**raw)
-    except PyJWTError:
+    except ValueError:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token")
+
+def get_token_payload(
+    creds = Depends(bearer_scheme),
+    identity: TokenPayload | None = Depends(get_gateway_identity),
+) -> TokenPayload:
+    if identity is not None:
+        return identity
+
+    key = token_cache.digest(creds.credentials)
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached
+
+    with tracer.span("jwt.decode", algorithm=settings.algorithm if key_set is None else "jwks"):
+        try:
+            if key_set is not None:
+                jwk = key_set.get(get_unverified_header(creds.credentials).get("kid"))
+                if jwk is None:
+                    raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token")
+                verify_key, algorithms = jwk.key, [jwk.algorithm_name]
+            else:
+                verify_key, algorithms = settings.jwt_key, [settings.algorithm]
+            raw = jwt_decode(
+                creds.credentials,
+                verify_key,
+                algorithms=algorithms,
+                options={"require": ["exp", "scope"]},
+            )
+            payload = TokenPayload(**raw)
+        except (PyJWTError, ValueError):
+            raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid token")
     if payload.scope != "access_token":
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Wrong token scope")
+
+    token_cache.put(key, payload)
     return payload
 
 def require_role(role: RoleEnum):
@@ -30,4 +85,12 @@ def require_role(role: RoleEnum):
         if payload.role != role:
             raise PermissionRequired()
         return payload
-    return role_checker
\ No newline at end of file
+    return role_checker
+
+def check_agency_access(payload: TokenPayload, agency_id: int) -> None:
+    """Allow center admins, and managers acting on their own agency."""
+    if payload.role == RoleEnum.CENTER_ADMIN:
+        return
+    if payload.role == RoleEnum.AGENCY_MANAGER and payload.agency_id == agency_id:
+        return
+    raise PermissionRequired()
@@ -0,0 +1,99 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from app.api.v1.dependencies import require_role
+from app.core.exceptions import ProfileNotFound
+from app.models.agency import RoleEnum
+from app.schemas.error import ErrorResponse
+from app.schemas.profile import ProfileArm, ProfilerState, ProfileSummary
+from app.services.sampling_profiler import sampling_profiler
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["profiling"],
+    dependencies=[Depends(require_role(RoleEnum.CENTER_ADMIN))],
+    responses={
+        401: {"model": ErrorResponse, "description": "Not authenticated"},
+        403: {"model": ErrorResponse, "description": "Not enough permission"},
+    },
+)
+
+def _state() -> ProfilerState:
+    return ProfilerState(
+        armed=sampling_profiler.armed,
+        route_prefix=sampling_profiler.armed_route_prefix,
+        header_selection=sampling_profiler.token is not None,
+        sample_ratio=sampling_profiler.sample_ratio,
+    )
+
+@router.post("/arm", response_model=ProfilerState, status_code=status.HTTP_200_OK)
+async def arm_profiler(arm: ProfileArm) -> ProfilerState:
+    """
+    Profile the next requests this process handles.
+
+    Replaces any earlier arming. Each process arms separately, so with several
+    workers the call only covers the worker that received it.
+
+    Args:
+        arm: How many requests to profile and, optionally, the path prefix they must match.
+
+    Returns:
+        The profiler's selection state.
+    """
+    sampling_profiler.arm(arm.count, arm.route_prefix)
+    return _state()
+
+@router.get("", response_model=list[ProfileSummary], status_code=status.HTTP_200_OK)
+async def list_profiles() -> list[dict]:
+    """
+    List the profiles recorded by this process, newest first.
+
+    Returns:
+        A summary of each stored profile.
+    """
+    return sampling_profiler.profiles()
+
+@router.get(
+    "/{profile_id}",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {"content": {"text/plain": {}, "application/json": {}}, "description": "Collapsed stacks or speedscope profile"},
+        404: {"model": ErrorResponse, "description": "Profile not found"},
+    },
+)
+async def download_profile(
+    profile_id: str,
+    format: Literal["collapsed", "speedscope"] = Query("speedscope"),
+) -> Response:
+    """
+    Download one profile.
+
+    ``speedscope`` opens directly in https://www.speedscope.app; ``collapsed``
+    is the folded-stack format read by flamegraph.pl and most flame graph tools.
+
+    Args:
+        profile_id: The id returned in the profiled response's X-Profile-Id header.
+        format: "speedscope" (default) or "collapsed".
+
+    Returns:
+        The profile as an attachment.
+
+    Raises:
+        ProfileNotFound: If no profile with this id is stored.
+    """
+    profile = sampling_profiler.get(profile_id)
+    if profile is None:
+        raise ProfileNotFound()
+
+    if format == "collapsed":
+        return PlainTextResponse(
+            profile.collapsed(),
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+        )
+    return JSONResponse(
+        profile.speedscope(),
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'},
+    )
@@ -0,0 +1,192 @@
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query, Response, status
+from pydantic import AwareDatetime
+from app.api.v1.dependencies import check_agency_access, get_token_payload
+from app.core.exceptions import InvalidRange, SlotConflict
+from app.core.responses import SchemaResponse
+from app.crud.crud_capacity import get_daily_capacity
+from app.crud.crud_slot import book_slot, cancel_booking, create_slot
+from app.db.deps import get_db
+from app.models.agency import RoleEnum
+from app.schemas.error import ErrorResponse
+from app.schemas.slot import BookingCreate, BookingOut, DayCapacityOut, SlotCreate, SlotOut
+from app.schemas.token import TokenPayload
+from app.services.availability import availability_index
+
+router = APIRouter(prefix="/agency", tags=["slots"])
+
+MAX_AVAILABILITY_RANGE = timedelta(days=92)
+
+slot_out = SchemaResponse(SlotOut)
+slot_list_out = SchemaResponse(list[SlotOut])
+day_capacity_list_out = SchemaResponse(list[DayCapacityOut])
+booking_out = SchemaResponse(BookingOut)
+
+@router.post(
+    "/{agency_id}/slots",
+    response_model=SlotOut,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        403: {"model": ErrorResponse, "description": "Not enough permissions"},
+        404: {"model": ErrorResponse, "description": "Agency not found"},
+        409: {"model": ErrorResponse, "description": "Slot overlaps an existing slot"},
+        422: {"model": ErrorResponse, "description": "Validation Error"},
+    },
+)
+async def add_slot(
+    agency_id: int,
+    slot_in: SlotCreate,
+    payload: TokenPayload = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create a tour slot for an agency.
+
+    Args:
+        agency_id: The agency running the tour.
+        slot_in: Start, end and capacity of the slot.
+        payload: The caller's token; center admins or the agency's own managers.
+        db: Async database session.
+
+    Returns:
+        The created slot.
+
+    Raises:
+        PermissionRequired: If the caller may not manage this agency.
+        AgencyNotFound: If the agency does not exist.
+        SlotConflict: If the slot overlaps another slot of the agency.
+    """
+    check_agency_access(payload, agency_id)
+
+    # Cheap rejection from memory; create_slot repeats the check under a lock.
+    cached = availability_index.cached(agency_id)
+    conflict = cached.conflict(slot_in.starts_at, slot_in.ends_at) if cached is not None else None
+    if conflict is not None:
+        raise SlotConflict(conflict.id)
+
+    slot = await create_slot(db, agency_id, slot_in)
+    availability_index.slot_created(slot)
+    return slot_out.render(slot, status.HTTP_201_CREATED)
+
+@router.get(
+    "/{agency_id}/availability",
+    dependencies=[Depends(get_token_payload)],
+    response_model=list[SlotOut],
+    responses={
+        422: {"model": ErrorResponse, "description": "Validation Error"},
+    },
+)
+async def get_availability(
+    agency_id: int,
+    start: AwareDatetime,
+    end: AwareDatetime,
+    min_seats: int = Query(1, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List an agency's upcoming slots overlapping ``[start, end)``.
+
+    Served from the in-memory availability index, which may lag writes made
+    by other workers by a few seconds; booking always re-checks capacity.
+
+    Args:
+        agency_id: The agency to query.
+        start: Start of the range, with timezone.
+        end: End of the range, with timezone.
+        min_seats: Only return slots with at least this many seats left.
+        db: Async database session, used only when the index must be (re)loaded.
+
+    Returns:
+        The matching slots ordered by start time.
+
+    Raises:
+        InvalidRange: If end is not after start or the range spans more than 92 days.
+    """
+    if end <= start:
+        raise InvalidRange("End must be after start")
+    if end - start > MAX_AVAILABILITY_RANGE:
+        raise InvalidRange(f"The range may span at most {MAX_AVAILABILITY_RANGE.days} days")
+    slots = await availability_index.between(db, agency_id, start, end)
+    return slot_list_out.render([slot for slot in slots if slot.remaining >= min_seats])
+
+@router.get(
+    "/{agency_id}/calendar",
+    dependencies=[Depends(get_token_payload)],
+    response_model=list[DayCapacityOut],
+    responses={
+        422: {"model": ErrorResponse, "description": "Validation Error"},
+    },
+)
+async def get_calendar(
+    agency_id: int,
+    first_day: date,
+    last_day: date,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Seats per day for a calendar view, read from the daily capacity rollup.
+
+    Args:
+        agency_id: The agency to query.
+        first_day: First calendar day, inclusive.
+        last_day: Last calendar day, inclusive.
+        db: Async database session.
+
+    Returns:
+        One entry per day that has slots, ordered by day.
+
+    Raises:
+        InvalidRange: If last_day is before first_day or the range spans more than 92 days.
+    """
+    if last_day < first_day:
+        raise InvalidRange("last_day must not be before first_day")
+    if last_day - first_day > MAX_AVAILABILITY_RANGE:
+        raise InvalidRange(f"The range may span at most {MAX_AVAILABILITY_RANGE.days} days")
+    return day_capacity_list_out.render(await get_daily_capacity(db, agency_id, first_day, last_day))
+
+@router.post(
+    "/{agency_id}/slots/{slot_id}/bookings",
+    response_model=BookingOut,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        404: {"model": ErrorResponse, "description": "Slot not found"},
+        409: {"model": ErrorResponse, "description": "Not enough seats left"},
+        422: {"model": ErrorResponse, "description": "Validation Error"},
+    },
+)
+async def add_booking(
+    agency_id: int,
+    slot_id: int,
+    booking_in: BookingCreate,
+    payload: TokenPayload = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+):
+    booking, booked, capacity = await book_slot(db, agency_id, slot_id, payload.sub, booking_in.seats)
+    availability_index.booked_changed(agency_id, slot_id, booked)
+    return booking_out.render(BookingOut(
+        id=booking.id,
+        slot_id=slot_id,
+        user_id=booking.user_id,
+        seats=booking.seats,
+        remaining=capacity - booked,
+    ), status.HTTP_201_CREATED)
+
+@router.delete(
+    "/{agency_id}/bookings/{booking_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        404: {"model": ErrorResponse, "description": "Booking not found"},
+    },
+)
+async def remove_booking(
+    agency_id: int,
+    booking_id: int,
+    payload: TokenPayload = Depends(get_token_payload),
+    db: AsyncSession = Depends(get_db),
+):
+    # Admins may cancel any booking, everyone else only their own.
+    owner = None if payload.role == RoleEnum.CENTER_ADMIN else payload.sub
+    slot_id, booked = await cancel_booking(db, agency_id, booking_id, user_id=owner)
+    availability_index.booked_changed(agency_id, slot_id, booked)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
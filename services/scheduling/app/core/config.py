@@ -1,11 +1,49 @@
-from pydantic import AnyUrl
+from pydantic import AnyUrl, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     database_url: AnyUrl
-    jwt_key: str
-    algorithm: str
+    jwt_key: str | None = None # shared HS256 key, unused when jwks_url is set
+    algorithm: str = "HS256"
+    jwks_url: str | None = None # e.g. http://user:8000/auth/.well-known/jwks.json
+    jwks_refresh_seconds: float = 300.0
     mode: str = "development" # TODO: Change for prod
+
+    trust_gateway_identity: bool = False # read identity headers set by the gateway instead of the JWT
+    gateway_shared_secret: str | None = None # required with trust_gateway_identity; must match the gateway's
+
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_pgbouncer_mode: bool = False # PgBouncer transaction pooling: no server-side prepared statement reuse
+    db_query_profiling: bool = True # per-request statement counts, slow query and N+1 logging
+    db_slow_query_seconds: float = 0.2 # 0 disables the slow query log
+    db_n_plus_one_threshold: int = 5 # warn when a request repeats one statement this often, 0 disables
+
+    token_cache_max_size: int = 10000
+
+    availability_index_ttl_seconds: float = 30.0 # how stale another worker's slot or booking writes may look
+    availability_index_max_agencies: int = 1000
+    calendar_timezone: str = "UTC" # days in the capacity rollup, e.g. "Europe/Moscow"
+
+    metrics_enabled: bool = True # Prometheus /metrics, request and SQL timing
+    event_loop_lag_interval_seconds: float = 0.5 # 0 disables the lag monitor
+
+    tracing_service_name: str = "scheduling"
+    tracing_exporter: str = "memory" # "memory", "file" (JSON lines, recent traces also kept in memory) or "none"
+    tracing_file: str = "traces.jsonl"
+    tracing_sample_ratio: float = 0.1 # for traces started here; continued traces follow the caller's traceparent
+    tracing_max_traces: int = 1000
+
+    profiling_enabled: bool = True # admin-armed or header-selected request profiling
+    profiling_token: str | None = None # requests sending "X-Profile: <token>" are profiled
+    profiling_sample_ratio: float = 0.0 # share of all requests profiled at random
+    profiling_interval_seconds: float = 0.005
+    profiling_max_seconds: float = 30.0 # samples kept per request
+    profiling_max_profiles: int = 20
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -15,4 +53,11 @@ class Settings(BaseSettings):
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
 
+    @model_validator(mode="after")
+    def check_gateway_trust(self) -> "Settings":
+        # Without the secret anyone reaching the service directly could claim any identity.
+        if self.trust_gateway_identity and not self.gateway_shared_secret:
+            raise ValueError("trust_gateway_identity requires gateway_shared_secret")
+        return self
+
 settings = Settings()
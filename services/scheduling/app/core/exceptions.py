@@ -20,4 +20,46 @@ class AgencyAlreadyRegistered(HTTPException):
         super().__init__(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Agency {name} is already registered"
-        )
\ No newline at end of file
+        )
+
+class SlotNotFound(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slot not found"
+        )
+
+class SlotConflict(HTTPException):
+    def __init__(self, slot_id: int):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Slot overlaps existing slot {slot_id}"
+        )
+
+class SlotFull(HTTPException):
+    def __init__(self, remaining: int):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Not enough seats left, {remaining} remaining"
+        )
+
+class InvalidRange(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail
+        )
+
+class BookingNotFound(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+
+class ProfileNotFound(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
@@ -0,0 +1,35 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+from typing import Any, Generic, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+
+class SchemaResponse(Generic[T]):
+    """
+    Renders a response schema straight to JSON bytes.
+
+    With only ``response_model`` FastAPI validates the handler's return
+    value, dumps it to Python primitives and encodes those again. A handler
+    that returns ``render(...)`` instead pays for one validation (reading
+    ORM attributes directly) and one serialization in pydantic-core, with
+    the adapter compiled once at import. Keep ``response_model`` on the
+    route so the OpenAPI schema is unchanged.
+    """
+
+    def __init__(self, schema: type[T]) -> None:
+        self.adapter: TypeAdapter[T] = TypeAdapter(schema)
+
+    def render(self, content: Any, status_code: int = 200, response: Response | None = None) -> Response:
+        body = self.adapter.dump_json(self.adapter.validate_python(content, from_attributes=True))
+        rendered = Response(body, status_code=status_code, media_type="application/json")
+        if response is not None:
+            # FastAPI only merges the injected Response's headers (cookies) into
+            # responses it builds itself.
+            rendered.raw_headers.extend(
+                (name, value) for name, value in response.raw_headers if name != b"content-length"
+            )
+        return rendered
@@ -1,43 +1,90 @@
-from sqlalchemy import select
-from app.core.exceptions import AgencyNotFound
-from app.models.agency import Agency
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.exceptions import AgencyAlreadyRegistered, AgencyNotFound
+from app.models.agency import Agency, AgencyTypeEnum
 from app.schemas.agency import AgencyCreate, AgencyUpdate
 from sqlalchemy.ext.asyncio import AsyncSession
 
 async def create_agency(db: AsyncSession, agency_data: AgencyCreate) -> Agency:
-    agency = Agency(
-        name=agency_data.name,
-        agency_type=agency_data.agency_type
+    stmt = (
+        pg_insert(Agency)
+        .values(
+            name=agency_data.name,
+            agency_type=agency_data.agency_type
+        )
+        .on_conflict_do_nothing(index_elements=[Agency.name])
+        .returning(Agency)
     )
+    result = await db.execute(stmt)
+    agency = result.scalars().first()
+    if agency is None:
+        await db.rollback()
+        raise AgencyAlreadyRegistered(agency_data.name)
 
-    db.add(agency)
     await db.commit()
-    await db.refresh(agency)
-
     return agency
 
 async def update_agency(db: AsyncSession, new_agency_data: AgencyUpdate) -> Agency:
-    agency = await db.get(Agency, new_agency_data.id)
-    if not agency:
+    stmt = (
+        update(Agency)
+        .where(Agency.id == new_agency_data.id)
+        .values(
+            name=new_agency_data.name,
+            agency_type=new_agency_data.agency_type
+        )
+        .returning(Agency)
+    )
+    try:
+        result = await db.execute(stmt)
+    except IntegrityError:
+        await db.rollback()
+        raise AgencyAlreadyRegistered(new_agency_data.name)
+
+    agency = result.scalars().first()
+    if agency is None:
+        await db.rollback()
         raise AgencyNotFound()
-    
-    agency.name = new_agency_data.name
-    agency.agency_type = new_agency_data.agency_type
-    
-    db.add(agency)
-    await db.commit()
-    await db.refresh(agency)
 
+    await db.commit()
     return agency
 
 async def delete_agency(db: AsyncSession, id: int) -> None:
-    agency = await db.get(Agency, id)
-    if not agency:
+    result = await db.execute(delete(Agency).where(Agency.id == id).returning(Agency.id))
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
         raise AgencyNotFound()
-    
-    await db.delete(agency)
+
     await db.commit()
 
+async def get_agency_by_id(db: AsyncSession, id: int) -> Agency | None:
+    return await db.get(Agency, id)
+
+async def list_agencies(
+    db: AsyncSession,
+    limit: int,
+    after_id: int | None = None,
+    agency_type: AgencyTypeEnum | None = None,
+) -> tuple[list[Agency], int | None]:
+    """
+    Return one page of agencies ordered by id, and the cursor for the next page.
+
+    Seeks past ``after_id`` instead of using OFFSET, so every page costs the
+    same index range scan however deep the client has paged. One extra row is
+    fetched to tell whether another page exists.
+    """
+    stmt = select(Agency).order_by(Agency.id).limit(limit + 1)
+    if after_id is not None:
+        stmt = stmt.where(Agency.id > after_id)
+    if agency_type is not None:
+        stmt = stmt.where(Agency.agency_type == agency_type)
+
+    result = await db.execute(stmt)
+    agencies = list(result.scalars().all())
+    if len(agencies) > limit:
+        return agencies[:limit], agencies[limit - 1].id
+    return agencies, None
+
 async def get_agency_by_name(db: AsyncSession, name: str) -> Agency | None:
     stmt = (
         select(Agency)
@@ -0,0 +1,92 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.capacity import DailyCapacity
+from app.models.slot import TourSlot
+
+CALENDAR_TZ = ZoneInfo(settings.calendar_timezone)
+
+def calendar_day(moment: datetime) -> date:
+    """The calendar day a slot starting at ``moment`` is counted under."""
+    return moment.astimezone(CALENDAR_TZ).date()
+
+async def add_slot_capacity(db: AsyncSession, agency_id: int, starts_at: datetime, capacity: int) -> None:
+    # Runs inside the caller's transaction; the caller commits.
+    stmt = pg_insert(DailyCapacity).values(
+        agency_id=agency_id,
+        day=calendar_day(starts_at),
+        slots=1,
+        capacity=capacity,
+        booked=0,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyCapacity.agency_id, DailyCapacity.day],
+        set_={
+            "slots": DailyCapacity.slots + 1,
+            "capacity": DailyCapacity.capacity + stmt.excluded.capacity,
+        },
+    )
+    await db.execute(stmt)
+
+async def add_booked_seats(db: AsyncSession, agency_id: int, starts_at: datetime, seats: int) -> None:
+    # ``seats`` is negative for cancellations. Runs inside the caller's transaction.
+    await db.execute(
+        update(DailyCapacity)
+        .where(DailyCapacity.agency_id == agency_id, DailyCapacity.day == calendar_day(starts_at))
+        .values(booked=DailyCapacity.booked + seats)
+    )
+
+async def get_daily_capacity(db: AsyncSession, agency_id: int, first_day: date, last_day: date) -> list[DailyCapacity]:
+    stmt = (
+        select(DailyCapacity)
+        .where(
+            DailyCapacity.agency_id == agency_id,
+            DailyCapacity.day >= first_day,
+            DailyCapacity.day <= last_day,
+        )
+        .order_by(DailyCapacity.day)
+    )
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+async def rebuild_daily_capacity(db: AsyncSession, agency_id: int | None = None) -> int:
+    """
+    Recompute rollup rows from tour_slots, for one agency or all of them.
+
+    Runs as a single transaction holding a SHARE lock on tour_slots. Every
+    slot and booking write updates tour_slots first, so none of them can
+    land between the delete and the re-insert and be lost.
+
+    Returns:
+        The number of rollup rows written.
+    """
+    await db.execute(text("LOCK TABLE tour_slots IN SHARE MODE"))
+
+    day = func.date(func.timezone(settings.calendar_timezone, TourSlot.starts_at))
+    totals = (
+        select(
+            TourSlot.agency_id,
+            day,
+            func.count(),
+            func.sum(TourSlot.capacity),
+            func.sum(TourSlot.booked),
+        )
+        .group_by(TourSlot.agency_id, day)
+    )
+    purge = delete(DailyCapacity)
+    if agency_id is not None:
+        totals = totals.where(TourSlot.agency_id == agency_id)
+        purge = purge.where(DailyCapacity.agency_id == agency_id)
+
+    await db.execute(purge)
+    result = await db.execute(
+        insert(DailyCapacity).from_select(
+            ["agency_id", "day", "slots", "capacity", "booked"],
+            totals,
+        )
+    )
+    await db.commit()
+    return result.rowcount
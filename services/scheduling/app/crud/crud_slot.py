@@ -0,0 +1,129 @@
+from datetime import datetime
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.crud_capacity import add_booked_seats, add_slot_capacity
+from app.core.exceptions import AgencyNotFound, BookingNotFound, SlotConflict, SlotFull, SlotNotFound
+from app.models.agency import Agency
+from app.models.slot import Booking, TourSlot
+from app.schemas.slot import SlotCreate
+
+async def create_slot(db: AsyncSession, agency_id: int, slot_data: SlotCreate) -> TourSlot:
+    # Locking the agency row serialises slot creation per agency, so two
+    # overlapping slots can never both pass the conflict check.
+    agency = await db.execute(select(Agency.id).where(Agency.id == agency_id).with_for_update())
+    if agency.scalar_one_or_none() is None:
+        await db.rollback()
+        raise AgencyNotFound()
+
+    # Slots of an agency never overlap, so only the latest slot starting
+    # before the new one ends can conflict: one index seek, no range scan.
+    stmt = (
+        select(TourSlot)
+        .where(TourSlot.agency_id == agency_id, TourSlot.starts_at < slot_data.ends_at)
+        .order_by(TourSlot.starts_at.desc())
+        .limit(1)
+    )
+    previous = (await db.execute(stmt)).scalars().first()
+    if previous is not None and previous.ends_at > slot_data.starts_at:
+        conflict_id = previous.id
+        await db.rollback()
+        raise SlotConflict(conflict_id)
+
+    slot = TourSlot(
+        agency_id=agency_id,
+        starts_at=slot_data.starts_at,
+        ends_at=slot_data.ends_at,
+        capacity=slot_data.capacity,
+        booked=0,
+    )
+    db.add(slot)
+    await add_slot_capacity(db, agency_id, slot_data.starts_at, slot_data.capacity)
+    await db.commit()
+    await db.refresh(slot)
+    return slot
+
+async def list_upcoming_slots(db: AsyncSession, agency_id: int, now: datetime) -> list[TourSlot]:
+    stmt = (
+        select(TourSlot)
+        .where(TourSlot.agency_id == agency_id, TourSlot.ends_at > now)
+        .order_by(TourSlot.starts_at)
+    )
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+async def book_slot(db: AsyncSession, agency_id: int, slot_id: int, user_id: int, seats: int) -> tuple[Booking, int, int]:
+    """
+    Take ``seats`` from a slot and record the booking in one transaction.
+
+    The capacity check and the decrement are a single conditional UPDATE, so
+    concurrent bookings serialise on the slot row and can never oversell it.
+
+    Returns:
+        The booking, and the slot's booked count and capacity after it.
+    """
+    stmt = (
+        update(TourSlot)
+        .where(
+            TourSlot.id == slot_id,
+            TourSlot.agency_id == agency_id,
+            TourSlot.booked + seats <= TourSlot.capacity,
+        )
+        .values(booked=TourSlot.booked + seats)
+        .returning(TourSlot.booked, TourSlot.capacity, TourSlot.starts_at)
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        remaining = await db.execute(
+            select(TourSlot.capacity - TourSlot.booked)
+            .where(TourSlot.id == slot_id, TourSlot.agency_id == agency_id)
+        )
+        remaining = remaining.scalar_one_or_none()
+        await db.rollback()
+        if remaining is None:
+            raise SlotNotFound()
+        raise SlotFull(remaining)
+
+    booking = Booking(slot_id=slot_id, user_id=user_id, seats=seats)
+    db.add(booking)
+    # The slot row is locked by the UPDATE above, so the rollup row is always
+    # taken second and concurrent bookings cannot deadlock on it.
+    await add_booked_seats(db, agency_id, row.starts_at, seats)
+    await db.commit()
+    return booking, row.booked, row.capacity
+
+async def cancel_booking(db: AsyncSession, agency_id: int, booking_id: int, user_id: int | None = None) -> tuple[int, int]:
+    """
+    Delete a booking and give its seats back to the slot.
+
+    Args:
+        user_id: When set, only that user's booking may be cancelled.
+
+    Returns:
+        The slot id and its booked count after the cancellation.
+    """
+    stmt = (
+        delete(Booking)
+        .where(
+            Booking.id == booking_id,
+            Booking.slot_id.in_(select(TourSlot.id).where(TourSlot.agency_id == agency_id)),
+        )
+        .returning(Booking.slot_id, Booking.seats)
+    )
+    if user_id is not None:
+        stmt = stmt.where(Booking.user_id == user_id)
+
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        await db.rollback()
+        raise BookingNotFound()
+
+    slot = await db.execute(
+        update(TourSlot)
+        .where(TourSlot.id == row.slot_id)
+        .values(booked=TourSlot.booked - row.seats)
+        .returning(TourSlot.booked, TourSlot.starts_at)
+    )
+    slot = slot.one()
+    await add_booked_seats(db, agency_id, slot.starts_at, -row.seats)
+    await db.commit()
+    return row.slot_id, slot.booked
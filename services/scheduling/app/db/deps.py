@@ -1,7 +1,21 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
 from typing import AsyncGenerator
+from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.profiler import attach_profile
 from app.db.session import AsyncSessionLocal
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        if not settings.db_query_profiling:
+            yield session
+            return
+
+        route = request.scope.get("route")
+        profile = attach_profile(session, getattr(route, "path", request.url.path))
+        try:
+            yield session
+        finally:
+            profile.finish()
\ No newline at end of file
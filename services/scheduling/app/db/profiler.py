@@ -0,0 +1,118 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEY = "query_profile"
+
+# Lists collecting finished profiles, see capture_query_profiles().
+_sinks: list[list["QueryProfile"]] = []
+
+
+@dataclass
+class QueryProfile:
+    """Statements issued through one session, usually one request's."""
+
+    route: str | None = None
+    statements: int = 0
+    db_time: float = 0.0
+    counts: Counter[str] = field(default_factory=Counter)
+    slow: list[tuple[str, float]] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.db_time += elapsed
+        self.counts[statement] += 1
+        if settings.db_slow_query_seconds > 0 and elapsed >= settings.db_slow_query_seconds:
+            self.slow.append((statement, elapsed))
+            logger.warning("Slow query on %s (%.3fs): %s", self.route, elapsed, _shorten(statement))
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Statements run at least ``threshold`` times, the usual sign of an N+1 loop."""
+        return {statement: count for statement, count in self.counts.items() if count >= threshold}
+
+    def assert_max_statements(self, limit: int) -> None:
+        if self.statements > limit:
+            issued = "\n".join(f"  {count}x {_shorten(statement)}" for statement, count in self.counts.most_common())
+            raise AssertionError(f"{self.route} issued {self.statements} statements, expected at most {limit}:\n{issued}")
+
+    def finish(self) -> None:
+        threshold = settings.db_n_plus_one_threshold
+        if threshold > 0:
+            for statement, count in self.repeated(threshold).items():
+                logger.warning("Possible N+1 on %s: %d identical statements: %s", self.route, count, _shorten(statement))
+        logger.debug("%s issued %d statements in %.3fs", self.route, self.statements, self.db_time)
+        for sink in _sinks:
+            sink.append(self)
+
+
+def _shorten(statement: str, limit: int = 300) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+def attach_profile(session: AsyncSession, route: str | None) -> QueryProfile:
+    profile = QueryProfile(route=route)
+    session.info[PROFILE_KEY] = profile
+    return profile
+
+
+@contextmanager
+def capture_query_profiles() -> Iterator[list[QueryProfile]]:
+    """
+    Collect the profile of every request that finishes inside the block, e.g.::
+
+        with capture_query_profiles() as profiles:
+            await client.get("/auth/verify", headers=auth)
+        profiles[0].assert_max_statements(1)
+    """
+    profiles: list[QueryProfile] = []
+    _sinks.append(profiles)
+    try:
+        yield profiles
+    finally:
+        _sinks.remove(profiles)
+
+
+def install_query_profiler(engine: AsyncEngine) -> None:
+    """
+    Time every statement on ``engine`` into the profile of the session that issued it.
+
+    A session's profile is copied onto the connection when the session begins
+    a transaction on it and removed when the connection goes back to the pool,
+    so statements from sessions without a profile (CLI jobs, the token
+    sweeper) cost one dictionary lookup.
+    """
+
+    @event.listens_for(Session, "after_begin")
+    def after_begin(session, transaction, connection):
+        profile = session.info.get(PROFILE_KEY)
+        if profile is not None:
+            connection.info[PROFILE_KEY] = profile
+
+    @event.listens_for(engine.sync_engine.pool, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        connection_record.info.pop(PROFILE_KEY, None)
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if PROFILE_KEY in conn.info:
+            context._profile_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = conn.info.get(PROFILE_KEY)
+        if profile is not None:
+            profile.record(statement, time.perf_counter() - context._profile_started)
@@ -0,0 +1,26 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.tracing import Tracer
+
+
+def install_query_tracing(engine: AsyncEngine, tracer: Tracer) -> None:
+    """Record a ``db.query`` span for every statement run inside a sampled trace."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._trace_span = tracer.start_span("db.query", **{"db.statement": statement[:500]})
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context._trace_span is not None:
+            context._trace_span.end()
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.error = type(exception_context.original_exception).__name__
+            span.end()
@@ -0,0 +1,117 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
+from fastapi.middleware.cors import CORSMiddleware
+
+from app.api.v1.agency import router as agency_router
+from app.api.v1.dependencies import require_role
+from app.api.v1.profiles import router as profiles_router
+from app.api.v1.slots import router as slots_router
+from app.core.config import settings
+from app.db.session import engine, get_pool_stats
+from app.db.tracing import install_query_tracing
+from app.models.agency import RoleEnum
+from app.services.availability import availability_index
+from app.services.jwks import key_set
+from app.services.metrics import MetricsMiddleware, metrics
+from app.services.sampling_profiler import ProfilingMiddleware, sampling_profiler
+from app.services.tracing import TracingMiddleware, tracer
+from app.services.token_cache import token_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if key_set is not None:
+        await key_set.start()
+    lag_monitor = None
+    if settings.metrics_enabled and settings.event_loop_lag_interval_seconds > 0:
+        lag_monitor = asyncio.create_task(metrics.monitor_event_loop(settings.event_loop_lag_interval_seconds))
+
+    yield
+
+    if lag_monitor is not None:
+        lag_monitor.cancel()
+        with suppress(asyncio.CancelledError):
+            await lag_monitor
+    if key_set is not None:
+        await key_set.stop()
+    tracer.close()
+
+app = FastAPI(
+    title="InnoTour Scheduling Service",
+    version="0.1.0",
+    docs_url="/docs",
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+if settings.mode == "development":
+    origins = ["*"]
+else:
+    origins = ["https://privet-stepa.kr"]
+
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=sampling_profiler)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+if settings.metrics_enabled:
+    metrics.instrument_engine(engine)
+    metrics.stats_gauges("db_pool", get_pool_stats)
+    metrics.stats_gauges("token_cache", token_cache.stats)
+    metrics.stats_gauges("availability_index", availability_index.stats)
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+if tracer.exporter is not None:
+    install_query_tracing(engine, tracer)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
+@app.exception_handler(Exception)
+async def handle_unexpected_error(request: Request, exc: Exception):
+    return JSONResponse(
+        status_code=500,
+        content={"error": "internal_server_error", "detail": "An unexpected error occurred."},
+    )
+
+app.include_router(agency_router)
+app.include_router(slots_router)
+if settings.profiling_enabled:
+    app.include_router(profiles_router)
+
+@app.get("/health", tags=["health"])
+async def health_check():
+    return {"status": "ok"}
+
+@app.get("/health/db-pool", tags=["health"])
+async def db_pool_stats():
+    return get_pool_stats()
+
+@app.get("/health/token-cache", tags=["health"])
+async def token_cache_stats():
+    return token_cache.stats()
+
+@app.get("/health/jwks", tags=["health"])
+async def jwks_stats():
+    return key_set.stats() if key_set is not None else {"enabled": False}
+
+@app.get("/health/availability-index", tags=["health"])
+async def availability_index_stats():
+    return availability_index.stats()
+
+# Traces carry SQL text, routes and timings, so only center admins may read them.
+@app.get("/health/traces", tags=["health"], dependencies=[Depends(require_role(RoleEnum.CENTER_ADMIN))])
+async def recent_traces(limit: int = 20, trace_id: str | None = None):
+    return tracer.traces(limit, trace_id)
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Enum
+from sqlalchemy import Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
@@ -11,9 +11,14 @@ class AgencyTypeEnum(str, enum.Enum):
 class Agency(Base):
     __tablename__ = "agencies"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    name: Mapped[str] = mapped_column(nullable=False)
+    name: Mapped[str] = mapped_column(unique=True, index=True, nullable=False)
     agency_type: Mapped[AgencyTypeEnum] = mapped_column(Enum(AgencyTypeEnum), default=AgencyTypeEnum.INNER, nullable=False)
 
+    __table_args__ = (
+        # Serves the filtered keyset listing: WHERE agency_type = ? AND id > ? ORDER BY id.
+        Index("ix_agencies_agency_type_id", "agency_type", "id"),
+    )
+
     def __repr__(self) -> str:
         return f"<Agency id={self.id!r} name={self.name!r}>"
 
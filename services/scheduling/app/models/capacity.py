@@ -0,0 +1,25 @@
+from datetime import date
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class DailyCapacity(Base):
+    """
+    Seats per agency and calendar day, rolled up from tour_slots.
+
+    Kept current in the same transaction as every slot and booking write,
+    and rebuildable from tour_slots with ``python -m app.services.capacity_rollup``.
+    """
+
+    __tablename__ = "agency_daily_capacity"
+
+    # The primary key doubles as the index for month views: agency_id = ? AND day BETWEEN ? AND ?.
+    agency_id: Mapped[int] = mapped_column(ForeignKey("agencies.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(primary_key=True)
+    slots: Mapped[int] = mapped_column(default=0, nullable=False)
+    capacity: Mapped[int] = mapped_column(default=0, nullable=False)
+    booked: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DailyCapacity agency_id={self.agency_id!r} day={self.day!r} booked={self.booked!r}/{self.capacity!r}>"
@@ -0,0 +1,42 @@
+from datetime import datetime
+from sqlalchemy import CheckConstraint, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class TourSlot(Base):
+    __tablename__ = "tour_slots"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    agency_id: Mapped[int] = mapped_column(ForeignKey("agencies.id", ondelete="CASCADE"), nullable=False)
+    starts_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    ends_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    capacity: Mapped[int] = mapped_column(nullable=False)
+    booked: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("ends_at > starts_at", name="ck_tour_slot_interval"),
+        CheckConstraint("booked >= 0 AND booked <= capacity", name="ck_tour_slot_capacity"),
+        # Conflict checks and index loads seek by agency and start time.
+        Index("ix_tour_slots_agency_id_starts_at", "agency_id", "starts_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<TourSlot id={self.id!r} agency_id={self.agency_id!r} starts_at={self.starts_at!r}>"
+
+
+class Booking(Base):
+    __tablename__ = "bookings"
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    slot_id: Mapped[int] = mapped_column(ForeignKey("tour_slots.id", ondelete="CASCADE"), index=True, nullable=False)
+    user_id: Mapped[int] = mapped_column(index=True, nullable=False)
+    seats: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("seats > 0", name="ck_booking_seats"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Booking id={self.id!r} slot_id={self.slot_id!r} seats={self.seats!r}>"
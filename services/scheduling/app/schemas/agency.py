@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from app.models.agency import AgencyTypeEnum
 
 class AgencyCreate(BaseModel):
@@ -8,11 +8,15 @@ class AgencyCreate(BaseModel):
 class AgencyOut(BaseModel):
     id: int
     name: str
+    agency_type: AgencyTypeEnum
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class AgencyUpdate(BaseModel):
     id: int
     name: str
-    agency_type: AgencyTypeEnum
\ No newline at end of file
+    agency_type: AgencyTypeEnum
+
+class AgencyPage(BaseModel):
+    items: list[AgencyOut]
+    next_cursor: int | None = None # pass as ?cursor= to fetch the next page; null on the last page
@@ -0,0 +1,26 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+class ProfileArm(BaseModel):
+    count: int = Field(1, ge=1, le=100)
+    route_prefix: Optional[str] = None
+
+class ProfilerState(BaseModel):
+    armed: int
+    route_prefix: Optional[str] = None
+    header_selection: bool
+    sample_ratio: float
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: Optional[str] = None
+    status: Optional[int] = None
+    started_at: float
+    duration_seconds: Optional[float] = None
+    samples: int
+    truncated: bool
@@ -0,0 +1,51 @@
+from datetime import date, datetime
+from pydantic import AwareDatetime, BaseModel, ConfigDict, Field, computed_field, model_validator
+
+class SlotCreate(BaseModel):
+    starts_at: AwareDatetime
+    ends_at: AwareDatetime
+    capacity: int = Field(gt=0)
+
+    @model_validator(mode="after")
+    def check_interval(self) -> "SlotCreate":
+        if self.ends_at <= self.starts_at:
+            raise ValueError("ends_at must be after starts_at")
+        return self
+
+class SlotOut(BaseModel):
+    id: int
+    agency_id: int
+    starts_at: datetime
+    ends_at: datetime
+    capacity: int
+    booked: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def remaining(self) -> int:
+        return self.capacity - self.booked
+
+class BookingCreate(BaseModel):
+    seats: int = Field(default=1, gt=0)
+
+class BookingOut(BaseModel):
+    id: int
+    slot_id: int
+    user_id: int
+    seats: int
+    remaining: int # seats left on the slot after this booking
+
+class DayCapacityOut(BaseModel):
+    day: date
+    slots: int
+    capacity: int
+    booked: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def free(self) -> int:
+        return self.capacity - self.booked
@@ -3,9 +3,9 @@ from pydantic import BaseModel
 
 class TokenPayload(BaseModel):
     sub: int
-    agency_id: Optional[int]
+    agency_id: Optional[int] = None
     email: str
     role: str
     exp: int
-    iat: int
+    iat: Optional[int] = None
     scope: str
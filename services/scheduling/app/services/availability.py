@@ -0,0 +1,176 @@
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.crud_slot import list_upcoming_slots
+from app.models.slot import TourSlot
+
+
+def _aware(value: datetime) -> datetime:
+    # Postgres returns timestamptz values as aware datetimes; backends that
+    # drop the zone store UTC.
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass(slots=True)
+class SlotView:
+    """Detached copy of a TourSlot row held by the availability index."""
+
+    id: int
+    agency_id: int
+    starts_at: datetime
+    ends_at: datetime
+    capacity: int
+    booked: int
+
+    @property
+    def remaining(self) -> int:
+        return self.capacity - self.booked
+
+    @classmethod
+    def from_orm_slot(cls, slot: TourSlot) -> "SlotView":
+        return cls(
+            id=slot.id,
+            agency_id=slot.agency_id,
+            starts_at=_aware(slot.starts_at),
+            ends_at=_aware(slot.ends_at),
+            capacity=slot.capacity,
+            booked=slot.booked,
+        )
+
+
+class AgencySlots:
+    """
+    The upcoming slots of one agency as sorted arrays.
+
+    Slots of an agency never overlap, so sorting by start also sorts by end.
+    Overlap and range queries are then two bisections, O(log n + k), with no
+    interval tree needed.
+    """
+
+    def __init__(self, slots: Iterable[SlotView], loaded_at: float) -> None:
+        self.loaded_at = loaded_at
+        self._slots = sorted(slots, key=lambda slot: slot.starts_at)
+        self._starts = [slot.starts_at for slot in self._slots]
+        self._ends = [slot.ends_at for slot in self._slots]
+        self._by_id = {slot.id: slot for slot in self._slots}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get(self, slot_id: int) -> SlotView | None:
+        return self._by_id.get(slot_id)
+
+    def between(self, start: datetime, end: datetime) -> list[SlotView]:
+        """Slots overlapping ``[start, end)``; none if the range is empty."""
+        if end <= start:
+            return []
+        lo = bisect_right(self._ends, start)
+        hi = bisect_left(self._starts, end)
+        return self._slots[lo:hi]
+
+    def conflict(self, start: datetime, end: datetime) -> SlotView | None:
+        overlapping = self.between(start, end)
+        return overlapping[0] if overlapping else None
+
+    def add(self, slot: SlotView) -> None:
+        position = bisect_left(self._starts, slot.starts_at)
+        self._slots.insert(position, slot)
+        self._starts.insert(position, slot.starts_at)
+        self._ends.insert(position, slot.ends_at)
+        self._by_id[slot.id] = slot
+
+
+class AvailabilityIndex:
+    """
+    Per-agency availability served from memory instead of a SQL range scan.
+
+    An agency's upcoming slots are loaded on first use and reloaded after
+    ``ttl`` seconds; concurrent misses for the same agency share one load.
+    Writes made through this process are applied in place. Writes made by
+    other workers show up on the next reload. The index can therefore lag
+    the database by up to ``ttl``, which is fine for browsing, because
+    bookings are always checked against the row itself.
+    """
+
+    def __init__(self, ttl: float, max_agencies: int) -> None:
+        self.ttl = ttl
+        self.max_agencies = max_agencies
+        self._agencies: OrderedDict[int, AgencySlots] = OrderedDict()
+        self._locks: dict[int, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, agency_id: int) -> AgencySlots | None:
+        """The agency's entry if loaded and fresh, without touching the database."""
+        entry = self._agencies.get(agency_id)
+        if entry is None or entry.loaded_at + self.ttl <= time.monotonic():
+            return None
+        self._agencies.move_to_end(agency_id)
+        return entry
+
+    async def agency(self, db: AsyncSession, agency_id: int) -> AgencySlots:
+        entry = self.cached(agency_id)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        lock = self._locks.setdefault(agency_id, asyncio.Lock())
+        async with lock:
+            entry = self.cached(agency_id)
+            if entry is None:
+                loaded_at = time.monotonic()
+                slots = await list_upcoming_slots(db, agency_id, datetime.now(timezone.utc))
+                entry = AgencySlots((SlotView.from_orm_slot(slot) for slot in slots), loaded_at)
+                self._store(agency_id, entry)
+        return entry
+
+    def _store(self, agency_id: int, entry: AgencySlots) -> None:
+        self._agencies[agency_id] = entry
+        self._agencies.move_to_end(agency_id)
+        while len(self._agencies) > self.max_agencies:
+            evicted, _ = self._agencies.popitem(last=False)
+            lock = self._locks.get(evicted)
+            if lock is not None and not lock.locked():
+                del self._locks[evicted]
+
+    async def between(self, db: AsyncSession, agency_id: int, start: datetime, end: datetime) -> list[SlotView]:
+        return (await self.agency(db, agency_id)).between(start, end)
+
+    def slot_created(self, slot: TourSlot) -> None:
+        entry = self._agencies.get(slot.agency_id)
+        if entry is not None and entry.get(slot.id) is None:
+            entry.add(SlotView.from_orm_slot(slot))
+
+    def booked_changed(self, agency_id: int, slot_id: int, booked: int) -> None:
+        entry = self._agencies.get(agency_id)
+        slot = entry.get(slot_id) if entry is not None else None
+        if slot is not None:
+            slot.booked = booked
+
+    def invalidate(self, agency_id: int) -> None:
+        self._agencies.pop(agency_id, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "agencies": len(self._agencies),
+            "slots": sum(len(entry) for entry in self._agencies.values()),
+            "max_agencies": self.max_agencies,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+availability_index = AvailabilityIndex(
+    ttl=settings.availability_index_ttl_seconds,
+    max_agencies=settings.availability_index_max_agencies,
+)
@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import logging
+import time
+
+from app.crud.crud_capacity import rebuild_daily_capacity
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild(agency_id: int | None = None) -> int:
+    """
+    Rebuild the daily capacity rollup from tour_slots.
+
+    Slot and booking writes wait while this runs, so run it off-peak. It is
+    only needed after changing ``calendar_timezone``, after a manual data
+    fix, or when the rollup is first introduced.
+    """
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        rows = await rebuild_daily_capacity(db, agency_id)
+
+    logger.info(
+        "Rebuilt %d daily capacity rows%s (%.3fs)",
+        rows,
+        f" for agency {agency_id}" if agency_id is not None else "",
+        time.perf_counter() - started,
+    )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the per-agency daily capacity rollup.")
+    parser.add_argument("--agency-id", type=int, default=None, help="Only rebuild this agency")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    rows = asyncio.run(rebuild(args.agency_id))
+    print(f"rows_written={rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+import asyncio
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# SQL time of the request being handled; None outside requests (background tasks).
+_request_sql: ContextVar[list[float] | None] = ContextVar("request_sql", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, int] = defaultdict(int)
+
+    def inc(self, *labels: Any, amount: int = 1) -> None:
+        self._values[labels] += amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. ``observe`` is one bisect and two additions;
+    buckets are only made cumulative when rendered.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str], buckets: Sequence[float]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = defaultdict(float)
+
+    def observe(self, value: float, *labels: Any) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, counts in list(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_number(self._sums[labels])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge:
+    """Read at scrape time from ``read``, which returns a value or ``{labels: value}``."""
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], Any], labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} gauge"
+        values = self.read()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in values.items():
+            if value is not None:
+                yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}"
+
+
+class StatsGauges:
+    """One gauge per numeric field of an existing ``stats()`` dict, read once per scrape."""
+
+    def __init__(self, prefix: str, read: Callable[[], dict[str, Any]]) -> None:
+        self.prefix = prefix
+        self.read = read
+
+    def render(self) -> Iterable[str]:
+        for key, value in self.read().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            yield f"# TYPE {name} gauge"
+            yield f"{name} {_format_number(value)}"
+
+
+class ServiceMetrics:
+    """
+    Request, SQL and event-loop metrics for one service, in Prometheus text format.
+
+    Everything is recorded in-process with plain dicts and lists; the cost per
+    request is a few dictionary updates, so it is meant to stay on in
+    production. SQL statements are attributed to the route that issued them,
+    or to ``background`` when no request is active.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram | Gauge | StatsGauges] = []
+        self.in_progress = 0
+        self.last_loop_lag = 0.0
+
+        self.requests = self.counter("http_requests_total", "HTTP responses by route and status.", ("method", "route", "status"))
+        self.request_latency = self.histogram(
+            "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"), LATENCY_BUCKETS,
+        )
+        self.gauge("http_requests_in_progress", "HTTP requests currently being handled.", lambda: self.in_progress)
+        self.sql_latency = self.histogram(
+            "db_statement_duration_seconds", "SQL statement latency by the route that issued it.", ("route",), SQL_BUCKETS,
+        )
+        self.sql_per_request = self.histogram(
+            "db_statements_per_request", "SQL statements issued per request.", ("route",), COUNT_BUCKETS,
+        )
+        self.sql_time_per_request = self.histogram(
+            "db_time_per_request_seconds", "Total SQL time per request.", ("route",), LATENCY_BUCKETS,
+        )
+        self.loop_lag = self.histogram(
+            "event_loop_lag_seconds", "How late the event loop ran a timer callback.", (), LAG_BUCKETS,
+        )
+        self.gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample.", lambda: self.last_loop_lag)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str], buckets: Sequence[float]) -> Histogram:
+        metric = Histogram(name, help_text, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], Any], labelnames: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(name, help_text, read, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def stats_gauges(self, prefix: str, read: Callable[[], dict[str, Any]]) -> StatsGauges:
+        metric = StatsGauges(prefix, read)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def observe_request(self, method: str, route: str, status: int, elapsed: float, sql: list[float]) -> None:
+        self.requests.inc(method, route, status)
+        self.request_latency.observe(elapsed, method, route)
+        self.sql_per_request.observe(len(sql), route)
+        if sql:
+            self.sql_time_per_request.observe(sum(sql), route)
+            for duration in sql:
+                self.sql_latency.observe(duration, route)
+
+    def instrument_engine(self, engine: AsyncEngine) -> None:
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._metrics_started = time.perf_counter()
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - context._metrics_started
+            sql = _request_sql.get()
+            if sql is None:
+                self.sql_latency.observe(elapsed, "background")
+            else:
+                sql.append(elapsed)
+
+    async def monitor_event_loop(self, interval: float) -> None:
+        """Sleep ``interval`` in a loop and record how late each wake-up was."""
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + interval
+            await asyncio.sleep(interval)
+            self.last_loop_lag = max(0.0, loop.time() - scheduled)
+            self.loop_lag.observe(self.last_loop_lag)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware feeding ``ServiceMetrics``.
+
+    Routes are labelled with their path template (``/agency/{agency_id}``),
+    which FastAPI leaves in the scope after routing, so label cardinality
+    stays bounded; requests that match no route share ``unmatched``.
+    """
+
+    def __init__(self, app, metrics: ServiceMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        sql: list[float] = []
+        token = _request_sql.set(sql)
+        self.metrics.in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.metrics.in_progress -= 1
+            _request_sql.reset(token)
+            route = scope.get("route")
+            self.metrics.observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                elapsed,
+                sql,
+            )
+
+
+metrics = ServiceMetrics()
@@ -0,0 +1,65 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.schemas.token import TokenPayload
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of already verified access tokens.
+
+    Entries are keyed by a SHA-256 digest of the raw token, so the bearer
+    secret itself is never kept in memory, and each entry is dropped once the
+    token's ``exp`` has passed. ``get_token_payload`` is a sync dependency
+    and runs in FastAPI's threadpool, so every access holds a lock.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, TokenPayload] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, key: bytes) -> TokenPayload | None:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+
+            if payload.exp <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: bytes, payload: TokenPayload) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(max_size=settings.token_cache_max_size)
@@ -0,0 +1,189 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import availability
+from app.services.availability import AgencySlots, AvailabilityIndex, SlotView
+
+BASE = datetime(2030, 6, 1, 10, tzinfo=timezone.utc)
+
+
+def at(hours: float) -> datetime:
+    return BASE + timedelta(hours=hours)
+
+
+def view(slot_id: int, start: float, end: float, agency_id: int = 1, capacity: int = 10, booked: int = 0) -> SlotView:
+    return SlotView(id=slot_id, agency_id=agency_id, starts_at=at(start), ends_at=at(end), capacity=capacity, booked=booked)
+
+
+def ids(slots: list[SlotView]) -> list[int]:
+    return [slot.id for slot in slots]
+
+
+@pytest.fixture
+def day() -> AgencySlots:
+    # 10-11, 11-12 (touching), then a gap, then 14-16; given out of order.
+    return AgencySlots([view(3, 4, 6), view(1, 0, 1), view(2, 1, 2)], loaded_at=0.0)
+
+
+def test_between_returns_overlapping_slots_in_start_order(day):
+    assert ids(day.between(at(-1), at(10))) == [1, 2, 3]
+    assert ids(day.between(at(0.5), at(1.5))) == [1, 2]
+    assert ids(day.between(at(5), at(5.5))) == [3]
+
+
+def test_between_treats_ranges_as_half_open(day):
+    # A range ending where a slot starts, or starting where it ends, does not overlap it.
+    assert ids(day.between(at(-1), at(0))) == []
+    assert ids(day.between(at(2), at(4))) == []
+    assert ids(day.between(at(6), at(7))) == []
+    assert ids(day.between(at(1), at(2))) == [2]
+    assert ids(day.between(at(0), at(1))) == [1]
+
+
+def test_between_returns_nothing_for_empty_or_inverted_ranges(day):
+    assert day.between(at(0.5), at(0.5)) == []
+    assert day.between(at(1), at(1)) == []
+    assert day.between(at(5), at(0.5)) == []
+    assert AgencySlots([], loaded_at=0.0).between(at(0), at(10)) == []
+
+
+def test_conflict_allows_touching_slots_and_reports_the_first_overlap(day):
+    assert day.conflict(at(2), at(4)) is None
+    assert day.conflict(at(6), at(8)) is None
+    assert day.conflict(at(1.5), at(4.5)).id == 2
+    assert day.conflict(at(-1), at(0.25)).id == 1
+
+
+def test_add_keeps_slots_sorted_and_indexed(day):
+    day.add(view(4, 2.5, 3.5))
+
+    assert ids(day.between(at(0), at(10))) == [1, 2, 4, 3]
+    assert ids(day.between(at(2), at(3))) == [4]
+    assert day.get(4).starts_at == at(2.5)
+    assert len(day) == 4
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(availability, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def loads(monkeypatch) -> list[int]:
+    """Agency ids passed to list_upcoming_slots, which returns one slot per agency."""
+    calls: list[int] = []
+
+    async def list_upcoming_slots(db, agency_id, now):
+        calls.append(agency_id)
+        return [
+            SimpleNamespace(
+                id=agency_id * 100, agency_id=agency_id,
+                starts_at=at(0).replace(tzinfo=None), ends_at=at(1).replace(tzinfo=None),
+                capacity=5, booked=len(calls),
+            )
+        ]
+
+    monkeypatch.setattr(availability, "list_upcoming_slots", list_upcoming_slots)
+    return calls
+
+
+async def test_index_serves_from_memory_until_the_ttl_expires(clock, loads):
+    index = AvailabilityIndex(ttl=30.0, max_agencies=10)
+
+    first = await index.agency(None, 1)
+    clock.now += 29.9
+    assert await index.agency(None, 1) is first
+    assert loads == [1]
+
+    clock.now += 0.1
+    assert index.cached(1) is None
+    reloaded = await index.agency(None, 1)
+
+    assert reloaded is not first
+    assert loads == [1, 1]
+    assert (index.hits, index.misses) == (1, 2)
+
+
+async def test_loaded_naive_timestamps_are_read_as_utc(clock, loads):
+    index = AvailabilityIndex(ttl=30.0, max_agencies=10)
+
+    slots = await index.between(None, 1, at(0.5), at(0.75))
+
+    assert slots[0].starts_at == at(0)
+    assert slots[0].starts_at.tzinfo is timezone.utc
+
+
+async def test_index_evicts_the_least_recently_used_agency(clock, loads):
+    index = AvailabilityIndex(ttl=30.0, max_agencies=2)
+    await index.agency(None, 1)
+    await index.agency(None, 2)
+
+    await index.agency(None, 1)  # 2 is now the least recently used
+    await index.agency(None, 3)
+
+    assert index.cached(2) is None
+    assert index.cached(1) is not None
+    assert index.cached(3) is not None
+    assert 2 not in index._locks
+    assert index.stats()["agencies"] == 2
+
+
+async def test_concurrent_misses_share_one_load(clock, monkeypatch):
+    release = asyncio.Event()
+    calls = 0
+
+    async def list_upcoming_slots(db, agency_id, now):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return []
+
+    monkeypatch.setattr(availability, "list_upcoming_slots", list_upcoming_slots)
+    index = AvailabilityIndex(ttl=30.0, max_agencies=10)
+
+    waiters = [asyncio.create_task(index.agency(None, 1)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    entries = await asyncio.gather(*waiters)
+
+    assert calls == 1
+    assert all(entry is entries[0] for entry in entries)
+
+
+async def test_local_writes_are_applied_in_place(clock, loads):
+    index = AvailabilityIndex(ttl=30.0, max_agencies=10)
+    await index.agency(None, 1)
+
+    index.slot_created(SimpleNamespace(id=7, agency_id=1, starts_at=at(2), ends_at=at(3), capacity=4, booked=0))
+    index.booked_changed(1, 100, 5)
+    index.booked_changed(1, 999, 1)  # unknown slot: ignored
+    index.slot_created(SimpleNamespace(id=8, agency_id=2, starts_at=at(2), ends_at=at(3), capacity=4, booked=0))
+
+    slots = await index.between(None, 1, at(0), at(10))
+    assert ids(slots) == [100, 7]
+    assert slots[0].remaining == 0
+    assert index.cached(2) is None
+    assert loads == [1]
+
+
+async def test_invalidate_forces_a_reload(clock, loads):
+    index = AvailabilityIndex(ttl=30.0, max_agencies=10)
+    await index.agency(None, 1)
+
+    index.invalidate(1)
+    await index.agency(None, 1)
+
+    assert loads == [1, 1]
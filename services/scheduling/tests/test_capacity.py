@@ -0,0 +1,104 @@
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.core.exceptions import SlotFull
+from app.crud import crud_capacity
+from app.crud.crud_capacity import calendar_day, get_daily_capacity, rebuild_daily_capacity
+from app.crud.crud_slot import book_slot, cancel_booking, create_slot
+from app.db.session import AsyncSessionLocal
+from app.models.agency import Agency
+from app.models.capacity import DailyCapacity
+from app.schemas.slot import SlotCreate
+
+DAY = datetime(2030, 3, 1, tzinfo=timezone.utc)
+
+
+def slot(start_hour: float, hours: float = 1, capacity: int = 10) -> SlotCreate:
+    starts_at = DAY + timedelta(hours=start_hour)
+    return SlotCreate(starts_at=starts_at, ends_at=starts_at + timedelta(hours=hours), capacity=capacity)
+
+
+def totals(rows: list[DailyCapacity]) -> dict[date, tuple[int, int, int]]:
+    return {row.day: (row.slots, row.capacity, row.booked) for row in rows}
+
+
+async def rollup(agency_id: int) -> dict[date, tuple[int, int, int]]:
+    async with AsyncSessionLocal() as db:
+        return totals(await get_daily_capacity(db, agency_id, date(2030, 1, 1), date(2030, 12, 31)))
+
+
+def test_calendar_day_uses_the_configured_zone(monkeypatch):
+    late_evening_utc = datetime(2030, 3, 1, 22, 30, tzinfo=timezone.utc)
+
+    assert calendar_day(late_evening_utc) == date(2030, 3, 1)
+
+    monkeypatch.setattr(crud_capacity, "CALENDAR_TZ", ZoneInfo("Europe/Moscow"))
+    assert calendar_day(late_evening_utc) == date(2030, 3, 2)
+    assert calendar_day(datetime(2030, 3, 1, 20, 59, tzinfo=timezone.utc)) == date(2030, 3, 1)
+
+
+@pytest.fixture
+async def agencies(db_engine) -> None:
+    async with db_engine.begin() as conn:
+        await conn.execute(insert(Agency), [{"id": 1, "name": "One"}, {"id": 2, "name": "Two"}])
+
+
+async def test_slot_and_booking_writes_keep_the_rollup_current(agencies):
+    async with AsyncSessionLocal() as db:
+        morning = await create_slot(db, 1, slot(9, capacity=10))
+        await create_slot(db, 1, slot(10, capacity=5))  # touches the first slot
+        await create_slot(db, 1, slot(24 + 9, capacity=4))
+        await create_slot(db, 2, slot(9, capacity=7))
+
+        booking, _, _ = await book_slot(db, 1, morning.id, user_id=5, seats=3)
+        await book_slot(db, 1, morning.id, user_id=6, seats=2)
+        await cancel_booking(db, 1, booking.id)
+
+    assert await rollup(1) == {date(2030, 3, 1): (2, 15, 2), date(2030, 3, 2): (1, 4, 0)}
+    assert await rollup(2) == {date(2030, 3, 1): (1, 7, 0)}
+
+
+async def test_a_refused_booking_leaves_the_rollup_alone(agencies):
+    async with AsyncSessionLocal() as db:
+        small = await create_slot(db, 1, slot(9, capacity=2))
+        with pytest.raises(SlotFull):
+            await book_slot(db, 1, small.id, user_id=5, seats=3)
+
+    assert await rollup(1) == {date(2030, 3, 1): (1, 2, 0)}
+
+
+async def test_get_daily_capacity_bounds_are_inclusive(agencies):
+    async with AsyncSessionLocal() as db:
+        for day in range(3):
+            await create_slot(db, 1, slot(24 * day + 9))
+
+        rows = await get_daily_capacity(db, 1, date(2030, 3, 2), date(2030, 3, 3))
+
+    assert [row.day for row in rows] == [date(2030, 3, 2), date(2030, 3, 3)]
+
+
+async def test_rebuild_restores_a_damaged_rollup(agencies):
+    async with AsyncSessionLocal() as db:
+        first = await create_slot(db, 1, slot(9, capacity=10))
+        await create_slot(db, 1, slot(24 + 9, capacity=4))
+        await create_slot(db, 2, slot(9, capacity=7))
+        await book_slot(db, 1, first.id, user_id=5, seats=3)
+    expected = {1: await rollup(1), 2: await rollup(2)}
+
+    async with AsyncSessionLocal() as db:
+        for row in (await db.execute(select(DailyCapacity))).scalars():
+            row.booked += 100
+        db.add(DailyCapacity(agency_id=1, day=date(2030, 4, 1), slots=9, capacity=9, booked=0))
+        await db.commit()
+
+    async with AsyncSessionLocal() as db:
+        assert await rebuild_daily_capacity(db, agency_id=1) == 2
+    assert await rollup(1) == expected[1]
+    assert (await rollup(2))[date(2030, 3, 1)][2] == 100  # other agencies untouched
+
+    async with AsyncSessionLocal() as db:
+        assert await rebuild_daily_capacity(db) == 3
+    assert {1: await rollup(1), 2: await rollup(2)} == expected
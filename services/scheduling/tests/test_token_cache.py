@@ -0,0 +1,75 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from app.schemas.token import TokenPayload
+from app.services.token_cache import TokenCache
+
+
+def payload(exp: float) -> TokenPayload:
+    return TokenPayload(sub=1, email="a@example.com", role="agency_manager", exp=int(exp), scope="access_token")
+
+
+@pytest.fixture
+def fast_switching():
+    # Switch threads as often as possible so unguarded check-then-act sequences interleave.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_get_returns_live_entries_and_drops_expired_ones():
+    cache = TokenCache(max_size=10)
+    cache.put(b"live", payload(time.time() + 60))
+    cache.put(b"expired", payload(time.time() - 1))
+
+    assert cache.get(b"live") is not None
+    assert cache.get(b"expired") is None
+    assert cache.get(b"unknown") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 2}
+
+
+def test_put_evicts_the_least_recently_used_entry():
+    cache = TokenCache(max_size=2)
+    cache.put(b"a", payload(time.time() + 60))
+    cache.put(b"b", payload(time.time() + 60))
+    cache.get(b"a")
+    cache.put(b"c", payload(time.time() + 60))
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is not None
+    assert cache.get(b"c") is not None
+
+
+def test_concurrent_gets_and_puts_from_worker_threads(fast_switching):
+    cache = TokenCache(max_size=8)
+    keys = [bytes([i]) for i in range(16)]
+    expired = payload(time.time() - 1)
+    live = payload(time.time() + 60)
+    errors: list[BaseException] = []
+
+    def worker(offset: int) -> None:
+        try:
+            for i in range(5000):
+                key = keys[(i + offset) % len(keys)]
+                # Expired entries make concurrent gets race to delete the same key,
+                # and puts past max_size evict keys other threads are about to touch.
+                cache.put(key, expired if i % 3 == 0 else live)
+                cache.get(key)
+                cache.get(keys[(i * 7 + offset) % len(keys)])
+        except BaseException as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    stats = cache.stats()
+    assert stats["size"] <= 8
+    assert stats["hits"] + stats["misses"] == 8 * 5000 * 2
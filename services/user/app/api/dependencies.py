@@ -1,32 +1,129 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+import ipaddress
+import secrets
+from functools import lru_cache
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from app.services.security import decode_token
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.db.deps import get_db
-from app.models.user import RoleEnum, User
-from app.crud.crud_user import get_user_by_email
+from app.models.user import RoleEnum
+from app.crud.crud_user import get_user_by_id
 from app.core.exceptions import PermissionRequired, TokenInvalid, UserNotFound
+from app.services.rate_limit import rate_limiter
+from app.services.user_cache import CachedUser, user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
+def decode_claims(token: str) -> dict:
     try:
         payload = decode_token(token)
+        payload["sub"] = int(payload["sub"])
     except Exception:
         raise TokenInvalid()
-    
-    user = await get_user_by_email(db, payload["email"])
+
+    return payload
+
+def get_gateway_identity(request: Request) -> CachedUser | None:
+    """
+    Return the identity the gateway already verified, if this service trusts it.
+
+    Only honoured when ``trust_gateway_identity`` is enabled and the request
+    carries the ``gateway_shared_secret``, which settings require in that case.
+    """
+    if not settings.trust_gateway_identity:
+        return None
+
+    headers = request.headers
+    if "x-user-id" not in headers:
+        return None
+    if not secrets.compare_digest(
+        headers.get("x-gateway-token", "").encode(), settings.gateway_shared_secret.encode()
+    ):
+        return None
+
+    try:
+        return CachedUser(
+            id=int(headers["x-user-id"]),
+            email=headers.get("x-user-email", ""),
+            role=RoleEnum(headers.get("x-user-role")),
+            agency_id=int(headers["x-agency-id"]) if "x-agency-id" in headers else None,
+        )
+    except ValueError:
+        raise TokenInvalid()
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    identity: CachedUser | None = Depends(get_gateway_identity),
+    db: AsyncSession = Depends(get_db),
+) -> CachedUser:
+    if identity is not None:
+        return identity
+
+    user_id = decode_claims(token)["sub"]
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = await get_user_by_id(db, user_id)
     if not user:
         raise UserNotFound()
-    
-    return user
+
+    cached = CachedUser.from_orm_user(user)
+    user_cache.put(cached)
+    return cached
+
+def get_current_user_from_claims(
+    token: str = Depends(oauth2_scheme),
+    identity: CachedUser | None = Depends(get_gateway_identity),
+) -> CachedUser:
+    if identity is not None:
+        return identity
+
+    payload = decode_claims(token)
+    try:
+        return CachedUser(
+            id=payload["sub"],
+            email=payload["email"],
+            role=RoleEnum(payload["role"]),
+            agency_id=payload.get("agency_id"),
+        )
+    except (KeyError, ValueError):
+        raise TokenInvalid()
 
 def require_role(role: RoleEnum):
-    def role_checker(user: User = Depends(get_current_user)):
+    current_user = get_current_user_from_claims if settings.trust_token_claims else get_current_user
+
+    def role_checker(user: CachedUser = Depends(current_user)):
         if user.role != role:
             raise PermissionRequired()
         return user
     return role_checker
+
+TRUSTED_PROXIES = [ipaddress.ip_network(network, strict=False) for network in settings.trusted_proxies]
+
+@lru_cache(maxsize=1024)
+def is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+def client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else ""
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if forwarded_for and TRUSTED_PROXIES and is_trusted_proxy(peer):
+        # The gateway appends the address it saw last; earlier entries are client-controlled.
+        return forwarded_for.rsplit(",", 1)[-1].strip()
+    return peer
+
+def rate_limit(route: str):
+    def limiter(request: Request) -> None:
+        rate_limiter.check(route, "ip", client_ip(request))
+    return limiter
+
+def rate_limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()) -> None:
+    rate_limiter.check("login", "ip", client_ip(request))
+    rate_limiter.check("login", "email", form_data.username.strip().lower())
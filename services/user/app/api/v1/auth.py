@@ -2,31 +2,40 @@ from datetime import datetime, timedelta, timezone
 import secrets
 from fastapi import APIRouter, Depends, Header, Response, Cookie, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jwt import ExpiredSignatureError, PyJWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.deps import get_db
 from app.schemas.user import UserCreate, UserOut
 from app.schemas.token import Token, TokenUser
 from app.crud.crud_user import get_user_by_email, create_user
-from app.services.security import verify_password, create_access_token, create_refresh_token, decode_token
+from app.services.hashing import password_hasher
+from app.services.security import TokenExpiredError, create_access_token, create_refresh_token, decode_token
 import app.core.exceptions as api_exceptions
 from app.core.config import settings
+from app.core.responses import SchemaResponse
 from app.schemas.error import ErrorResponse
-from app.api.dependencies import get_current_user, require_role
+from app.api.dependencies import get_current_user, rate_limit, rate_limit_login, require_role
 from app.models.user import RoleEnum
-from app.crud.crud_token import create_refresh_token_entry, get_valid_refresh_token, consume_refresh_token
+from app.services.keys import signing_keys
+from app.crud.crud_token import create_refresh_token_entry, rotate_refresh_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+user_out = SchemaResponse(UserOut)
+token_out = SchemaResponse(Token)
+token_user_out = SchemaResponse(TokenUser)
+
 @router.post(
         "/register",
+        dependencies=[Depends(rate_limit("register"))],
         response_model=UserOut,
         status_code=status.HTTP_201_CREATED,
         responses={
         400: {"model": ErrorResponse, "description": "Email already registered"},
         422: {"model": ErrorResponse, "description": "Validation Error"},
+        429: {"model": ErrorResponse, "description": "Too many requests"},
+        503: {"model": ErrorResponse, "description": "Password hashing overloaded"},
     },
 )
 async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
@@ -44,18 +53,20 @@ async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
 
     Raises:
         EmailAlreadyRegistered: If a user with this email already exists.
+        PasswordHashingUnavailable: If the password hashing pool is saturated.
     """
 
-    if await get_user_by_email(db, user_in.email):
-        raise api_exceptions.EmailAlreadyRegistered(user_in.email)
-    return await create_user(db, user_in)
+    return user_out.render(await create_user(db, user_in), status.HTTP_201_CREATED)
 
 @router.post(
         "/login",
+        dependencies=[Depends(rate_limit_login)],
         response_model=TokenUser,
         responses={
         401: {"model": ErrorResponse, "description": "Invalid credentials"},
         422: {"model": ErrorResponse, "description": "Validation Error"},
+        429: {"model": ErrorResponse, "description": "Too many requests"},
+        503: {"model": ErrorResponse, "description": "Password hashing overloaded"},
     },
 )
 async def login(response: Response, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
@@ -75,10 +86,11 @@ async def login(response: Response, form_data: OAuth2PasswordRequestForm = Depen
 
     Raises:
         InvalidCredentials: If the username or password is incorrect.
+        PasswordHashingUnavailable: If the password hashing pool is saturated.
     """
 
     user = await get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise api_exceptions.InvalidCredentials()
 
     data = {
@@ -116,24 +128,21 @@ async def login(response: Response, form_data: OAuth2PasswordRequestForm = Depen
         max_age=settings.refresh_token_expire_minutes * 60,
     )
 
-    return {
+    return token_user_out.render({
         "access_token": access_token,
         "token_type": "bearer",
-        "user": {
-            "id": user.id,
-            "email": user.email,
-            "role": user.role,
-            "agency_id": user.agency_id
-        }
-    }
+        "user": user,
+    }, response=response)
 
 @router.post(
         "/refresh",
+        dependencies=[Depends(rate_limit("refresh"))],
         response_model=Token,
         responses={
         401: {"model": ErrorResponse, "description": "Invalid or expired refresh token"},
         403: {"model": ErrorResponse, "description": "CSRF validation failed"},
         422: {"model": ErrorResponse, "description": "Validation Error"},
+        429: {"model": ErrorResponse, "description": "Too many requests"},
     },
 )
 async def refresh(
@@ -161,38 +170,32 @@ async def refresh(
     Raises:
         CSRFInvalid: If the CSRF tokens do not match.
         TokenExpired: If the refresh token has expired.
-        TokenInvalid: If the refresh token is otherwise invalid.
+        TokenInvalid: If the refresh token is unknown, already rotated or otherwise invalid.
         TokenWrongScope: If the token’s scope is not "refresh_token".
     """
 
     if csrf_token_cookie != csrf_token_header:
         raise api_exceptions.CSRFInvalid()
     
-    token_record = await get_valid_refresh_token(db, refresh_token)
-    if not token_record:
-        raise api_exceptions.TokenInvalid()
-
     try:
         payload = decode_token(refresh_token)
-    except ExpiredSignatureError:
+    except TokenExpiredError:
         raise api_exceptions.TokenExpired()
-    except PyJWTError:
+    except ValueError:
         raise api_exceptions.TokenInvalid()
     
     if payload.get("scope") != "refresh_token":
         raise api_exceptions.TokenWrongScope()
     
-    data = {"sub": int(payload["sub"]), "agency_id": int(payload["agency_id"]), "email": payload["email"], "role": payload["role"]}
+    data = {"sub": int(payload["sub"]), "agency_id": payload.get("agency_id"), "email": payload["email"], "role": payload["role"]}
 
     new_access_token = create_access_token(data)
-
-    deleted = await consume_refresh_token(db, refresh_token)
-    if not deleted:
-        raise api_exceptions.TokenInvalid()
-    
     new_refresh_token = create_refresh_token(data)
     expire_dt = datetime.now(timezone.utc) + timedelta(minutes=settings.refresh_token_expire_minutes)
-    await create_refresh_token_entry(db, new_refresh_token, int(payload["sub"]), expire_dt)
+
+    rotated = await rotate_refresh_token(db, refresh_token, new_refresh_token, data["sub"], expire_dt)
+    if not rotated:
+        raise api_exceptions.TokenInvalid()
 
     new_csrf = secrets.token_urlsafe(16)
 
@@ -216,10 +219,10 @@ async def refresh(
         max_age=settings.refresh_token_expire_minutes * 60,
     )
 
-    return {
+    return token_out.render({
         "access_token": new_access_token,
         "token_type": "bearer"
-    }
+    }, response=response)
 
 @router.get(
     "/verify",
@@ -230,7 +233,7 @@ async def refresh(
         422: {"model": ErrorResponse, "description": "Validation Error"},
     },
 )
-async def verify(user = Depends(get_current_user)) -> UserOut:
+async def verify(user = Depends(get_current_user)) -> Response:
     """
     Verify that the request is authenticated and return the current user.
 
@@ -240,7 +243,7 @@ async def verify(user = Depends(get_current_user)) -> UserOut:
     Returns:
         The UserOut schema of the current user.
     """
-    return user
+    return user_out.render(user)
 
 @router.get(
     "/verify-admin",
@@ -253,7 +256,7 @@ async def verify(user = Depends(get_current_user)) -> UserOut:
         422: {"model": ErrorResponse, "description": "Validation Error"},
     },
 )
-async def verify_admin(user = Depends(get_current_user)) -> UserOut:
+async def verify_admin(user = Depends(get_current_user)) -> Response:
     """
     Verify that the request is authenticated by user with admin role and return the current user.
 
@@ -263,4 +266,26 @@ async def verify_admin(user = Depends(get_current_user)) -> UserOut:
     Returns:
         The UserOut schema of the current user.
     """
-    return user
\ No newline at end of file
+    return user_out.render(user)
+
+@router.get(
+    "/.well-known/jwks.json",
+    response_class=Response,
+    responses={200: {"content": {"application/json": {}}, "description": "JSON Web Key Set"}},
+)
+async def jwks() -> Response:
+    """
+    Publish the public keys that verify access tokens.
+
+    Verifiers index these keys by ``kid`` and refresh them in the background,
+    so keys can be rotated without restarting them. Empty when the service
+    signs with HS256.
+
+    Returns:
+        The JWKS document.
+    """
+    return Response(
+        content=signing_keys.jwks(),
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
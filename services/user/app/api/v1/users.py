@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies import require_role
+from app.core.exceptions import UnsupportedImportFormat
+from app.db.deps import get_db
+from app.models.user import RoleEnum
+from app.schemas.error import ErrorResponse
+from app.schemas.user import UserImportReport
+from app.services.user_import import CSV_CONTENT_TYPES, NDJSON_CONTENT_TYPES, import_users
+
+router = APIRouter(prefix="/auth/users", tags=["users"])
+
+@router.post(
+    "/import",
+    dependencies=[Depends(require_role(RoleEnum.CENTER_ADMIN))],
+    response_model=UserImportReport,
+    status_code=status.HTTP_200_OK,
+    responses={
+        401: {"model": ErrorResponse, "description": "Not authenticated"},
+        403: {"model": ErrorResponse, "description": "Not enough permission"},
+        415: {"model": ErrorResponse, "description": "Unsupported import format"},
+        503: {"model": ErrorResponse, "description": "Password hashing overloaded or too slow"},
+    },
+)
+async def import_users_endpoint(request: Request, db: AsyncSession = Depends(get_db)) -> UserImportReport:
+    """
+    Bulk-create agency managers from a streamed CSV or NDJSON body.
+
+    CSV bodies need a header row with ``email``, ``password`` and ``agency_id``
+    columns; NDJSON bodies carry one object with the same keys per line.
+    Rows are processed as the body streams in, so uploads of any size run in
+    bounded memory apart from the returned report.
+
+    Args:
+        request: The incoming request whose body is streamed.
+        db: AsyncSession for database interaction.
+
+    Returns:
+        A UserImportReport with totals and one result per data row.
+
+    Raises:
+        UnsupportedImportFormat: If the Content-Type is neither CSV nor NDJSON.
+        PasswordHashingUnavailable: If another import holds the hashing pool or hashing misses its deadline.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in CSV_CONTENT_TYPES:
+        fmt = "csv"
+    elif content_type in NDJSON_CONTENT_TYPES:
+        fmt = "ndjson"
+    else:
+        raise UnsupportedImportFormat(content_type)
+
+    return await import_users(db, request.stream(), fmt)
@@ -1,12 +1,76 @@
-from pydantic import AnyUrl
+import ipaddress
+
+from pydantic import AnyUrl, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     database_url: AnyUrl
     secret_key: str
+    jwt_algorithm: str = "HS256" # "HS256", "RS256" or "EdDSA"
+    jwt_private_keys_dir: str | None = None # <kid>.pem private keys, required for RS256/EdDSA
+    jwt_active_kid: str | None = None
     access_token_expire_minutes: int = 15
     refresh_token_expire_minutes: int = 1440
     mode: str = "development" # TODO: Change for prod
+
+    trust_gateway_identity: bool = False # read identity headers set by the gateway instead of the JWT
+    gateway_shared_secret: str | None = None # required with trust_gateway_identity; must match the gateway's
+
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_pgbouncer_mode: bool = False # PgBouncer transaction pooling: no server-side prepared statement reuse
+    db_query_profiling: bool = True # per-request statement counts, slow query and N+1 logging
+    db_slow_query_seconds: float = 0.2 # 0 disables the slow query log
+    db_n_plus_one_threshold: int = 5 # warn when a request repeats one statement this often, 0 disables
+
+    password_hash_executor: str = "thread" # "thread" or "process"
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+    password_hash_timeout_seconds: float = 5.0
+    bulk_import_hash_workers: int | None = None # defaults to the number of CPUs
+    bulk_import_batch_size: int = 500 # rows hashed and inserted together, also the bulk pool's admission limit
+    bulk_import_timeout_seconds: float = 300.0 # deadline for hashing all passwords of one upload
+
+    user_cache_ttl_seconds: float = 30.0
+    user_cache_max_size: int = 10000
+    trust_token_claims: bool = False # role checks read the JWT claims instead of the database
+
+    rate_limit_enabled: bool = True
+    # "<route>:<ip|email>" -> (requests per minute, burst)
+    rate_limits: dict[str, tuple[float, int]] = {
+        "login:ip": (30, 30),
+        "login:email": (10, 10),
+        "register:ip": (10, 10),
+        "refresh:ip": (60, 60),
+    }
+    # Gateway addresses or CIDRs, e.g. ["172.16.0.0/12"]. Requests from them are rate
+    # limited by the client IP in X-Forwarded-For. With trust_gateway_identity and
+    # no trusted proxies, per-IP limits are disabled rather than shared by all clients.
+    trusted_proxies: list[str] = []
+
+    token_sweep_interval_seconds: float = 3600.0 # 0 disables the in-process sweeper
+    token_sweep_batch_size: int = 1000
+    token_sweep_pause_seconds: float = 0.1
+
+    metrics_enabled: bool = True # Prometheus /metrics, request and SQL timing
+    event_loop_lag_interval_seconds: float = 0.5 # 0 disables the lag monitor
+
+    tracing_service_name: str = "user"
+    tracing_exporter: str = "memory" # "memory", "file" (JSON lines, recent traces also kept in memory) or "none"
+    tracing_file: str = "traces.jsonl"
+    tracing_sample_ratio: float = 0.1 # for traces started here; continued traces follow the caller's traceparent
+    tracing_max_traces: int = 1000
+
+    profiling_enabled: bool = True # admin-armed or header-selected request profiling
+    profiling_token: str | None = None # requests sending "X-Profile: <token>" are profiled
+    profiling_sample_ratio: float = 0.0 # share of all requests profiled at random
+    profiling_interval_seconds: float = 0.005
+    profiling_max_seconds: float = 30.0 # samples kept per request
+    profiling_max_profiles: int = 20
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -16,4 +80,18 @@ class Settings(BaseSettings):
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
 
+    @field_validator("trusted_proxies")
+    @classmethod
+    def check_trusted_proxies(cls, value: list[str]) -> list[str]:
+        for network in value:
+            ipaddress.ip_network(network, strict=False)
+        return value
+
+    @model_validator(mode="after")
+    def check_gateway_trust(self) -> "Settings":
+        # Without the secret anyone reaching the service directly could claim any identity.
+        if self.trust_gateway_identity and not self.gateway_shared_secret:
+            raise ValueError("trust_gateway_identity requires gateway_shared_secret")
+        return self
+
 settings = Settings()
@@ -21,7 +21,7 @@ class TokenExpired(HTTPException):
     def __init__(self):
         super().__init__(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token scope is incorrect"
+            detail="Refresh token has expired"
         )
 
 class TokenInvalid(HTTPException):
@@ -57,4 +57,34 @@ class PermissionRequired(HTTPException):
         super().__init__(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
-        )
\ No newline at end of file
+        )
+
+class PasswordHashingUnavailable(HTTPException):
+    def __init__(self, retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password hashing is temporarily overloaded, please retry",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+class UnsupportedImportFormat(HTTPException):
+    def __init__(self, content_type: str):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported import format {content_type!r}, expected text/csv or application/x-ndjson"
+        )
+
+class TooManyRequests(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please retry later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+class ProfileNotFound(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
@@ -1,5 +1,6 @@
+import uuid
 from datetime import datetime, timezone
-from sqlalchemy import delete, select, update
+from sqlalchemy import delete, insert, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.token import RefreshToken
@@ -18,30 +19,63 @@ async def create_refresh_token_entry(
     await db.refresh(db_obj)
     return db_obj
 
-async def get_valid_refresh_token(
+async def rotate_refresh_token(
     db: AsyncSession,
-    raw_token: str
-) -> RefreshToken | None:
-    token_hash = RefreshToken.hash_token(raw_token)
+    old_raw_token: str,
+    new_raw_token: str,
+    user_id: int,
+    expires_at: datetime
+) -> bool:
+    """
+    Atomically replace a refresh token with a new one.
 
-    q = select(RefreshToken).where(
-        RefreshToken.token_hash == token_hash,
-        RefreshToken.expires_at > datetime.now(timezone.utc),
+    The old row is removed with ``DELETE ... RETURNING`` inside a CTE that
+    feeds the ``INSERT`` of the new row, so the rotation is a single
+    statement and a single commit. When two requests race on the same
+    token, the loser's DELETE matches nothing after the winner commits,
+    no row is inserted, and the call returns False.
+    """
+    consumed = (
+        delete(RefreshToken)
+        .where(
+            RefreshToken.token_hash == RefreshToken.hash_token(old_raw_token),
+            RefreshToken.user_id == user_id,
+            RefreshToken.expires_at > datetime.now(timezone.utc),
+        )
+        .returning(RefreshToken.user_id)
+        .cte("consumed")
+    )
+    stmt = (
+        insert(RefreshToken)
+        .from_select(
+            ["id", "user_id", "token_hash", "expires_at"],
+            select(
+                literal(uuid.uuid4()),
+                consumed.c.user_id,
+                literal(RefreshToken.hash_token(new_raw_token)),
+                literal(expires_at, RefreshToken.expires_at.type),
+            ),
+        )
+        .returning(RefreshToken.id)
     )
 
-    result = await db.execute(q)
-    return result.scalars().first()
+    result = await db.execute(stmt)
+    rotated = result.first() is not None
+    await db.commit()
+    return rotated
 
-async def consume_refresh_token(db: AsyncSession, raw_token: str) -> bool:
-    token_hash = RefreshToken.hash_token(raw_token)
+async def delete_expired_refresh_tokens(db: AsyncSession, batch_size: int) -> int:
+    expired_ids = (
+        select(RefreshToken.id)
+        .where(RefreshToken.expires_at <= datetime.now(timezone.utc))
+        .limit(batch_size)
+        .scalar_subquery()
+    )
     stmt = (
         delete(RefreshToken)
-        .where(
-            RefreshToken.token_hash == token_hash,
-            RefreshToken.expires_at > datetime.now(timezone.utc),
-        )
-        .execution_options(synchronize_session="fetch")
+        .where(RefreshToken.id.in_(expired_ids))
+        .execution_options(synchronize_session=False)
     )
     result = await db.execute(stmt)
     await db.commit()
-    return result.rowcount == 1
+    return result.rowcount
@@ -1,10 +1,12 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.services.security import hash_password
-from app.core.exceptions import UserNotFound
+from app.services.hashing import password_hasher
+from app.core.exceptions import EmailAlreadyRegistered, UserNotFound
+from app.services.user_cache import user_cache
 
 async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     stmt = (
@@ -14,15 +16,27 @@ async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
     result = await db.execute(stmt)
     return result.scalars().first()
 
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
+    return await db.get(User, user_id)
+
 async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
-    user = User(
-        agency_id=user_in.agency_id,
-        email=user_in.email,
-        hashed_password=hash_password(user_in.password)
+    stmt = (
+        pg_insert(User)
+        .values(
+            agency_id=user_in.agency_id,
+            email=user_in.email,
+            hashed_password=await password_hasher.hash(user_in.password)
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
     )
-    db.add(user)
+    result = await db.execute(stmt)
+    user = result.scalars().first()
+    if user is None:
+        await db.rollback()
+        raise EmailAlreadyRegistered(user_in.email)
+
     await db.commit()
-    await db.refresh(user)
     return user
 
 async def update_user(db: AsyncSession, new_user_in: UserUpdate) -> User:
@@ -37,5 +51,15 @@ async def update_user(db: AsyncSession, new_user_in: UserUpdate) -> User:
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    user_cache.invalidate(user.id)
 
-    return user
\ No newline at end of file
+    return user
+
+async def delete_user(db: AsyncSession, id: int) -> None:
+    user = await db.get(User, id)
+    if not user:
+        raise UserNotFound()
+
+    await db.delete(user)
+    await db.commit()
+    user_cache.invalidate(id)
\ No newline at end of file
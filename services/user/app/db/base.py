@@ -1,3 +1,5 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
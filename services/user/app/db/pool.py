@@ -0,0 +1,51 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+import time
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long callers wait for a connection.
+
+    ``_do_get`` is where the pool blocks when every connection is checked
+    out, so timing it captures queueing under load as well as the cost of
+    opening new connections.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.acquisitions += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "timeout_seconds": self.timeout(),
+            "acquisitions": self.acquisitions,
+            "timeouts": self.timeouts,
+            "wait_avg_seconds": self.wait_total / self.acquisitions if self.acquisitions else 0.0,
+            "wait_max_seconds": self.wait_max,
+        }
@@ -1,8 +1,50 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+import uuid
+
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool
+from app.db.profiler import install_query_profiler
 
 
 DATABASE_URL = str(settings.database_url)
-engine = create_async_engine(DATABASE_URL, future=True, echo=False)
+
+
+def _connect_args() -> dict:
+    if make_url(DATABASE_URL).get_driver_name() != "asyncpg":
+        return {}
+
+    if settings.db_pgbouncer_mode:
+        # PgBouncer in transaction mode may hand each transaction a different
+        # server connection, so prepared statements must never be reused by name.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    return {"prepared_statement_cache_size": settings.db_statement_cache_size}
+
+
+engine = create_async_engine(
+    DATABASE_URL,
+    future=True,
+    echo=False,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args=_connect_args(),
+)
 AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+if settings.db_query_profiling:
+    install_query_profiler(engine)
+
+
+def get_pool_stats() -> dict:
+    return engine.pool.stats()
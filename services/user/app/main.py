@@ -1,16 +1,54 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.dependencies import require_role
 from app.api.v1.auth import router as auth_router
+from app.api.v1.profiles import router as profiles_router
+from app.api.v1.users import router as users_router
 from app.core.exceptions import EmailAlreadyRegistered, InvalidCredentials
 from app.core.config import settings
+from app.db.session import engine, get_pool_stats
+from app.db.tracing import install_query_tracing
+from app.models.user import RoleEnum
+from app.services.hashing import bulk_password_hasher, password_hasher
+from app.services.metrics import MetricsMiddleware, metrics
+from app.services.sampling_profiler import ProfilingMiddleware, sampling_profiler
+from app.services.token_sweeper import run_token_sweeper
+from app.services.tracing import TracingMiddleware, tracer
+from app.services.user_cache import user_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper = None
+    if settings.token_sweep_interval_seconds > 0:
+        sweeper = asyncio.create_task(run_token_sweeper())
+    lag_monitor = None
+    if settings.metrics_enabled and settings.event_loop_lag_interval_seconds > 0:
+        lag_monitor = asyncio.create_task(metrics.monitor_event_loop(settings.event_loop_lag_interval_seconds))
+
+    yield
+
+    for task in (sweeper, lag_monitor):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    password_hasher.shutdown()
+    bulk_password_hasher.shutdown()
+    tracer.close()
 
 app = FastAPI(
     title="InnoTour Auth Service",
     version="0.1.0",
     docs_url="/docs",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 if settings.mode == "development":
@@ -18,6 +56,9 @@ if settings.mode == "development":
 else:
     origins = ["https://privet-stepa.kr"]
 
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=sampling_profiler)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -26,6 +67,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.metrics_enabled:
+    metrics.instrument_engine(engine)
+    metrics.stats_gauges("db_pool", get_pool_stats)
+    metrics.stats_gauges("password_hasher", password_hasher.metrics)
+    metrics.stats_gauges("user_cache", user_cache.stats)
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+if tracer.exporter is not None:
+    install_query_tracing(engine, tracer)
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
 @app.exception_handler(EmailAlreadyRegistered)
 async def handle_email_registered(request: Request, exc: EmailAlreadyRegistered):
     return JSONResponse(
@@ -48,7 +100,27 @@ async def handle_unexpected_error(request: Request, exc: Exception):
     )
 
 app.include_router(auth_router)
+app.include_router(users_router)
+if settings.profiling_enabled:
+    app.include_router(profiles_router)
 
 @app.get("/health", tags=["health"])
 async def health_check():
     return {"status": "ok"}
+
+@app.get("/health/password-hashing", tags=["health"])
+async def password_hashing_metrics():
+    return password_hasher.metrics()
+
+@app.get("/health/db-pool", tags=["health"])
+async def db_pool_stats():
+    return get_pool_stats()
+
+# Traces carry SQL text, routes and timings, so only center admins may read them.
+@app.get("/health/traces", tags=["health"], dependencies=[Depends(require_role(RoleEnum.CENTER_ADMIN))])
+async def recent_traces(limit: int = 20, trace_id: str | None = None):
+    return tracer.traces(limit, trace_id)
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -13,7 +13,12 @@ class User(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     email: Mapped[str] = mapped_column(unique=True, index=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(nullable=False)
-    role: Mapped[RoleEnum] = mapped_column(Enum(RoleEnum), default=RoleEnum.AGENCY_MANAGER, nullable=False)
+    # Stored by value ("admin", "agency_manager"), which is what the check constraint below compares against.
+    role: Mapped[RoleEnum] = mapped_column(
+        Enum(RoleEnum, values_callable=lambda roles: [role.value for role in roles]),
+        default=RoleEnum.AGENCY_MANAGER,
+        nullable=False,
+    )
 
     agency_id: Mapped[int | None] = mapped_column(nullable=True, index=True)
 
@@ -1,7 +1,12 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr
+from typing import Annotated, Literal, Optional
+from pydantic import BaseModel, ConfigDict, EmailStr, WithJsonSchema
 from app.models.user import RoleEnum
 
+# Emails are validated as EmailStr on the way in; re-parsing them on every
+# response costs more than the rest of the rendering, so output schemas only
+# keep the OpenAPI format.
+StoredEmail = Annotated[str, WithJsonSchema({"type": "string", "format": "email"})]
+
 class UserCreate(BaseModel):
     agency_id: int
     email: EmailStr
@@ -9,15 +14,27 @@ class UserCreate(BaseModel):
 
 class UserOut(BaseModel):
     id: int
-    email: EmailStr
+    email: StoredEmail
     role: RoleEnum
     agency_id: Optional[int] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class UserUpdate(BaseModel):
     id: int
     agency_id: int
     email: EmailStr
-    role: RoleEnum
\ No newline at end of file
+    role: RoleEnum
+
+class UserImportRow(BaseModel):
+    row: int
+    status: Literal["created", "duplicate", "invalid"]
+    email: Optional[str] = None
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class UserImportReport(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    rows: list[UserImportRow]
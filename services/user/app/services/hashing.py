@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core.config import settings
+from app.core.exceptions import PasswordHashingUnavailable
+from app.services.security import hash_password, verify_password
+from app.services.tracing import tracer
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded worker pool.
+
+    bcrypt is deliberately slow, so calling it from a request handler blocks
+    the event loop for every other request on the worker. Jobs are handed to a
+    thread or process pool instead, and once ``max_pending`` jobs are in flight
+    new ones are rejected with 503 rather than queued without limit.
+    """
+
+    def __init__(
+        self,
+        executor_kind: str = "thread",
+        workers: int = 4,
+        max_pending: int = 64,
+        timeout: float = 5.0,
+        latency_window: int = 1024,
+    ) -> None:
+        if executor_kind not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor: {executor_kind}")
+
+        self.executor_kind = executor_kind
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self._executor: Executor | None = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so importing the module (e.g. from alembic) never forks workers.
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    def _dispatch(self, fn: Callable[..., Any], *args: Any) -> asyncio.Future:
+        started = time.perf_counter()
+        future = asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        self._in_flight += 1
+        future.add_done_callback(lambda _: self._release(started))
+        return future
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self._in_flight >= self.max_pending:
+            self._rejected += 1
+            raise PasswordHashingUnavailable()
+
+        future = self._dispatch(fn, *args)
+        try:
+            # shield() keeps the slot occupied until the worker actually finishes,
+            # even if the caller gives up waiting.
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            raise PasswordHashingUnavailable()
+
+    def _release(self, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self._in_flight -= 1
+        self._completed += 1
+        self._latency_total += elapsed
+        self._latency_max = max(self._latency_max, elapsed)
+        self._latencies.append(elapsed)
+
+    async def hash(self, password: str) -> str:
+        with tracer.span("bcrypt.hash", in_flight=self._in_flight):
+            return await self._submit(hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        with tracer.span("bcrypt.verify", in_flight=self._in_flight):
+            return await self._submit(verify_password, plain, hashed)
+
+    async def hash_many(self, passwords: list[str], deadline: float) -> list[str]:
+        """
+        Hash ``passwords`` in chunks of at most ``max_pending`` jobs.
+
+        A chunk that does not fit next to the jobs already in flight is
+        rejected, and once the event loop's clock passes ``deadline`` the
+        queued jobs are cancelled; both raise PasswordHashingUnavailable.
+        """
+        loop = asyncio.get_running_loop()
+        hashes: list[str] = []
+        with tracer.span("bcrypt.hash_many", passwords=len(passwords)):
+            for start in range(0, len(passwords), self.max_pending):
+                chunk = passwords[start:start + self.max_pending]
+                if self._in_flight + len(chunk) > self.max_pending:
+                    self._rejected += 1
+                    raise PasswordHashingUnavailable()
+
+                jobs = asyncio.gather(*(self._dispatch(hash_password, p) for p in chunk))
+                try:
+                    hashes += await asyncio.wait_for(asyncio.shield(jobs), max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    self._timed_out += 1
+                    # Drops the jobs still queued; running ones finish and are discarded.
+                    jobs.cancel()
+                    jobs.add_done_callback(lambda done: done.cancelled() or done.exception())
+                    raise PasswordHashingUnavailable()
+        return hashes
+
+    def metrics(self) -> dict[str, Any]:
+        recent = sorted(self._latencies)
+
+        def percentile(q: float) -> float | None:
+            if not recent:
+                return None
+            return recent[min(len(recent) - 1, int(q * len(recent)))]
+
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self.workers),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "latency_avg_seconds": self._latency_total / self._completed if self._completed else None,
+            "latency_p50_seconds": percentile(0.50),
+            "latency_p95_seconds": percentile(0.95),
+            "latency_p99_seconds": percentile(0.99),
+            "latency_max_seconds": self._latency_max,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_kind=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    timeout=settings.password_hash_timeout_seconds,
+)
+
+# Bulk imports get their own process pool so a large upload never queues
+# ahead of interactive logins.
+bulk_password_hasher = PasswordHasher(
+    executor_kind="process",
+    workers=settings.bulk_import_hash_workers or os.cpu_count() or 1,
+    max_pending=settings.bulk_import_batch_size,
+    timeout=settings.password_hash_timeout_seconds,
+)
@@ -0,0 +1,112 @@
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from app.core.config import settings
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "EdDSA")
+
+
+class SigningKeys:
+    """
+    Private keys used to sign tokens, indexed by ``kid``.
+
+    Every ``<kid>.pem`` file in ``keys_dir`` is loaded; ``active_kid`` signs
+    new tokens while the others stay published in the JWKS, so tokens signed
+    before a rotation keep verifying until they expire. With HS256 the shared
+    ``secret_key`` is used and nothing is published.
+    """
+
+    def __init__(self, algorithm: str, keys_dir: str | None, active_kid: str | None, secret: str) -> None:
+        self.algorithm = algorithm
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self.secret = secret
+        self._private: dict[str, Any] | None = None
+        self._jwks: bytes | None = None
+
+    @property
+    def asymmetric(self) -> bool:
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def _load(self) -> dict[str, Any]:
+        # Loaded lazily so hashing worker processes that import this module never read key files.
+        if self._private is None:
+            if not self.asymmetric:
+                self._private = {}
+            elif not self.keys_dir or not self.active_kid:
+                raise RuntimeError(f"{self.algorithm} requires jwt_private_keys_dir and jwt_active_kid")
+            else:
+                self._private = {
+                    path.stem: serialization.load_pem_private_key(path.read_bytes(), password=None)
+                    for path in sorted(Path(self.keys_dir).glob("*.pem"))
+                }
+                if self.active_kid not in self._private:
+                    raise RuntimeError(f"Active signing key {self.active_kid!r} not found in {self.keys_dir}")
+        return self._private
+
+    def signing_key(self) -> tuple[str | None, Any]:
+        if not self.asymmetric:
+            return None, self.secret
+        return self.active_kid, self._load()[self.active_kid]
+
+    def verification_key(self, kid: str | None) -> Any | None:
+        if not self.asymmetric:
+            return self.secret
+        private = self._load().get(kid) if kid else None
+        return private.public_key() if private is not None else None
+
+    def jwks(self) -> bytes:
+        if self._jwks is None:
+            keys = []
+            for kid, private in self._load().items():
+                to_jwk = RSAAlgorithm.to_jwk if self.algorithm == "RS256" else OKPAlgorithm.to_jwk
+                jwk = to_jwk(private.public_key(), as_dict=True)
+                jwk.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+                keys.append(jwk)
+            self._jwks = json.dumps({"keys": keys}).encode()
+        return self._jwks
+
+
+signing_keys = SigningKeys(
+    algorithm=settings.jwt_algorithm,
+    keys_dir=settings.jwt_private_keys_dir,
+    active_kid=settings.jwt_active_kid,
+    secret=settings.secret_key,
+)
+
+
+def generate_key(algorithm: str, kid: str, keys_dir: str) -> Path:
+    if algorithm == "RS256":
+        private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private = ed25519.Ed25519PrivateKey.generate()
+
+    path = Path(keys_dir) / f"{kid}.pem"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(private.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    path.chmod(0o600)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a JWT signing key for rotation.")
+    parser.add_argument("--kid", required=True, help="Key id, also used as the file name")
+    parser.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default=settings.jwt_algorithm)
+    parser.add_argument("--dir", default=settings.jwt_private_keys_dir or "keys")
+    args = parser.parse_args()
+
+    print(generate_key(args.algorithm, args.kid, args.dir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import logging
+import math
+
+from app.core.config import Settings, settings
+from app.core.exceptions import TooManyRequests
+from app.services.token_bucket import TokenBucketLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Per-route, per-dimension token bucket limiters built from settings."""
+
+    def __init__(self, limits: dict[str, tuple[float, int]]) -> None:
+        self._limiters = {
+            name: TokenBucketLimiter(per_minute, burst)
+            for name, (per_minute, burst) in limits.items()
+        }
+
+    def check(self, route: str, dimension: str, key: str) -> None:
+        limiter = self._limiters.get(f"{route}:{dimension}")
+        if limiter is None:
+            return
+        retry_after = limiter.acquire(key)
+        if retry_after:
+            raise TooManyRequests(math.ceil(retry_after))
+
+
+def configured_limits(config: Settings) -> dict[str, tuple[float, int]]:
+    """
+    The limits to enforce, minus per-IP limits that would be shared by everyone.
+
+    Behind the gateway without ``trusted_proxies``, every request arrives from
+    the gateway's address, so one client exhausting an IP bucket would lock
+    out all others. Those limits are dropped instead; per-email limits stay.
+    """
+    if not config.rate_limit_enabled:
+        return {}
+    if config.trust_gateway_identity and not config.trusted_proxies:
+        dropped = sorted(name for name in config.rate_limits if name.endswith(":ip"))
+        if dropped:
+            logger.warning(
+                "trusted_proxies is empty behind the gateway; per-IP rate limits disabled: %s",
+                ", ".join(dropped),
+            )
+        return {name: limit for name, limit in config.rate_limits.items() if not name.endswith(":ip")}
+    return dict(config.rate_limits)
+
+
+rate_limiter = RateLimiter(configured_limits(settings))
@@ -0,0 +1,262 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+import asyncio
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from types import FrameType
+from typing import Any
+
+from app.core.config import settings
+
+WAITING_FRAME = "(waiting)"
+STDLIB_DIR = os.path.dirname(os.__file__) + os.sep
+SITE_PACKAGES = "site-packages" + os.sep
+
+
+@dataclass
+class RequestProfile:
+    id: str
+    method: str
+    path: str
+    task: asyncio.Task
+    loop_thread: int
+    started_at: float = field(default_factory=time.time)
+    started: float = field(default_factory=time.perf_counter)
+    duration: float | None = None
+    route: str | None = None
+    status: int | None = None
+    # (stack, seconds) per sample, root frame first.
+    samples: list[tuple[tuple[str, ...], float]] = field(default_factory=list)
+    truncated: bool = False
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_seconds": self.duration,
+            "samples": len(self.samples),
+            "truncated": self.truncated,
+        }
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: ``root;child;leaf <microseconds>`` per distinct stack."""
+        weights: Counter[tuple[str, ...]] = Counter()
+        for stack, seconds in self.samples:
+            weights[stack] += seconds
+        return "".join(f"{';'.join(stack)} {round(seconds * 1e6)}\n" for stack, seconds in weights.items())
+
+    def speedscope(self) -> dict[str, Any]:
+        frame_index: dict[str, int] = {}
+        samples = []
+        for stack, _ in self.samples:
+            samples.append([frame_index.setdefault(name, len(frame_index)) for name in stack])
+        weights = [seconds for _, seconds in self.samples]
+        name = f"{self.method} {self.path}"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "innotour-sampling-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": frame} for frame in frame_index]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+class SamplingProfiler:
+    """
+    Wall-clock stack sampler for individual requests.
+
+    A request is profiled when an admin armed the profiler for it, when it
+    carries ``X-Profile: <token>``, or by random selection at
+    ``sample_ratio``. While at least one profiled request is in flight a
+    daemon thread wakes every ``interval`` seconds and records, for each of
+    them, the request task's stack: the live thread stack when the task is
+    running on the event loop, otherwise its suspended coroutine chain ending
+    in ``(waiting)`` (awaiting the database, bcrypt pool, etc.). No thread
+    runs and nothing is recorded for any other request; they pay only the
+    selection check.
+    """
+
+    def __init__(
+        self,
+        token: str | None,
+        sample_ratio: float,
+        interval: float,
+        max_seconds: float,
+        max_profiles: int,
+    ) -> None:
+        self.token = token.encode() if token else None
+        self.sample_ratio = sample_ratio
+        self.interval = interval
+        self.max_samples = max(1, int(max_seconds / interval))
+        self.max_profiles = max_profiles
+
+        self.armed = 0
+        self.armed_route_prefix: str | None = None
+        self._active: dict[str, RequestProfile] = {}
+        self._profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._labels: dict[Any, str] = {}
+
+    def arm(self, count: int, route_prefix: str | None = None) -> None:
+        self.armed = count
+        self.armed_route_prefix = route_prefix
+
+    def should_profile(self, scope) -> bool:
+        if self.armed and (self.armed_route_prefix is None or scope["path"].startswith(self.armed_route_prefix)):
+            self.armed -= 1
+            return True
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == b"x-profile":
+                    return secrets.compare_digest(value, self.token)
+        return self.sample_ratio > 0 and random.random() < self.sample_ratio
+
+    def start(self, scope) -> RequestProfile:
+        profile = RequestProfile(
+            id=secrets.token_hex(8),
+            method=scope["method"],
+            path=scope["path"],
+            task=asyncio.current_task(),
+            loop_thread=threading.get_ident(),
+        )
+        with self._lock:
+            self._active[profile.id] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def stop(self, profile: RequestProfile, route: str | None, status: int) -> None:
+        with self._lock:
+            self._active.pop(profile.id, None)
+        profile.duration = time.perf_counter() - profile.started
+        profile.route = route
+        profile.status = status
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        return self._profiles.get(profile_id)
+
+    def profiles(self) -> list[dict[str, Any]]:
+        return [profile.summary() for profile in reversed(self._profiles.values())]
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                active = list(self._active.values())
+
+            frames = sys._current_frames()
+            for profile in active:
+                if len(profile.samples) >= self.max_samples:
+                    profile.truncated = True
+                    continue
+                stack = self._sample(profile, frames.get(profile.loop_thread))
+                if stack:
+                    profile.samples.append((stack, elapsed))
+
+    def _sample(self, profile: RequestProfile, thread_frame: FrameType | None) -> tuple[str, ...]:
+        coro = profile.task.get_coro()
+        root = getattr(coro, "cr_frame", None)
+        if root is None:
+            return ()
+
+        if getattr(coro, "cr_running", False) and thread_frame is not None:
+            stack = []
+            frame = thread_frame
+            while frame is not None:
+                stack.append(self._label(frame))
+                if frame is root:
+                    break
+                frame = frame.f_back
+            return tuple(reversed(stack))
+
+        stack = []
+        while coro is not None:
+            frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+            if frame is None:
+                break
+            stack.append(self._label(frame))
+            coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+        stack.append(WAITING_FRAME)
+        return tuple(stack)
+
+    def _label(self, frame: FrameType) -> str:
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            marker = filename.rfind(SITE_PACKAGES)
+            if marker >= 0:
+                filename = filename[marker + len(SITE_PACKAGES):]
+            elif filename.startswith(STDLIB_DIR):
+                filename = filename[len(STDLIB_DIR):]
+            else:
+                filename = os.path.relpath(filename)
+            label = self._labels[code] = f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{code.co_firstlineno})"
+        return label
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware handing selected requests to ``SamplingProfiler``."""
+
+    def __init__(self, app, profiler: SamplingProfiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self.profiler.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.start(scope)
+        status = 500
+
+        async def send_with_profile_id(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.profiler.stop(profile, getattr(scope.get("route"), "path", None), status)
+
+
+sampling_profiler = SamplingProfiler(
+    token=settings.profiling_token,
+    sample_ratio=settings.profiling_sample_ratio,
+    interval=settings.profiling_interval_seconds,
+    max_seconds=settings.profiling_max_seconds,
+    max_profiles=settings.profiling_max_profiles,
+)
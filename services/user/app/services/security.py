@@ -1,48 +1,66 @@
 import jwt
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from app.core.config import settings
+from app.services.keys import signing_keys
+from app.services.tracing import tracer
 from passlib.context import CryptContext
 
 pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+class TokenExpiredError(ValueError):
+    """Raised by decode_token for a well-formed token whose ``exp`` has passed."""
+
 def hash_password(password: str) -> str:
     return pwd_ctx.hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd_ctx.verify(plain, hashed)
 
+def _encode(to_encode: dict[str, Any]) -> str:
+    kid, key = signing_keys.signing_key()
+    with tracer.span("jwt.encode", algorithm=signing_keys.algorithm, scope=to_encode.get("scope")):
+        return jwt.encode(
+            to_encode,
+            key,
+            algorithm=signing_keys.algorithm,
+            headers={"kid": kid} if kid else None,
+        )
+
 def create_access_token(data: dict[str, Any]) -> str:
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode.update({"exp": expire, "scope": "access_token"})
-    return jwt.encode(
-        to_encode,
-        settings.secret_key,
-        algorithm="HS256",
-    )
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=settings.access_token_expire_minutes)
+    to_encode.update({"sub": str(data["sub"]), "iat": now, "exp": expire, "scope": "access_token"})
+    return _encode(to_encode)
 
 def create_refresh_token(data: dict[str, Any]) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=settings.refresh_token_expire_minutes)
-    to_encode.update({"exp": expire, "scope": "refresh_token"})
-    return jwt.encode(
-        to_encode,
-        settings.secret_key,
-        algorithm="HS256",
-    )
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=settings.refresh_token_expire_minutes)
+    # jti keeps two refresh tokens issued in the same second from colliding on token_hash.
+    to_encode.update({"sub": str(data["sub"]), "iat": now, "exp": expire, "jti": secrets.token_urlsafe(16), "scope": "refresh_token"})
+    return _encode(to_encode)
 
 def decode_token(token: str) -> dict[str, Any]:
+    with tracer.span("jwt.decode", algorithm=signing_keys.algorithm):
+        return _decode(token)
+
+def _decode(token: str) -> dict[str, Any]:
     try:
+        key = signing_keys.verification_key(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            raise ValueError("Unknown signing key")
         payload = jwt.decode(
             token,
-            settings.secret_key,
-            algorithms=["HS256"],
-            options={"require_exp": True},
+            key,
+            algorithms=[signing_keys.algorithm],
+            options={"require": ["exp"]},
         )
         return payload
     except jwt.ExpiredSignatureError:
-        raise ValueError("Token expired")
+        raise TokenExpiredError("Token expired")
     except jwt.PyJWTError:
         raise ValueError("Invalid token")
\ No newline at end of file
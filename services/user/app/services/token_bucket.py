@@ -0,0 +1,54 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets keyed by an arbitrary string, with O(1) work per request.
+
+    Buckets refill lazily on access, so no timer runs per key. Buckets are
+    kept in least-recently-used order; a bucket untouched for longer than
+    it takes to refill completely is indistinguishable from a new one, so
+    idle buckets are evicted from the old end during periodic sweeps.
+    """
+
+    def __init__(self, per_minute: float, burst: int, sweep_interval: float = 10.0) -> None:
+        self.rate = per_minute / 60.0
+        self.burst = float(burst)
+        self.idle_ttl = self.burst / self.rate
+        self.sweep_interval = sweep_interval
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """Take ``cost`` tokens from ``key``'s bucket; return 0 or the seconds to wait."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        return (cost - bucket[0]) / self.rate
+
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + self.sweep_interval
+        cutoff = now - self.idle_ttl
+        while self._buckets:
+            key, (_, last_seen) = next(iter(self._buckets.items()))
+            if last_seen > cutoff:
+                break
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
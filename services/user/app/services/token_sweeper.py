@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.crud.crud_token import delete_expired_refresh_tokens
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SweepReport:
+    rows_purged: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+
+async def purge_expired_refresh_tokens(
+    batch_size: int = settings.token_sweep_batch_size,
+    pause_seconds: float = settings.token_sweep_pause_seconds,
+    max_batches: int | None = None,
+) -> SweepReport:
+    """
+    Delete expired refresh tokens in bounded batches.
+
+    Each batch is its own short transaction that locks at most ``batch_size``
+    rows, with a pause in between so the sweep never competes with live
+    refreshes for long.
+    """
+    report = SweepReport()
+    started = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        while max_batches is None or report.batches < max_batches:
+            purged = await delete_expired_refresh_tokens(db, batch_size)
+            report.batches += 1
+            report.rows_purged += purged
+            if purged < batch_size:
+                break
+            await asyncio.sleep(pause_seconds)
+
+    report.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        "Purged %d expired refresh tokens in %d batches (%.3fs)",
+        report.rows_purged, report.batches, report.elapsed_seconds,
+    )
+    return report
+
+
+async def run_token_sweeper(interval_seconds: float = settings.token_sweep_interval_seconds) -> None:
+    while True:
+        try:
+            await purge_expired_refresh_tokens()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Refresh token sweep failed")
+        await asyncio.sleep(interval_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete expired refresh tokens in batches.")
+    parser.add_argument("--batch-size", type=int, default=settings.token_sweep_batch_size)
+    parser.add_argument("--pause", type=float, default=settings.token_sweep_pause_seconds)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = asyncio.run(purge_expired_refresh_tokens(args.batch_size, args.pause, args.max_batches))
+    print(f"rows_purged={report.rows_purged} batches={report.batches} elapsed_seconds={report.elapsed_seconds:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+import json
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Protocol
+
+from app.core.config import settings
+
+TRACEPARENT_HEADER = "traceparent"
+
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return f"{random.getrandbits(nbytes * 8) or 1:0{nbytes * 2}x}"
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str, bool] | None:
+    """Return ``(trace_id, parent_id, sampled)`` from a W3C traceparent, or None if malformed."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4:
+        return None
+    version, trace_id, parent_id, flags = parts[:4]
+    if len(version) != 2 or version == "ff" or (version == "00" and len(parts) != 4):
+        return None
+    if len(trace_id) != 32 or len(parent_id) != 16 or len(flags) != 2:
+        return None
+    try:
+        int(version, 16)
+        int(trace_id, 16)
+        int(parent_id, 16)
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    if trace_id == "0" * 32 or parent_id == "0" * 16 or trace_id != trace_id.lower() or parent_id != parent_id.lower():
+        return None
+    return trace_id, parent_id, sampled
+
+
+@dataclass(slots=True)
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    name: str
+    service: str
+    sampled: bool
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    error: str | None = None
+    # Every recorded span of this trace in this process, exported together.
+    trace: list["Span"] | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": self.service,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6 if self.end_ns is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class InMemoryExporter:
+    """Keeps the most recent ``max_traces`` traces for ``/health/traces``."""
+
+    def __init__(self, max_traces: int = 1000) -> None:
+        self._traces: deque[list[dict[str, Any]]] = deque(maxlen=max_traces)
+
+    def export(self, spans: list[Span]) -> None:
+        self._traces.append([span.to_dict() for span in spans])
+
+    def traces(self, limit: int = 50, trace_id: str | None = None) -> list[list[dict[str, Any]]]:
+        if trace_id is not None:
+            return [spans for spans in self._traces if spans[0]["trace_id"] == trace_id]
+        return list(self._traces)[-limit:][::-1]
+
+    def clear(self) -> None:
+        self._traces.clear()
+
+    def close(self) -> None:
+        pass
+
+
+class FileExporter(InMemoryExporter):
+    """
+    Appends every span as one JSON line to ``path`` and keeps recent traces in memory.
+
+    Finished traces are handed to a writer thread, so encoding and disk writes
+    never run on the event loop. The file can be tailed or loaded offline
+    without a collector. If the disk falls ``max_traces`` traces behind, further
+    traces are left out of the file and counted in ``dropped``.
+    """
+
+    def __init__(self, path: str, max_traces: int = 1000) -> None:
+        super().__init__(max_traces)
+        self.path = path
+        self.dropped = 0
+        self._queue: queue.Queue[list[dict[str, Any]] | None] = queue.Queue(maxsize=max_traces)
+        self._writer: threading.Thread | None = None
+
+    def export(self, spans: list[Span]) -> None:
+        super().export(spans)
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write, name="trace-writer", daemon=True)
+            self._writer.start()
+        try:
+            self._queue.put_nowait(self._traces[-1])
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            while (trace := self._queue.get()) is not None:
+                file.write("".join(json.dumps(span, default=str) + "\n" for span in trace))
+                if self._queue.empty():
+                    file.flush()
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+
+
+class Tracer:
+    """
+    Minimal W3C trace-context tracer for one service.
+
+    The middleware opens a server span per request, continuing the caller's
+    ``traceparent`` when there is one, and makes it current through a
+    contextvar. Child spans attach to whatever span is current. A trace that
+    is not sampled records nothing beyond its root span, which still carries
+    the ids that are propagated downstream.
+    """
+
+    def __init__(self, service: str, exporter: SpanExporter | None, sample_ratio: float) -> None:
+        self.service = service
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    def start_trace(self, name: str, traceparent: str | None = None) -> tuple[Span, Token]:
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = _new_id(16), None
+            sampled = self.exporter is not None and random.random() < self.sample_ratio
+        span = Span(trace_id, _new_id(8), parent_id, name, self.service, sampled and self.exporter is not None)
+        if span.sampled:
+            span.trace = [span]
+        return span, _current_span.set(span)
+
+    def finish_trace(self, span: Span, token: Token) -> None:
+        _current_span.reset(token)
+        span.end()
+        if span.trace is not None:
+            self.exporter.export(span.trace)
+
+    def start_span(self, name: str, **attributes: Any) -> Span | None:
+        """Start a child of the current span without making it current; None if not sampled."""
+        parent = _current_span.get()
+        if parent is None or parent.trace is None:
+            return None
+        span = Span(parent.trace_id, _new_id(8), parent.span_id, name, self.service, True, attributes)
+        span.trace = parent.trace
+        parent.trace.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        span = self.start_span(name, **attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = type(exc).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    @staticmethod
+    def current_span() -> Span | None:
+        return _current_span.get()
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+    def traces(self, limit: int = 50, trace_id: str | None = None) -> list[list[dict[str, Any]]]:
+        if isinstance(self.exporter, InMemoryExporter):
+            return self.exporter.traces(limit, trace_id)
+        return []
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening a server span around each HTTP request.
+
+    ``accept_incoming`` decides whether a client's ``traceparent`` is
+    continued or a fresh trace is started; the gateway starts fresh and the
+    services continue the gateway's. With ``expose_trace_id`` the trace id is
+    returned in ``X-Trace-Id`` so a client can quote it.
+    """
+
+    def __init__(self, app, tracer: Tracer, accept_incoming: bool = True, expose_trace_id: bool = False) -> None:
+        self.app = app
+        self.tracer = tracer
+        self.accept_incoming = accept_incoming
+        self.expose_trace_id = expose_trace_id
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        if self.accept_incoming:
+            for name, value in scope["headers"]:
+                if name == b"traceparent":
+                    traceparent = value.decode("latin-1")
+                    break
+
+        span, token = self.tracer.start_trace(f"{scope['method']} {scope['path']}", traceparent)
+        status = 500
+
+        async def send_traced(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.expose_trace_id:
+                    message["headers"] = [*message.get("headers", []), (b"x-trace-id", span.trace_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_traced)
+        except BaseException as exc:
+            span.error = type(exc).__name__
+            raise
+        finally:
+            if span.trace is not None:
+                route = scope.get("route")
+                span.attributes["http.method"] = scope["method"]
+                span.attributes["http.target"] = scope["path"]
+                span.attributes["http.route"] = getattr(route, "path", None)
+                span.attributes["http.status_code"] = status
+                if status >= 500 and span.error is None:
+                    span.error = f"HTTP {status}"
+            self.tracer.finish_trace(span, token)
+
+
+def _make_exporter() -> SpanExporter | None:
+    if settings.tracing_exporter == "memory":
+        return InMemoryExporter(settings.tracing_max_traces)
+    if settings.tracing_exporter == "file":
+        return FileExporter(settings.tracing_file, settings.tracing_max_traces)
+    if settings.tracing_exporter == "none":
+        return None
+    raise ValueError(f"Unknown tracing exporter: {settings.tracing_exporter}")
+
+
+tracer = Tracer(settings.tracing_service_name, _make_exporter(), settings.tracing_sample_ratio)
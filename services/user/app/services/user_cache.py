@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.models.user import RoleEnum, User
+
+
+@dataclass(frozen=True, slots=True)
+class CachedUser:
+    """Detached snapshot of the fields the auth path needs from a User row."""
+
+    id: int
+    email: str
+    role: RoleEnum
+    agency_id: int | None
+
+    @classmethod
+    def from_orm_user(cls, user: User) -> "CachedUser":
+        return cls(id=user.id, email=user.email, role=user.role, agency_id=user.agency_id)
+
+
+class UserCache:
+    """
+    In-process TTL + LRU cache of users keyed by id.
+
+    Entries expire after ``ttl`` seconds and the least recently used entry is
+    evicted once ``max_size`` is reached. Writers must call ``invalidate`` so
+    that changes to a user are visible on the next request.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[int, tuple[float, CachedUser]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> CachedUser | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+
+    def put(self, user: CachedUser) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[user.id] = (time.monotonic() + self.ttl, user)
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+user_cache = UserCache(
+    ttl=settings.user_cache_ttl_seconds,
+    max_size=settings.user_cache_max_size,
+)
@@ -0,0 +1,195 @@
+import asyncio
+import codecs
+import csv
+import json
+from collections import deque
+from typing import Any, AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.user import UserCreate, UserImportReport, UserImportRow
+from app.services.hashing import bulk_password_hasher
+
+CSV_CONTENT_TYPES = ("text/csv",)
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+class LineFeed:
+    """
+    The lines of a CSV body, handed to one ``csv.reader`` as they stream in.
+
+    The reader pulls lines itself, so a quoted field spanning several lines
+    is parsed as one record. Lines are only queued up to a complete record
+    before the reader is asked for it, so it never runs out mid-record.
+    """
+
+    def __init__(self) -> None:
+        self.lines: deque[str] = deque()
+        self.size = 0
+        self.quotes = 0
+
+    def __iter__(self) -> "LineFeed":
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+    def add(self, line: str) -> bool:
+        """Queue ``line``; True once the queued lines end a record outside any quotes."""
+        self.lines.append(line + "\n")
+        self.size += len(line) + 1
+        # Quotes inside quoted fields are doubled, so an odd count leaves a field open.
+        self.quotes += line.count('"')
+        if self.quotes % 2:
+            return False
+        self.size = self.quotes = 0
+        return True
+
+    def clear(self) -> None:
+        self.lines.clear()
+        self.size = self.quotes = 0
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[dict[str, Any] | ValueError]:
+    """Yield one dict per data row, or the ValueError that made it unreadable."""
+    header: list[str] | None = None
+    feed = LineFeed()
+    reader = csv.reader(feed)
+    async for line in lines:
+        if not line.strip() and not feed.lines:
+            continue
+
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield exc
+                continue
+            yield record if isinstance(record, dict) else ValueError("Row is not a JSON object")
+            continue
+
+        if not feed.add(line):
+            if feed.size > csv.field_size_limit():
+                feed.clear()
+                yield ValueError("Quoted field exceeds the field size limit")
+            continue
+        try:
+            values = next(reader)
+        except csv.Error as exc:
+            yield ValueError(str(exc))
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+        yield dict(zip(header, values))
+
+    if feed.lines:
+        yield ValueError("Unterminated quoted field")
+
+
+async def _insert_batch(
+    db: AsyncSession,
+    batch: list[tuple[int, UserCreate]],
+    report: UserImportReport,
+    deadline: float,
+) -> None:
+    hashes = await bulk_password_hasher.hash_many([user_in.password for _, user_in in batch], deadline)
+    stmt = (
+        pg_insert(User)
+        .values([
+            {"agency_id": user_in.agency_id, "email": user_in.email, "hashed_password": hashed}
+            for (_, user_in), hashed in zip(batch, hashes)
+        ])
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id, User.email)
+    )
+    created = {email: user_id for user_id, email in (await db.execute(stmt)).all()}
+
+    for row, user_in in batch:
+        user_id = created.get(user_in.email)
+        if user_id is None:
+            report.duplicates += 1
+            report.rows.append(UserImportRow(row=row, status="duplicate", email=user_in.email, error="Email already registered"))
+        else:
+            report.created += 1
+            report.rows.append(UserImportRow(row=row, status="created", email=user_in.email, id=user_id))
+
+
+async def import_users(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    batch_size: int = settings.bulk_import_batch_size,
+) -> UserImportReport:
+    """
+    Stream users from a CSV or NDJSON body into the database.
+
+    Rows are validated as they arrive, their passwords hashed in parallel on
+    the bulk hashing pool, and inserted with one multi-row statement per
+    batch. All batches share a single transaction that is committed at the
+    end, so a failed import leaves no partial data behind. The pool admits
+    one batch at a time, and hashing must finish within
+    ``bulk_import_timeout_seconds``; otherwise the import fails with 503.
+    """
+    deadline = asyncio.get_running_loop().time() + settings.bulk_import_timeout_seconds
+    report = UserImportReport(created=0, duplicates=0, invalid=0, rows=[])
+    seen: set[str] = set()
+    batch: list[tuple[int, UserCreate]] = []
+
+    row = 0
+    async for record in iter_records(iter_lines(chunks), fmt):
+        row += 1
+        try:
+            if isinstance(record, ValueError):
+                raise record
+            user_in = UserCreate.model_validate(record)
+        except ValidationError as exc:
+            report.invalid += 1
+            error = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+            report.rows.append(UserImportRow(row=row, status="invalid", error=error))
+            continue
+        except ValueError as exc:
+            report.invalid += 1
+            report.rows.append(UserImportRow(row=row, status="invalid", error=str(exc)))
+            continue
+
+        if user_in.email in seen:
+            report.duplicates += 1
+            report.rows.append(UserImportRow(row=row, status="duplicate", email=user_in.email, error="Email repeated in upload"))
+            continue
+        seen.add(user_in.email)
+
+        batch.append((row, user_in))
+        if len(batch) >= batch_size:
+            await _insert_batch(db, batch, report, deadline)
+            batch = []
+
+    if batch:
+        await _insert_batch(db, batch, report, deadline)
+
+    await db.commit()
+    report.rows.sort(key=lambda r: r.row)
+    return report
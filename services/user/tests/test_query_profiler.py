@@ -0,0 +1,28 @@
+import pytest
+
+from app.db.profiler import capture_query_profiles
+from app.services.security import create_access_token
+
+
+@pytest.fixture
+def auth(manager) -> dict[str, str]:
+    token = create_access_token({"sub": manager.id, "agency_id": manager.agency_id, "email": manager.email, "role": manager.role.value})
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_verify_statement_budget(client, auth):
+    with capture_query_profiles() as profiles:
+        assert (await client.get("/auth/verify", headers=auth)).status_code == 200  # loads the user
+        assert (await client.get("/auth/verify", headers=auth)).status_code == 200  # served from the user cache
+
+    assert [profile.route for profile in profiles] == ["/auth/verify", "/auth/verify"]
+    profiles[0].assert_max_statements(1)
+    profiles[1].assert_max_statements(0)
+
+
+async def test_budget_overrun_lists_the_statements(client, auth):
+    with capture_query_profiles() as profiles:
+        await client.get("/auth/verify", headers=auth)
+
+    with pytest.raises(AssertionError, match=r"/auth/verify issued 1 statements, expected at most 0:\n  1x SELECT users"):
+        profiles[0].assert_max_statements(0)
@@ -0,0 +1,116 @@
+import logging
+
+import pytest
+
+from app.core.config import Settings
+from app.core.exceptions import TooManyRequests
+from app.services import token_bucket
+from app.services.rate_limit import RateLimiter, configured_limits
+from app.services.token_bucket import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(token_bucket, "time", clock)
+    return clock
+
+
+def test_burst_is_served_at_once_then_requests_wait(clock):
+    limiter = TokenBucketLimiter(per_minute=60, burst=3)
+
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == pytest.approx(1.0)
+    assert limiter.acquire("b") == 0.0  # keys are independent
+
+
+def test_retry_after_is_the_time_until_enough_tokens(clock):
+    limiter = TokenBucketLimiter(per_minute=30, burst=2)  # one token per 2s
+    limiter.acquire("a")
+    limiter.acquire("a")
+
+    assert limiter.acquire("a") == pytest.approx(2.0)
+    clock.now += 0.5
+    assert limiter.acquire("a") == pytest.approx(1.5)
+    assert limiter.acquire("a", cost=2) == pytest.approx(3.5)
+
+
+def test_tokens_refill_over_time_up_to_the_burst(clock):
+    limiter = TokenBucketLimiter(per_minute=60, burst=2)
+    limiter.acquire("a")
+    limiter.acquire("a")
+
+    clock.now += 1.0
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("a") > 0
+
+    clock.now += 3600
+    assert [limiter.acquire("a") for _ in range(2)] == [0.0, 0.0]
+    assert limiter.acquire("a") > 0  # refill capped at the burst
+
+
+def test_refused_requests_take_no_tokens(clock):
+    limiter = TokenBucketLimiter(per_minute=60, burst=1)
+    limiter.acquire("a")
+    for _ in range(5):
+        limiter.acquire("a")
+
+    clock.now += 1.0
+    assert limiter.acquire("a") == 0.0
+
+
+def test_idle_buckets_are_swept(clock):
+    limiter = TokenBucketLimiter(per_minute=60, burst=10, sweep_interval=5)  # full again after 10s
+    limiter.acquire("idle")
+    clock.now += 6
+    limiter.acquire("active")
+    assert len(limiter) == 2
+
+    clock.now += 5  # "idle" last seen 11s ago, "active" 5s ago
+    limiter.acquire("active")
+
+    assert len(limiter) == 1
+    assert limiter.acquire("idle") == 0.0  # comes back as a full bucket
+
+
+def test_rate_limiter_rounds_retry_after_up(clock):
+    limiter = RateLimiter({"login:ip": (40, 1)})  # one token per 1.5s
+    limiter.check("login", "ip", "10.0.0.1")
+    limiter.check("other", "ip", "10.0.0.1")  # unconfigured routes pass
+
+    with pytest.raises(TooManyRequests) as raised:
+        limiter.check("login", "ip", "10.0.0.1")
+    assert raised.value.headers["Retry-After"] == "2"
+
+
+def settings(**overrides) -> Settings:
+    return Settings(**{"gateway_shared_secret": "shared", **overrides})
+
+
+def test_ip_limits_apply_to_direct_traffic():
+    assert configured_limits(settings()) == settings().rate_limits
+    assert configured_limits(settings(rate_limit_enabled=False)) == {}
+
+
+def test_ip_limits_are_dropped_behind_the_gateway_without_trusted_proxies(caplog):
+    with caplog.at_level(logging.WARNING):
+        limits = configured_limits(settings(trust_gateway_identity=True))
+
+    assert set(limits) == {"login:email"}
+    assert "login:ip" in caplog.text
+
+
+def test_ip_limits_stay_behind_the_gateway_with_trusted_proxies(caplog):
+    with caplog.at_level(logging.WARNING):
+        limits = configured_limits(settings(trust_gateway_identity=True, trusted_proxies=["172.16.0.0/12"]))
+
+    assert "login:ip" in limits
+    assert caplog.text == ""
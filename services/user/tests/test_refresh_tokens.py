@@ -0,0 +1,76 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.crud.crud_token import create_refresh_token_entry, rotate_refresh_token
+from app.db.session import AsyncSessionLocal
+from app.models.token import RefreshToken
+from app.services.security import create_refresh_token
+
+
+def claims(user) -> dict:
+    return {"sub": user.id, "agency_id": user.agency_id, "email": user.email, "role": user.role.value}
+
+
+def refresh_headers(token: str) -> dict[str, str]:
+    return {"Cookie": f"refresh_token={token}; csrf_token=csrf", "X-CSRF-Token": "csrf"}
+
+
+async def test_concurrent_rotations_of_one_token_succeed_once(manager):
+    old_token = create_refresh_token(claims(manager))
+    expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+    async with AsyncSessionLocal() as session:
+        await create_refresh_token_entry(session, old_token, manager.id, expires_at)
+
+    async def rotate(new_token: str) -> bool:
+        # One session (and connection) per contender, as with concurrent requests.
+        async with AsyncSessionLocal() as session:
+            return await rotate_refresh_token(session, old_token, new_token, manager.id, expires_at)
+
+    new_tokens = [create_refresh_token(claims(manager)) for _ in range(5)]
+    results = await asyncio.gather(*(rotate(token) for token in new_tokens))
+
+    assert results.count(True) == 1
+    async with AsyncSessionLocal() as session:
+        stored = (await session.execute(select(RefreshToken.token_hash))).scalars().all()
+    winner = new_tokens[results.index(True)]
+    assert stored == [RefreshToken.hash_token(winner)]
+
+
+async def test_rotating_an_expired_row_fails(manager):
+    old_token = create_refresh_token(claims(manager))
+    async with AsyncSessionLocal() as session:
+        await create_refresh_token_entry(session, old_token, manager.id, datetime.now(timezone.utc) - timedelta(seconds=1))
+        rotated = await rotate_refresh_token(
+            session, old_token, create_refresh_token(claims(manager)), manager.id,
+            datetime.now(timezone.utc) + timedelta(days=1),
+        )
+        remaining = await session.scalar(select(func.count()).select_from(RefreshToken))
+
+    assert rotated is False
+    assert remaining == 1
+
+
+async def test_refresh_endpoint_rotates_once(client, manager):
+    token = create_refresh_token(claims(manager))
+    async with AsyncSessionLocal() as session:
+        await create_refresh_token_entry(session, token, manager.id, datetime.now(timezone.utc) + timedelta(days=1))
+
+    async def refresh():
+        return await client.post("/auth/refresh", headers=refresh_headers(token))
+
+    responses = await asyncio.gather(refresh(), refresh())
+
+    assert sorted(response.status_code for response in responses) == [200, 401]
+
+
+async def test_refresh_endpoint_reports_expired_tokens(client, manager, monkeypatch):
+    monkeypatch.setattr(settings, "refresh_token_expire_minutes", -1)
+    token = create_refresh_token(claims(manager))
+
+    response = await client.post("/auth/refresh", headers=refresh_headers(token))
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token has expired"
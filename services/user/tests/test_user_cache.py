@@ -0,0 +1,117 @@
+import pytest
+
+from app.crud.crud_user import delete_user, update_user
+from app.db.session import AsyncSessionLocal
+from app.models.user import RoleEnum
+from app.schemas.user import UserUpdate
+from app.services import user_cache as user_cache_module
+from app.services.security import create_access_token
+from app.services.user_cache import CachedUser, UserCache, user_cache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(user_cache_module, "time", clock)
+    return clock
+
+
+def cached(user_id: int, role: RoleEnum = RoleEnum.AGENCY_MANAGER) -> CachedUser:
+    return CachedUser(id=user_id, email=f"user{user_id}@example.com", role=role, agency_id=1)
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = UserCache(ttl=30.0, max_size=10)
+    cache.put(cached(1))
+
+    clock.now += 29.9
+    assert cache.get(1) == cached(1)
+
+    clock.now += 0.1
+    assert cache.get(1) is None
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 1}
+
+
+def test_a_hit_does_not_extend_the_ttl(clock):
+    cache = UserCache(ttl=30.0, max_size=10)
+    cache.put(cached(1))
+
+    clock.now += 20
+    assert cache.get(1) is not None
+    clock.now += 10
+    assert cache.get(1) is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = UserCache(ttl=30.0, max_size=2)
+    cache.put(cached(1))
+    cache.put(cached(2))
+
+    cache.get(1)  # 2 is now the least recently used
+    cache.put(cached(3))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
+
+
+def test_put_replaces_an_entry_and_restarts_its_ttl(clock):
+    cache = UserCache(ttl=30.0, max_size=10)
+    cache.put(cached(1))
+    clock.now += 20
+    cache.put(cached(1, role=RoleEnum.CENTER_ADMIN))
+
+    clock.now += 20
+    assert cache.get(1).role == RoleEnum.CENTER_ADMIN
+    assert cache.stats()["size"] == 1
+
+
+def test_zero_max_size_disables_the_cache(clock):
+    cache = UserCache(ttl=30.0, max_size=0)
+    cache.put(cached(1))
+
+    assert cache.get(1) is None
+    assert cache.stats()["size"] == 0
+
+
+async def test_update_user_invalidates_the_cached_entry(manager):
+    user_cache.put(CachedUser.from_orm_user(manager))
+
+    async with AsyncSessionLocal() as session:
+        await update_user(
+            session,
+            UserUpdate(id=manager.id, agency_id=2, email="moved@example.com", role=RoleEnum.AGENCY_MANAGER),
+        )
+
+    assert user_cache.get(manager.id) is None
+
+
+async def test_delete_user_invalidates_the_cached_entry(manager):
+    user_cache.put(CachedUser.from_orm_user(manager))
+
+    async with AsyncSessionLocal() as session:
+        await delete_user(session, manager.id)
+
+    assert user_cache.get(manager.id) is None
+
+
+async def test_changes_are_seen_on_the_next_request(client, manager):
+    token = create_access_token({"sub": manager.id, "agency_id": 1, "email": manager.email, "role": "agency_manager"})
+    headers = {"Authorization": f"Bearer {token}"}
+    assert (await client.get("/auth/verify", headers=headers)).json()["agency_id"] == 1
+
+    async with AsyncSessionLocal() as session:
+        await update_user(
+            session,
+            UserUpdate(id=manager.id, agency_id=2, email=manager.email, role=RoleEnum.AGENCY_MANAGER),
+        )
+
+    assert (await client.get("/auth/verify", headers=headers)).json()["agency_id"] == 2
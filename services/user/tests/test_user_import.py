@@ -0,0 +1,51 @@
+from app.db.session import AsyncSessionLocal
+from app.models.user import RoleEnum, User
+from app.services.security import create_access_token
+from app.services.user_import import iter_lines, iter_records
+
+
+async def records(body: bytes, fmt: str = "csv", chunk_size: int = 7) -> list:
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    return [record async for record in iter_records(iter_lines(chunks()), fmt)]
+
+
+async def test_csv_quoted_fields_may_span_lines():
+    body = b'email,password,agency_id\r\na@example.com,"pass\nword ""x""",1\r\n\r\nb@example.com,secret,2\r\n'
+
+    assert await records(body) == [
+        {"email": "a@example.com", "password": 'pass\nword "x"', "agency_id": "1"},
+        {"email": "b@example.com", "password": "secret", "agency_id": "2"},
+    ]
+
+
+async def test_csv_unterminated_quote_is_reported():
+    result = await records(b'email,password,agency_id\na@example.com,"secret,1\n')
+
+    assert len(result) == 1
+    assert isinstance(result[0], ValueError)
+
+
+async def test_csv_column_count_mismatch_is_reported_per_row():
+    result = await records(b"email,password,agency_id\na@example.com,secret\nb@example.com,secret,2\n")
+
+    assert isinstance(result[0], ValueError)
+    assert result[1] == {"email": "b@example.com", "password": "secret", "agency_id": "2"}
+
+
+async def test_import_endpoint_creates_users_from_multiline_csv(client, manager):
+    async with AsyncSessionLocal() as session:
+        admin = User(email="admin@example.com", hashed_password="not-a-real-hash", role=RoleEnum.CENTER_ADMIN)
+        session.add(admin)
+        await session.commit()
+    token = create_access_token({"sub": admin.id, "agency_id": None, "email": admin.email, "role": admin.role.value})
+    body = b'email,password,agency_id\nnew@example.com,"multi\nline secret",1\nmanager@example.com,another secret,1\n'
+
+    response = await client.post(
+        "/auth/users/import", content=body, headers={"Authorization": f"Bearer {token}", "Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 200
+    assert [(row["row"], row["status"]) for row in response.json()["rows"]] == [(1, "created"), (2, "duplicate")]
@@ -0,0 +1,50 @@
+from fastapi import APIRouter
+from app.core.config import settings
+from app.core.exceptions import BatchTooLarge
+from app.schemas.booking import BookingBatch, ValidationReport
+from app.schemas.error import ErrorResponse
+from app.schemas.rules import RuleSet
+from app.services.rule_engine import rule_engine, validate_batch
+
+router = APIRouter(prefix="/validation", tags=["validation"])
+
+@router.post(
+    "/bookings",
+    response_model=ValidationReport,
+    responses={
+        404: {"model": ErrorResponse, "description": "Rule set not found"},
+        413: {"model": ErrorResponse, "description": "Too many rows"},
+        422: {"model": ErrorResponse, "description": "Validation Error"},
+    },
+)
+def validate_bookings(batch: BookingBatch):
+    """
+    Validate a whole booking upload against a rule set in one request.
+
+    Declared sync so the CPU-bound pass runs in the threadpool instead of
+    blocking the event loop.
+
+    Args:
+        batch: The rows to check and, optionally, the rule set version to use.
+
+    Returns:
+        A ValidationReport with one entry per violation, ordered by row index.
+
+    Raises:
+        BatchTooLarge: If the upload has more than ``max_batch_rows`` rows.
+        RuleSetNotFound: If the requested rule set does not exist.
+    """
+    if len(batch.rows) > settings.max_batch_rows:
+        raise BatchTooLarge(settings.max_batch_rows)
+    compiled = rule_engine.get(batch.rule_set or settings.active_rule_set)
+    return validate_batch(compiled, batch.rows)
+
+@router.get(
+    "/rule-sets/{version}",
+    response_model=RuleSet,
+    responses={
+        404: {"model": ErrorResponse, "description": "Rule set not found"},
+    },
+)
+def get_rule_set(version: str):
+    return rule_engine.load(version)
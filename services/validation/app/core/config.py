@@ -0,0 +1,19 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class Settings(BaseSettings):
+    mode: str = "development" # TODO: Change for prod
+
+    rule_sets_dir: str = "rules" # <version>.json rule-set files
+    active_rule_set: str = "v1" # used when a request does not name a version
+    compiled_rule_sets_cache_size: int = 16
+    max_batch_rows: int = 50000
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+    )
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+settings = Settings()
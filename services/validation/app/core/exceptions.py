@@ -0,0 +1,23 @@
+from fastapi import HTTPException, status
+
+
+class RuleSetNotFound(HTTPException):
+    def __init__(self, version: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Rule set {version} not found"
+        )
+
+class InvalidRuleSet(HTTPException):
+    def __init__(self, version: str, reason: str):
+        super().__init__(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Rule set {version} is invalid: {reason}"
+        )
+
+class BatchTooLarge(HTTPException):
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {limit} rows can be validated per request"
+        )
@@ -0,0 +1,44 @@
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.middleware.cors import CORSMiddleware
+
+from app.api.v1.validation import router as validation_router
+from app.core.config import settings
+from app.services.rule_engine import rule_engine
+
+app = FastAPI(
+    title="InnoTour Validation Service",
+    version="0.1.0",
+    docs_url="/docs",
+    openapi_url="/openapi.json",
+)
+
+if settings.mode == "development":
+    origins = ["*"]
+else:
+    origins = ["https://privet-stepa.kr"]
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+@app.exception_handler(Exception)
+async def handle_unexpected_error(request: Request, exc: Exception):
+    return JSONResponse(
+        status_code=500,
+        content={"error": "internal_server_error", "detail": "An unexpected error occurred."},
+    )
+
+app.include_router(validation_router)
+
+@app.get("/health", tags=["health"])
+async def health_check():
+    return {"status": "ok"}
+
+@app.get("/health/rule-engine", tags=["health"])
+async def rule_engine_stats():
+    return rule_engine.stats()
@@ -0,0 +1,27 @@
+from typing import Any
+from pydantic import AwareDatetime, BaseModel, Field
+from app.schemas.rules import AgencyTypeEnum
+
+class BookingRow(BaseModel):
+    agency_id: int
+    agency_type: AgencyTypeEnum
+    slot_id: int | None = None
+    starts_at: AwareDatetime
+    seats: int = Field(gt=0)
+    remaining: int | None = None # seats left on the slot; capacity rules skip rows without it
+
+class BookingBatch(BaseModel):
+    rule_set: str | None = None # defaults to the active rule set
+    rows: list[dict[str, Any]] # validated row by row, so one malformed row does not reject the upload
+
+class RowError(BaseModel):
+    row: int
+    code: str
+    message: str
+
+class ValidationReport(BaseModel):
+    rule_set: str
+    rows: int
+    valid: int
+    invalid: int
+    errors: list[RowError]
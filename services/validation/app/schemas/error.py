@@ -0,0 +1,6 @@
+# Copied into every service that uses it; keep the copies identical (scripts/check_shared_modules.py).
+
+from pydantic import BaseModel
+
+class ErrorResponse(BaseModel):
+    detail: str
@@ -0,0 +1,47 @@
+import enum
+from datetime import time
+from typing import Annotated, Literal, Union
+from pydantic import BaseModel, Field
+
+class AgencyTypeEnum(str, enum.Enum):
+    INNER = "innopolis"
+    OUTER = "outer"
+
+class RuleBase(BaseModel):
+    code: str # returned with every violation, e.g. "outer_max_seats"
+    message: str
+    agency_type: AgencyTypeEnum | None = None # only apply to rows from this type of agency
+
+class CapacityRule(RuleBase):
+    """Seats must fit the slot's remaining seats, counting earlier rows of the same upload."""
+    kind: Literal["capacity"]
+
+class FieldRule(RuleBase):
+    """Compare a numeric row field against a constant, e.g. ``seats <= 10``."""
+    kind: Literal["field"]
+    field: Literal["seats", "agency_id", "slot_id"]
+    op: Literal["<", "<=", "==", "!=", ">=", ">", "in", "not_in"]
+    value: int | list[int]
+
+class TimeWindowRule(RuleBase):
+    """Tours must start between ``earliest`` and ``latest`` local time, on ``weekdays`` (0 is Monday)."""
+    kind: Literal["time_window"]
+    earliest: time = time.min
+    latest: time = time.max
+    weekdays: list[int] | None = None
+    timezone: str = "UTC"
+
+class LeadTimeRule(RuleBase):
+    """Tours must start at least ``min_hours`` and at most ``max_days`` after validation; unset bounds are not checked."""
+    kind: Literal["lead_time"]
+    min_hours: float | None = None
+    max_days: float | None = None
+
+Rule = Annotated[
+    Union[CapacityRule, FieldRule, TimeWindowRule, LeadTimeRule],
+    Field(discriminator="kind"),
+]
+
+class RuleSet(BaseModel):
+    version: str
+    rules: list[Rule]
@@ -0,0 +1,301 @@
+import operator
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Sequence
+from zoneinfo import ZoneInfo
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.config import settings
+from app.core.exceptions import InvalidRuleSet, RuleSetNotFound
+from app.schemas.booking import BookingRow, ValidationReport
+from app.schemas.rules import (
+    AgencyTypeEnum,
+    CapacityRule,
+    FieldRule,
+    LeadTimeRule,
+    Rule,
+    RuleSet,
+    TimeWindowRule,
+)
+
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    ">": operator.gt,
+}
+
+_rows_adapter = TypeAdapter(list[BookingRow])
+
+
+class Columns:
+    """
+    A batch of booking rows stored column by column.
+
+    Compiled rules read whole columns instead of row objects. Derived columns
+    (local start times per timezone, row indices per agency type) are built
+    once and shared by every rule that needs them.
+    """
+
+    def __init__(self, rows: Sequence[BookingRow], now: datetime) -> None:
+        self.size = len(rows)
+        self.now = now
+        self.agency_id = [row.agency_id for row in rows]
+        self.agency_type = [row.agency_type for row in rows]
+        self.slot_id = [row.slot_id for row in rows]
+        self.starts_at = [row.starts_at for row in rows]
+        self.seats = [row.seats for row in rows]
+        self.remaining = [row.remaining for row in rows]
+        self._local: dict[str, list[datetime]] = {}
+        self._timestamps: list[float] | None = None
+        self._by_type: dict[AgencyTypeEnum, list[int]] | None = None
+
+    def rows_for(self, agency_type: AgencyTypeEnum | None) -> Sequence[int]:
+        if agency_type is None:
+            return range(self.size)
+        if self._by_type is None:
+            self._by_type = defaultdict(list)
+            for index, value in enumerate(self.agency_type):
+                self._by_type[value].append(index)
+        return self._by_type.get(agency_type, [])
+
+    def start_timestamps(self) -> list[float]:
+        # Comparing floats is several times cheaper than comparing aware datetimes.
+        if self._timestamps is None:
+            self._timestamps = [value.timestamp() for value in self.starts_at]
+        return self._timestamps
+
+    def local_starts(self, tz: str) -> list[datetime]:
+        if tz not in self._local:
+            zone = ZoneInfo(tz)
+            self._local[tz] = [value.astimezone(zone) for value in self.starts_at]
+        return self._local[tz]
+
+
+Check = Callable[[Columns, Sequence[int]], list[int]]
+
+
+def _compile_capacity(rule: CapacityRule) -> Check:
+    def check(cols: Columns, rows: Sequence[int]) -> list[int]:
+        seats, remaining, slot_id = cols.seats, cols.remaining, cols.slot_id
+        taken: dict[int, int] = defaultdict(int)
+        failed = []
+        for i in rows:
+            if remaining[i] is None:
+                continue
+            already = taken[slot_id[i]] if slot_id[i] is not None else 0
+            if already + seats[i] > remaining[i]:
+                failed.append(i)
+            elif slot_id[i] is not None:
+                taken[slot_id[i]] = already + seats[i]
+        return failed
+    return check
+
+
+def _compile_field(rule: FieldRule) -> Check:
+    field = rule.field
+
+    if rule.op in ("in", "not_in"):
+        values = frozenset(rule.value if isinstance(rule.value, list) else [rule.value])
+        wanted = rule.op == "in"
+
+        def check(cols: Columns, rows: Sequence[int]) -> list[int]:
+            column = getattr(cols, field)
+            return [i for i in rows if column[i] is not None and (column[i] in values) != wanted]
+        return check
+
+    if isinstance(rule.value, list):
+        raise ValueError(f"{rule.code}: operator {rule.op} needs a single value")
+    compare, value = _OPERATORS[rule.op], rule.value
+
+    def check(cols: Columns, rows: Sequence[int]) -> list[int]:
+        column = getattr(cols, field)
+        return [i for i in rows if column[i] is not None and not compare(column[i], value)]
+    return check
+
+
+def _compile_time_window(rule: TimeWindowRule) -> Check:
+    ZoneInfo(rule.timezone)  # fail at compile time on an unknown zone
+    earliest, latest, tz = rule.earliest, rule.latest, rule.timezone
+    weekdays = frozenset(rule.weekdays) if rule.weekdays is not None else None
+
+    def check(cols: Columns, rows: Sequence[int]) -> list[int]:
+        local = cols.local_starts(tz)
+        failed = []
+        for i in rows:
+            start = local[i]
+            if not earliest <= start.time() <= latest or (weekdays is not None and start.weekday() not in weekdays):
+                failed.append(i)
+        return failed
+    return check
+
+
+def _compile_lead_time(rule: LeadTimeRule) -> Check:
+    if rule.min_hours is None and rule.max_days is None:
+        raise ValueError(f"{rule.code}: lead_time needs min_hours, max_days or both")
+    min_lead = timedelta(hours=rule.min_hours).total_seconds() if rule.min_hours is not None else None
+    max_lead = timedelta(days=rule.max_days).total_seconds() if rule.max_days is not None else None
+
+    def check(cols: Columns, rows: Sequence[int]) -> list[int]:
+        now = cols.now.timestamp()
+        earliest = now + min_lead if min_lead is not None else float("-inf")
+        latest = now + max_lead if max_lead is not None else float("inf")
+        starts = cols.start_timestamps()
+        return [i for i in rows if not earliest <= starts[i] <= latest]
+    return check
+
+
+_COMPILERS: dict[type, Callable[[Any], Check]] = {
+    CapacityRule: _compile_capacity,
+    FieldRule: _compile_field,
+    TimeWindowRule: _compile_time_window,
+    LeadTimeRule: _compile_lead_time,
+}
+
+
+@dataclass(frozen=True)
+class CompiledRuleSet:
+    version: str
+    checks: tuple[tuple[Rule, Check], ...]
+
+    def evaluate(self, rows: Sequence[BookingRow], now: datetime) -> list[tuple[int, Rule]]:
+        """Run every rule over the whole batch, one pass per rule, and return (row, rule) violations."""
+        cols = Columns(rows, now)
+        violations = []
+        for rule, check in self.checks:
+            violations.extend((i, rule) for i in check(cols, cols.rows_for(rule.agency_type)))
+        return violations
+
+
+def compile_rule_set(rule_set: RuleSet) -> CompiledRuleSet:
+    return CompiledRuleSet(
+        version=rule_set.version,
+        checks=tuple((rule, _COMPILERS[type(rule)](rule)) for rule in rule_set.rules),
+    )
+
+
+class RuleEngine:
+    """
+    Loads rule sets from ``<rules_dir>/<version>.json`` and caches them compiled.
+
+    A rule set is parsed and compiled once per version; the cache key also
+    carries the file's mtime, so editing a file in place is picked up
+    without a restart. Least recently used versions are dropped once
+    ``cache_size`` is reached. Validation runs in threadpool workers, so the
+    cache is guarded by a lock; compiling happens outside it.
+    """
+
+    def __init__(self, rules_dir: str, cache_size: int) -> None:
+        self.rules_dir = Path(rules_dir)
+        self.cache_size = cache_size
+        self._compiled: OrderedDict[str, tuple[int, CompiledRuleSet]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.compile_seconds = 0.0
+
+    def _path(self, version: str) -> Path:
+        if not VERSION_PATTERN.match(version) or version.startswith("."):
+            raise RuleSetNotFound(version)
+        return self.rules_dir / f"{version}.json"
+
+    def load(self, version: str) -> RuleSet:
+        path = self._path(version)
+        try:
+            rule_set = RuleSet.model_validate_json(path.read_bytes())
+        except FileNotFoundError:
+            raise RuleSetNotFound(version)
+        except ValidationError as exc:
+            raise InvalidRuleSet(version, str(exc))
+        if rule_set.version != version:
+            raise InvalidRuleSet(version, f"file declares version {rule_set.version}")
+        return rule_set
+
+    def get(self, version: str) -> CompiledRuleSet:
+        try:
+            mtime = os.stat(self._path(version)).st_mtime_ns
+        except FileNotFoundError:
+            raise RuleSetNotFound(version)
+
+        with self._lock:
+            entry = self._compiled.get(version)
+            if entry is not None and entry[0] == mtime:
+                self._compiled.move_to_end(version)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        started = time.perf_counter()
+        try:
+            compiled = compile_rule_set(self.load(version))
+        except (ValueError, KeyError) as exc:
+            raise InvalidRuleSet(version, str(exc))
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.compile_seconds += elapsed
+            self._compiled[version] = (mtime, compiled)
+            self._compiled.move_to_end(version)
+            while len(self._compiled) > self.cache_size:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "cached_versions": list(self._compiled),
+                "cache_size": self.cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "compile_seconds": self.compile_seconds,
+            }
+
+
+def _parse_rows(raw_rows: list[dict[str, Any]]) -> tuple[list[int], list[BookingRow], list[dict[str, Any]]]:
+    """Validate all rows in one call; only if some fail, re-run on the rest."""
+    try:
+        return list(range(len(raw_rows))), _rows_adapter.validate_python(raw_rows), []
+    except ValidationError as exc:
+        problems: dict[int, list[str]] = defaultdict(list)
+        for error in exc.errors(include_url=False):
+            row, *field = error["loc"]
+            problems[row].append(f"{'.'.join(map(str, field)) or 'row'}: {error['msg']}")
+
+    errors = [
+        {"row": row, "code": "invalid_row", "message": "; ".join(messages)}
+        for row, messages in sorted(problems.items())
+    ]
+    positions = [i for i in range(len(raw_rows)) if i not in problems]
+    return positions, _rows_adapter.validate_python([raw_rows[i] for i in positions]), errors
+
+
+def validate_batch(compiled: CompiledRuleSet, raw_rows: list[dict[str, Any]], now: datetime | None = None) -> ValidationReport:
+    positions, rows, errors = _parse_rows(raw_rows)
+
+    for index, rule in compiled.evaluate(rows, now or datetime.now(timezone.utc)):
+        errors.append({"row": positions[index], "code": rule.code, "message": rule.message})
+    errors.sort(key=operator.itemgetter("row"))
+
+    invalid = len({error["row"] for error in errors})
+    # Errors stay plain dicts until here so the whole report is validated in one call.
+    return ValidationReport.model_validate({
+        "rule_set": compiled.version,
+        "rows": len(raw_rows),
+        "valid": len(raw_rows) - invalid,
+        "invalid": invalid,
+        "errors": errors,
+    })
+
+
+rule_engine = RuleEngine(settings.rule_sets_dir, settings.compiled_rule_sets_cache_size)
@@ -0,0 +1,66 @@
+"""
+Benchmark for batch validation with the compiled rule engine.
+
+Validates a synthetic booking upload against a rule set once as a single
+batch, then row by row (one evaluate call per booking, which is what
+validating each booking with its own request amounts to, minus the HTTP).
+
+Usage (from services/validation):
+    python -m benchmarks.bench_rule_engine --rows 10000 --rule-set v1
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.services.rule_engine import rule_engine, validate_batch
+
+
+def make_rows(count: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for _ in range(count):
+        slot_id = rng.randint(1, count // 10 or 1)
+        rows.append({
+            "agency_id": rng.randint(1, 200),
+            "agency_type": rng.choice(("innopolis", "outer")),
+            "slot_id": slot_id,
+            "starts_at": (now + timedelta(hours=rng.randint(1, 24 * 60))).isoformat(),
+            "seats": rng.randint(1, 15),
+            "remaining": 40 + slot_id % 20,
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--rule-set", default="v1")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.seed)
+
+    started = time.perf_counter()
+    compiled = rule_engine.get(args.rule_set)
+    compile_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    report = validate_batch(compiled, rows)
+    batch_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for row in rows:
+        validate_batch(rule_engine.get(args.rule_set), [row])
+    per_row_time = time.perf_counter() - started
+
+    print(f"rows:              {args.rows}")
+    print(f"rules:             {len(compiled.checks)} (compiled in {compile_time * 1e3:.2f} ms)")
+    print(f"invalid rows:      {report.invalid} ({len(report.errors)} violations)")
+    print(f"batch:             {batch_time * 1e3:8.2f} ms ({batch_time / args.rows * 1e6:.2f} us/row)")
+    print(f"row by row:        {per_row_time * 1e3:8.2f} ms ({per_row_time / args.rows * 1e6:.2f} us/row)")
+
+
+if __name__ == "__main__":
+    main()
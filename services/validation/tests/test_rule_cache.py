@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+
+from app.core.exceptions import InvalidRuleSet, RuleSetNotFound
+from app.services.rule_engine import RuleEngine
+
+
+def write_rule_set(path, version: str, max_seats: int, mtime_ns: int | None = None) -> None:
+    rule = {"kind": "field", "code": "max_seats", "message": "m", "field": "seats", "op": "<=", "value": max_seats}
+    path.joinpath(f"{version}.json").write_text(json.dumps({"version": version, "rules": [rule]}))
+    if mtime_ns is not None:
+        os.utime(path / f"{version}.json", ns=(mtime_ns, mtime_ns))
+
+
+def test_compiled_rule_sets_are_cached_per_version(tmp_path):
+    write_rule_set(tmp_path, "v1", 10)
+    engine = RuleEngine(str(tmp_path), cache_size=4)
+
+    first = engine.get("v1")
+
+    assert engine.get("v1") is first
+    assert (engine.hits, engine.misses) == (1, 1)
+
+
+def test_editing_a_file_recompiles_it(tmp_path):
+    write_rule_set(tmp_path, "v1", 10, mtime_ns=1_000_000_000)
+    engine = RuleEngine(str(tmp_path), cache_size=4)
+    first = engine.get("v1")
+
+    write_rule_set(tmp_path, "v1", 20, mtime_ns=2_000_000_000)
+    second = engine.get("v1")
+
+    assert second is not first
+    assert second.checks[0][0].value == 20
+    assert engine.misses == 2
+
+
+def test_least_recently_used_versions_are_evicted(tmp_path):
+    for version in ("a", "b", "c"):
+        write_rule_set(tmp_path, version, 10)
+    engine = RuleEngine(str(tmp_path), cache_size=2)
+
+    engine.get("a")
+    engine.get("b")
+    engine.get("a")
+    engine.get("c")
+
+    assert engine.stats()["cached_versions"] == ["a", "c"]
+
+
+def test_unknown_unsafe_and_mislabelled_versions(tmp_path):
+    write_rule_set(tmp_path, "v1", 10)
+    tmp_path.joinpath("v2.json").write_text(tmp_path.joinpath("v1.json").read_text())
+    engine = RuleEngine(str(tmp_path), cache_size=4)
+
+    with pytest.raises(RuleSetNotFound):
+        engine.get("missing")
+    with pytest.raises(RuleSetNotFound):
+        engine.get("../v1")
+    with pytest.raises(InvalidRuleSet, match="file declares version v1"):
+        engine.get("v2")
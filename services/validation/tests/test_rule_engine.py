@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.schemas.rules import RuleSet
+from app.services.rule_engine import compile_rule_set, validate_batch
+
+NOW = datetime(2030, 1, 7, 12, tzinfo=timezone.utc)  # a Monday
+
+
+def row(**overrides) -> dict:
+    values = {"agency_id": 1, "agency_type": "innopolis", "slot_id": 1, "starts_at": NOW + timedelta(days=7), "seats": 2}
+    return values | overrides
+
+
+def rules(*rule_list: dict):
+    return compile_rule_set(RuleSet.model_validate({"version": "test", "rules": list(rule_list)}))
+
+
+def codes(report) -> list[tuple[int, str]]:
+    return [(error.row, error.code) for error in report.errors]
+
+
+def test_lead_time_checks_only_the_bounds_that_are_set():
+    compiled = rules(
+        {"kind": "lead_time", "code": "too_late", "message": "m", "min_hours": 24},
+        {"kind": "lead_time", "code": "too_early", "message": "m", "max_days": 180},
+    )
+    report = validate_batch(compiled, [
+        row(starts_at=NOW - timedelta(days=1)),
+        row(starts_at=NOW + timedelta(hours=23)),
+        row(starts_at=NOW + timedelta(days=1)),
+        row(starts_at=NOW + timedelta(days=181)),
+    ], NOW)
+
+    assert codes(report) == [(0, "too_late"), (1, "too_late"), (3, "too_early")]
+
+
+def test_field_rule_compares_against_a_constant():
+    compiled = rules(
+        {"kind": "field", "code": "max_seats", "message": "m", "field": "seats", "op": "<=", "value": 10},
+        {"kind": "field", "code": "known_agency", "message": "m", "field": "agency_id", "op": "in", "value": [1, 2]},
+        {"kind": "field", "code": "closed_slot", "message": "m", "field": "slot_id", "op": "not_in", "value": [9]},
+    )
+    report = validate_batch(compiled, [row(), row(seats=11), row(agency_id=3), row(slot_id=9), row(slot_id=None)], NOW)
+
+    assert codes(report) == [(1, "max_seats"), (2, "known_agency"), (3, "closed_slot")]
+
+
+def test_field_rule_rejects_a_list_for_a_comparison():
+    compiled = RuleSet.model_validate({"version": "test", "rules": [
+        {"kind": "field", "code": "bad", "message": "m", "field": "seats", "op": "<", "value": [1, 2]},
+    ]})
+
+    with pytest.raises(ValueError, match="bad: operator < needs a single value"):
+        compile_rule_set(compiled)
+
+
+def test_time_window_uses_local_time_and_weekdays():
+    compiled = rules({
+        "kind": "time_window", "code": "hours", "message": "m",
+        "earliest": "09:00", "latest": "20:00", "weekdays": [0, 1, 2, 3, 4], "timezone": "Europe/Moscow",
+    })
+    monday = datetime(2030, 1, 14, tzinfo=timezone.utc)
+    report = validate_batch(compiled, [
+        row(starts_at=monday + timedelta(hours=6)),   # 09:00 in Moscow
+        row(starts_at=monday + timedelta(hours=5)),   # 08:00 in Moscow
+        row(starts_at=monday + timedelta(hours=17, minutes=1)),  # 20:01 in Moscow
+        row(starts_at=monday + timedelta(days=5, hours=8)),  # Saturday
+    ], NOW)
+
+    assert codes(report) == [(1, "hours"), (2, "hours"), (3, "hours")]
+
+
+def test_capacity_counts_seats_taken_by_earlier_rows_of_the_upload():
+    compiled = rules({"kind": "capacity", "code": "slot_full", "message": "m"})
+    report = validate_batch(compiled, [
+        row(slot_id=1, seats=3, remaining=5),
+        row(slot_id=1, seats=3, remaining=5),  # 3 + 3 > 5
+        row(slot_id=1, seats=2, remaining=5),  # the rejected row took nothing
+        row(slot_id=2, seats=5, remaining=5),
+        row(slot_id=1, seats=50),  # no remaining count, not checked
+    ], NOW)
+
+    assert codes(report) == [(1, "slot_full")]
+
+
+def test_agency_type_limits_a_rule_to_that_type_of_agency():
+    compiled = rules({
+        "kind": "field", "code": "outer_max_seats", "message": "m",
+        "agency_type": "outer", "field": "seats", "op": "<=", "value": 10,
+    })
+    report = validate_batch(compiled, [row(seats=20), row(agency_type="outer", seats=20), row(agency_type="outer")], NOW)
+
+    assert codes(report) == [(1, "outer_max_seats")]
+
+
+def test_malformed_rows_are_reported_next_to_rule_violations():
+    compiled = rules({"kind": "field", "code": "max_seats", "message": "m", "field": "seats", "op": "<=", "value": 10})
+    report = validate_batch(compiled, [row(seats=20), {"agency_id": "x"}, row(), row(seats=0)], NOW)
+
+    assert codes(report) == [(0, "max_seats"), (1, "invalid_row"), (3, "invalid_row")]
+    assert "seats" in report.errors[2].message
+    assert (report.rows, report.valid, report.invalid) == (4, 1, 3)
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1 import validation
+from app.core.config import settings
+from app.main import app
+from app.services.rule_engine import RuleEngine
+
+RULES_DIR = Path(__file__).resolve().parent.parent / settings.rule_sets_dir
+
+
+@pytest.fixture
+def client(monkeypatch) -> TestClient:
+    # The shipped rule sets, but a fresh cache for every test.
+    monkeypatch.setattr(validation, "rule_engine", RuleEngine(str(RULES_DIR), 4))
+    return TestClient(app)
+
+
+def test_validate_bookings_against_the_active_rule_set(client):
+    # The first Tuesday more than 72 hours ahead (outer lead time), at 12:00 Moscow time.
+    earliest = datetime.now(timezone.utc).date() + timedelta(days=4)
+    day = earliest + timedelta(days=(1 - earliest.weekday()) % 7)
+    starts_at = datetime(day.year, day.month, day.day, 9, tzinfo=timezone.utc).isoformat()
+    rows = [
+        {"agency_id": 1, "agency_type": "outer", "slot_id": 1, "starts_at": starts_at, "seats": 5, "remaining": 8},
+        {"agency_id": 2, "agency_type": "outer", "slot_id": 1, "starts_at": starts_at, "seats": 5, "remaining": 8},
+        {"agency_id": 3, "agency_type": "innopolis", "starts_at": starts_at, "seats": 12},
+        {"agency_id": 4, "agency_type": "outer", "starts_at": starts_at, "seats": 12},
+        {"agency_id": 5},
+    ]
+
+    response = client.post("/validation/bookings", json={"rows": rows})
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["rule_set"] == settings.active_rule_set
+    assert [(error["row"], error["code"]) for error in report["errors"]] == [
+        (1, "slot_full"),
+        (3, "outer_max_seats"),
+        (4, "invalid_row"),
+    ]
+    assert (report["valid"], report["invalid"]) == (2, 3)
+
+
+def test_unknown_rule_set_is_404(client):
+    response = client.post("/validation/bookings", json={"rule_set": "nope", "rows": []})
+
+    assert response.status_code == 404
+
+
+def test_too_many_rows_is_413(client, monkeypatch):
+    monkeypatch.setattr(settings, "max_batch_rows", 1)
+
+    response = client.post("/validation/bookings", json={"rows": [{}, {}]})
+
+    assert response.status_code == 413